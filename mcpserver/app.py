@@ -4,33 +4,162 @@ MCP root server.
 This module bootstraps all MCP servers into a root server.
 """
 
+import asyncio
+import importlib
 import logging
+import time
+from collections.abc import Awaitable
+from contextlib import asynccontextmanager
 
+import psutil
 from fastmcp import FastMCP
+from fastmcp.server.middleware import Middleware, MiddlewareContext
 from starlette.requests import Request
-from starlette.responses import PlainTextResponse
+from starlette.responses import JSONResponse, PlainTextResponse, Response
 
+from core import db
+from core.cache import catalog_cache, dashboard_cache
 from core.config import settings
-from tools.catalog import mcp as catalog_mcp
-from tools.crm import mcp as crm_mcp
-from tools.erp import mcp as erp_mcp
-from tools.notification import mcp as notification_mcp
+from utils.metrics import metrics
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Modules of the sub-servers mounted on the root server, each exposing ``mcp``
+SUB_SERVER_MODULES = (
+    "tools.catalog",
+    "tools.crm",
+    "tools.erp",
+    "tools.notification",
+)
+
+# Seconds spent in each startup step, logged once the server is ready
+startup_timings: dict[str, float] = {}
+
+# Whether every sub-server is mounted
+_mounted = asyncio.Event()
+
+# Background startup of the lazy mounting mode
+_startup_task: asyncio.Task | None = None
+
+
+def _import_sub_server(module_name: str) -> FastMCP:
+    """Import the module of a sub-server and get its server."""
+    start_time = time.perf_counter()
+    module = importlib.import_module(module_name)
+    startup_timings[f"import {module_name}"] = time.perf_counter() - start_time
+    return module.mcp
+
+
+def mount_sub_servers() -> None:
+    """Import and mount every sub-server on the root server."""
+    for module_name in SUB_SERVER_MODULES:
+        server = _import_sub_server(module_name)
+        mcp.mount(server, prefix=server.name)
+    _mounted.set()
+
+
+async def mount_sub_servers_in_background() -> None:
+    """Import the sub-servers in a worker thread and mount them on the loop.
+
+    Importing the tool modules loads the generated Prisma client types and
+    builds the tool schemas, which is most of the cold start. Running it off
+    the event loop lets the server listen and connect to the database
+    meanwhile.
+    """
+    for module_name in SUB_SERVER_MODULES:
+        server = await asyncio.to_thread(_import_sub_server, module_name)
+        mcp.mount(server, prefix=server.name)
+    _mounted.set()
+
+
+async def _timed(step: str, awaitable: Awaitable[None]) -> None:
+    start_time = time.perf_counter()
+    await awaitable
+    startup_timings[step] = time.perf_counter() - start_time
+
+
+def log_startup_timings() -> None:
+    """Log how long each startup step took and when the server became ready."""
+    breakdown = " | ".join(
+        f"{step} {seconds:.3f}s" for step, seconds in startup_timings.items()
+    )
+    process_age = time.time() - psutil.Process().create_time()
+    logger.info(
+        "⏱️ Startup breakdown | %s | ready %.3fs after process start",
+        breakdown,
+        process_age,
+    )
+
+
+def _log_startup_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("❌ Startup failed: %s", task.exception())
+
+
+async def startup() -> None:
+    """Connect the database and, in lazy mode, mount the sub-servers."""
+    steps = [_timed("database", db.connect())]
+    if not _mounted.is_set():
+        steps.append(_timed("mount", mount_sub_servers_in_background()))
+    await asyncio.gather(*steps)
+    log_startup_timings()
+
+
+@asynccontextmanager
+async def lifespan(_: FastMCP):
+    """Application lifespan manager.
+
+    Owns the single database connection shared by every mounted sub-server.
+    It is entered once per process by ``main.py`` around the transport, not
+    per client session, so sessions never connect or disconnect the client.
+
+    With ``LAZY_MOUNT`` the startup runs in the background so the server
+    listens right away. Requests wait for it to finish and ``/health``
+    reports ``STARTING`` until then.
+    """
+    global _startup_task
+
+    # Startup
+    logger.info("Starting up application...")
+    if settings.lazy_mount:
+        _startup_task = asyncio.create_task(startup())
+        _startup_task.add_done_callback(_log_startup_failure)
+    else:
+        await startup()
+        logger.info("Database initialized")
+
+    try:
+        yield
+    finally:
+        # Shutdown
+        logger.info("Shutting down application...")
+        if _startup_task is not None:
+            _startup_task.cancel()
+        await db.disconnect()
+
+
+class AwaitStartupMiddleware(Middleware):
+    """Hold MCP requests until the background startup has finished."""
+
+    async def on_request(self, context: MiddlewareContext, call_next):
+        if _startup_task is not None:
+            # Shielded so a cancelled request does not cancel the startup
+            await asyncio.shield(_startup_task)
+        return await call_next(context)
+
+
 # Create main MCP server
 mcp = FastMCP(
     name=settings.app_name,
+    middleware=[AwaitStartupMiddleware()],
 )
 
 
 logger.info("✅ MCP server instance created")
 
-mcp.mount(catalog_mcp.name, catalog_mcp)
-mcp.mount(crm_mcp.name, crm_mcp)
-mcp.mount(erp_mcp.name, erp_mcp)
-mcp.mount(notification_mcp.name, notification_mcp)
+if not settings.lazy_mount:
+    mount_sub_servers()
 
 
 @mcp.custom_route("/health", methods=["GET"])
@@ -38,13 +167,143 @@ async def health_check(_: Request) -> PlainTextResponse:
     """
     Health check endpoint.
 
-    This endpoint is used to check if the MCP server is running.
+    This endpoint is used to check if the MCP server is running, its
+    database connection is ready and its sub-servers are mounted.
 
     Returns:
-        PlainTextResponse: "OK" if the MCP server is running, "ERROR" otherwise.
+        PlainTextResponse: "OK" if the MCP server is ready, "STARTING" otherwise.
     """
+    if not db.is_ready() or not _mounted.is_set():
+        logger.warning("⏳ MCP server health check | NOT READY")
+        return PlainTextResponse("STARTING", status_code=503)
+
     logger.info("✅ MCP server health check")
     return PlainTextResponse("OK", status_code=200)
 
 
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(_: Request) -> Response:
+    """
+    Prometheus metrics endpoint.
+
+    Exposes per-tool call counts, latency, DB time and payload size
+    histograms, error counts, process memory, catalog cache counters and
+    database pool gauges.
+
+    Returns:
+        Response: The metrics in the Prometheus text exposition format.
+    """
+    cache_stats = catalog_cache.stats()
+    counters = {
+        "mcp_catalog_cache_hits_total": ("Catalog cache hits.", cache_stats["hits"]),
+        "mcp_catalog_cache_misses_total": (
+            "Catalog cache misses.",
+            cache_stats["misses"],
+        ),
+        "mcp_catalog_cache_evictions_total": (
+            "Catalog cache evictions.",
+            cache_stats["evictions"],
+        ),
+    }
+    gauges = {
+        "mcp_database_ready": ("Database connection ready.", int(db.is_ready())),
+    }
+
+    try:
+        pool = await db.pool_metrics(db.prisma)
+    except Exception as e:
+        logger.warning("⚠️ Could not read database pool metrics: %s", e)
+        pool = {}
+    for key in (
+        "prisma_pool_connections_open",
+        "prisma_pool_connections_busy",
+        "prisma_pool_connections_idle",
+        "prisma_client_queries_active",
+        "prisma_client_queries_wait",
+        "pool_saturation",
+    ):
+        name = key if key.startswith("prisma_") else f"mcp_db_{key}"
+        gauges[name] = ("Database connection pool gauge.", pool.get(key))
+
+    return Response(
+        metrics.render(gauges, counters),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@mcp.custom_route("/db/pool", methods=["GET"])
+async def database_pool_stats(_: Request) -> JSONResponse:
+    """
+    Database pool stats endpoint.
+
+    Returns:
+        JSONResponse: The connection pool gauges, counters and saturation of
+            the primary and, when configured, the read replica.
+    """
+    stats = {"primary": await db.pool_metrics(db.prisma)}
+    if db.prisma_replica is not None:
+        stats["replica"] = await db.pool_metrics(db.prisma_replica)
+    return JSONResponse(stats)
+
+
+@mcp.custom_route("/cache/catalog", methods=["GET"])
+async def catalog_cache_stats(_: Request) -> JSONResponse:
+    """
+    Catalog cache stats endpoint.
+
+    Returns:
+        JSONResponse: The hit/miss/eviction counters and entity versions.
+    """
+    return JSONResponse(catalog_cache.stats())
+
+
+@mcp.custom_route("/cache/catalog/invalidate", methods=["POST"])
+async def invalidate_catalog_cache(request: Request) -> JSONResponse:
+    """
+    Catalog cache invalidation endpoint.
+
+    Called by writers of the catalog (e.g. the API) after products,
+    categories or promotions change. Pass ``?entity=products`` (repeatable)
+    to invalidate specific entities, or nothing to invalidate all of them.
+
+    Returns:
+        JSONResponse: The entities that were invalidated.
+    """
+    entities = request.query_params.getlist("entity")
+    invalidated = catalog_cache.invalidate(*entities)
+    return JSONResponse({"invalidated": invalidated})
+
+
+@mcp.custom_route("/cache/dashboards", methods=["GET"])
+async def dashboard_cache_stats(_: Request) -> JSONResponse:
+    """
+    Sales rep dashboard cache stats endpoint.
+
+    Returns:
+        JSONResponse: The hit/miss/eviction counters and dashboard versions.
+    """
+    return JSONResponse(dashboard_cache.stats())
+
+
+@mcp.custom_route("/cache/dashboards/invalidate", methods=["POST"])
+async def invalidate_dashboard_cache(request: Request) -> JSONResponse:
+    """
+    Sales rep dashboard cache invalidation endpoint.
+
+    Called by writers of accounts, action items, insights and order statuses
+    (e.g. the API).
+    Pass ``?sales_rep_id=3`` (repeatable) to invalidate the dashboards of
+    specific sales reps, or nothing to invalidate all of them.
+
+    Returns:
+        JSONResponse: The dashboards that were invalidated.
+    """
+    entities = [
+        f"sales_rep:{sales_rep_id}"
+        for sales_rep_id in request.query_params.getlist("sales_rep_id")
+    ]
+    invalidated = dashboard_cache.invalidate(*entities)
+    return JSONResponse({"invalidated": invalidated})
+
+
 logger.info("✅ Global tools registered")
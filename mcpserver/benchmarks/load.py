@@ -0,0 +1,343 @@
+"""
+Load test for the MCP server over SSE.
+
+Connects N concurrent MCP clients to a running server (``main.py`` with
+``TRANSPORT=sse``) and replays a weighted mix of catalog searches, CRM
+lookups, order aggregations and order creation for a fixed duration. Reports
+throughput, p50/p95/p99 latency and error rate per tool.
+
+The tool arguments are drawn from the products and accounts of the seeded
+database the server runs against, so the mix hits real rows. Order creation
+writes to that database; pass ``--read-only`` to leave it out.
+
+Usage:
+    uv run python -m benchmarks.load --clients 20 --duration 60 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from fastmcp import Client
+from mcp.types import CallToolResult
+
+# Arguments of a tool call, built from the fixtures
+ArgsBuilder = Callable[["Fixtures", random.Random], dict[str, Any]]
+
+
+@dataclass
+class Fixtures:
+    """Rows of the seeded database the tool arguments are drawn from."""
+
+    products: list[dict[str, Any]]
+    accounts: list[dict[str, Any]]
+
+
+@dataclass
+class Scenario:
+    """A tool of the mix with its weight and argument builder."""
+
+    tool: str
+    weight: float
+    build: ArgsBuilder
+    writes: bool = False
+
+
+def _word(text: str, rng: random.Random) -> str:
+    """Pick a word of a name to search by, as an agent would type it."""
+    words = [word for word in text.split() if len(word) > 2] or [text]
+    return rng.choice(words)[:6]
+
+
+def _order_lines(fixtures: Fixtures, rng: random.Random) -> list[dict[str, Any]]:
+    products = rng.sample(fixtures.products, k=min(len(fixtures.products), 5))
+    return [
+        {"product_id": product["id"], "quantity": rng.randint(1, 24)}
+        for product in products[: rng.randint(1, len(products))]
+    ]
+
+
+SCENARIOS = [
+    Scenario(
+        "catalog_fuzzy_search_products_by_product_name",
+        20,
+        lambda f, rng: {
+            "product_name_query": _word(rng.choice(f.products)["name"], rng),
+            "limit": 10,
+        },
+    ),
+    Scenario(
+        "catalog_get_products_by_id",
+        10,
+        lambda f, rng: {"product_id": rng.choice(f.products)["id"]},
+    ),
+    Scenario(
+        "catalog_get_products",
+        5,
+        lambda f, rng: {"limit": 20, "fields": ["category"]},
+    ),
+    Scenario(
+        "catalog_fuzzy_search_promotions_by_product_name",
+        5,
+        lambda f, rng: {
+            "product_name_query": _word(rng.choice(f.products)["name"], rng),
+            "limit": 10,
+        },
+    ),
+    Scenario(
+        "crm_fuzzy_search_accounts",
+        15,
+        lambda f, rng: {
+            "account_name_query": _word(rng.choice(f.accounts)["name"], rng),
+            "limit": 10,
+            "fields": ["territory", "contact"],
+        },
+    ),
+    Scenario(
+        "crm_get_sales_rep_accounts",
+        10,
+        lambda f, rng: {
+            "sales_rep_id": rng.choice(f.accounts)["sales_rep_id"],
+            "limit": 20,
+            "fields": ["territory"],
+        },
+    ),
+    Scenario(
+        "crm_get_sales_rep_action_items",
+        5,
+        lambda f, rng: {"sales_rep_id": rng.choice(f.accounts)["sales_rep_id"]},
+    ),
+    Scenario(
+        "erp_fuzzy_search_orders_by_account_name",
+        10,
+        lambda f, rng: {
+            "account_name_query": _word(rng.choice(f.accounts)["name"], rng),
+            "limit": 10,
+        },
+    ),
+    Scenario(
+        "erp_get_order_totals",
+        10,
+        lambda f, rng: {"account_id": rng.choice(f.accounts)["id"]},
+    ),
+    Scenario(
+        "erp_create_order_with_items",
+        5,
+        lambda f, rng: {
+            "account_id": (account := rng.choice(f.accounts))["id"],
+            "sales_rep_id": account["sales_rep_id"],
+            "items": _order_lines(f, rng),
+        },
+        writes=True,
+    ),
+]
+
+
+def result_text(result: CallToolResult) -> str:
+    """Get the text content of a tool result."""
+    return "".join(getattr(content, "text", "") for content in result.content)
+
+
+def is_error(result: CallToolResult) -> bool:
+    """Check if a tool call failed, including tools that report errors as text."""
+    return result.isError or result_text(result).startswith("Error")
+
+
+async def load_fixtures(client: Client) -> Fixtures:
+    """Load the products and accounts the tool arguments are drawn from."""
+    products = await client.call_tool_mcp(
+        "catalog_get_products", {"limit": 200, "fields": []}
+    )
+    accounts = await client.call_tool_mcp(
+        "crm_get_accounts", {"limit": 200, "fields": []}
+    )
+    fixtures = Fixtures(
+        products=json.loads(result_text(products))["items"],
+        accounts=json.loads(result_text(accounts))["items"],
+    )
+    if not fixtures.products or not fixtures.accounts:
+        raise RuntimeError("The database has no products or accounts. Seed it first.")
+    return fixtures
+
+
+@dataclass
+class Stats:
+    """Latencies and errors recorded per tool."""
+
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def record(self, tool: str, seconds: float, ok: bool) -> None:
+        self.latencies[tool].append(seconds)
+        if not ok:
+            self.errors[tool] += 1
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Get a percentile of a list of values by linear interpolation."""
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(percent) - 1]
+
+
+def summarize(latencies: list[float], errors: int, duration: float) -> dict:
+    """Summarize the latencies in ms, throughput and error rate of a tool."""
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "error_rate": errors / len(latencies) if latencies else 0.0,
+        "throughput_rps": len(latencies) / duration if duration else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+    }
+
+
+async def run_client(
+    url: str,
+    fixtures: Fixtures,
+    scenarios: list[Scenario],
+    rng: random.Random,
+    warmup_until: float,
+    deadline: float,
+    stats: Stats,
+) -> None:
+    """Issue tool calls from one MCP session until the deadline."""
+    weights = [scenario.weight for scenario in scenarios]
+    async with Client(url) as client:
+        while (now := time.perf_counter()) < deadline:
+            scenario = rng.choices(scenarios, weights)[0]
+            arguments = scenario.build(fixtures, rng)
+            try:
+                result = await client.call_tool_mcp(scenario.tool, arguments)
+                ok = not is_error(result)
+            except Exception:
+                ok = False
+            if now >= warmup_until:
+                stats.record(scenario.tool, time.perf_counter() - now, ok)
+
+
+def select_scenarios(mix: str | None, read_only: bool) -> list[Scenario]:
+    """Apply the ``--mix`` weight overrides and ``--read-only`` to the scenarios."""
+    weights = {}
+    for entry in (mix or "").split(","):
+        if entry.strip():
+            tool, weight = entry.split("=")
+            weights[tool.strip()] = float(weight)
+
+    unknown = weights.keys() - {scenario.tool for scenario in SCENARIOS}
+    if unknown:
+        raise SystemExit(f"Unknown tools in --mix: {sorted(unknown)}")
+
+    scenarios = []
+    for scenario in SCENARIOS:
+        weight = weights.get(scenario.tool, scenario.weight)
+        if weight > 0 and not (read_only and scenario.writes):
+            scenarios.append(Scenario(scenario.tool, weight, scenario.build))
+    return scenarios
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Run the load test and summarize the results."""
+    scenarios = select_scenarios(args.mix, args.read_only)
+    rng = random.Random(args.seed)
+
+    async with Client(args.url) as client:
+        fixtures = await load_fixtures(client)
+
+    stats = Stats()
+    start_time = time.perf_counter()
+    warmup_until = start_time + args.warmup
+    deadline = warmup_until + args.duration
+    await asyncio.gather(
+        *(
+            run_client(
+                args.url,
+                fixtures,
+                scenarios,
+                random.Random(rng.random()),
+                warmup_until,
+                deadline,
+                stats,
+            )
+            for _ in range(args.clients)
+        )
+    )
+
+    all_latencies = [value for values in stats.latencies.values() for value in values]
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "url": args.url,
+        "clients": args.clients,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "mix": {scenario.tool: scenario.weight for scenario in scenarios},
+        "total": summarize(all_latencies, sum(stats.errors.values()), args.duration),
+        "tools": {
+            tool: summarize(latencies, stats.errors[tool], args.duration)
+            for tool, latencies in sorted(stats.latencies.items())
+        },
+    }
+
+
+def print_report(results: dict) -> None:
+    """Print the per tool results as a table."""
+    print(
+        f"{'tool':<50} {'calls':>7} {'rps':>7} {'err%':>6} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    rows = [*results["tools"].items(), ("TOTAL", results["total"])]
+    for tool, summary in rows:
+        print(
+            f"{tool:<50} {summary['calls']:>7} {summary['throughput_rps']:>7.1f} "
+            f"{summary['error_rate'] * 100:>5.1f}% {summary['p50_ms']:>7.1f}ms "
+            f"{summary['p95_ms']:>7.1f}ms {summary['p99_ms']:>7.1f}ms"
+        )
+
+
+def main():
+    """Main entry point for the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--url", default="http://127.0.0.1:8080/sse", help="The SSE URL of the server."
+    )
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent clients.")
+    parser.add_argument(
+        "--duration", type=float, default=30.0, help="Measured seconds."
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=5.0, help="Unmeasured seconds first."
+    )
+    parser.add_argument(
+        "--mix",
+        help="Weight overrides as tool=weight,... (0 removes a tool).",
+    )
+    parser.add_argument(
+        "--read-only", action="store_true", help="Leave out the tools that write."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument("--output", type=Path, help="Write the results to this file.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_report(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
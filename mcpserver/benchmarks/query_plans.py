@@ -0,0 +1,499 @@
+"""
+Query plan regression check for the service queries.
+
+Calls the service methods against the seeded database configured in ``.env``
+on a client with Prisma query logging on, reads the SQL statements each call
+sent from the query engine log, and runs ``EXPLAIN (ANALYZE, FORMAT JSON)``
+for each of them with its logged parameters. The check fails when a plan
+scans a large table sequentially, when a statement cannot be explained, or
+when a call sent no statement at all.
+
+A table is large when Postgres estimates it holds at least ``--min-rows``
+rows. On a small seed, pass ``--strict`` to turn sequential scans off for the
+planner: a sequential scan that remains means no index can serve the query.
+
+Usage:
+    uv run python -m benchmarks.query_plans
+    uv run python -m benchmarks.query_plans --strict --output plans.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import re
+import sys
+import tempfile
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+from prisma import Prisma
+
+from core.config import settings
+from core.db import DatabaseRouter, create_client
+from services.account import AccountService
+from services.category import CategoryService
+from services.dashboard import DashboardService
+from services.order import OrderFilters, OrderService
+from services.product import ProductService
+from services.promotion import PromotionService
+from services.query import page_args, ranked_page_args
+from services.user import UserService
+
+TABLE_ROWS_SQL = """
+SELECT relname AS name, reltuples::bigint AS rows
+FROM pg_class
+WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace
+"""
+
+FIXTURES_SQL = """
+SELECT
+    a.id AS account_id,
+    a.sales_rep_id,
+    a.name AS account_name,
+    (SELECT id FROM "Order" ORDER BY id LIMIT 1) AS order_id,
+    (SELECT id FROM "Product" ORDER BY id LIMIT 1) AS product_id,
+    (SELECT sku FROM "Product" ORDER BY id LIMIT 1) AS product_sku,
+    (SELECT id FROM "Promotion" ORDER BY id LIMIT 1) AS promotion_id
+FROM "Account" a
+ORDER BY a.id
+LIMIT 1
+"""
+
+# Statements that can be explained; the log also holds BEGIN, COMMIT, ...
+EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+@dataclass
+class Services:
+    """The services whose queries are checked, on the logging client."""
+
+    account: AccountService
+    category: CategoryService
+    dashboard: DashboardService
+    order: OrderService
+    product: ProductService
+    promotion: PromotionService
+    user: UserService
+
+    @classmethod
+    def create(cls, db: DatabaseRouter) -> "Services":
+        """Create the services on a database router."""
+        return cls(
+            account=AccountService(db),
+            category=CategoryService(db),
+            dashboard=DashboardService(db),
+            order=OrderService(db),
+            product=ProductService(db),
+            promotion=PromotionService(db),
+            user=UserService(db),
+        )
+
+
+@dataclass
+class ServiceCall:
+    """A service method call, made the way the tools make it."""
+
+    name: str
+    call: Callable[[Services, dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class Statement:
+    """A SQL statement the query engine sent, with its parameters."""
+
+    sql: str
+    params: list[Any] | None
+    error: str | None = None
+
+
+def _search_term(fixtures: dict[str, Any]) -> str:
+    """Pick a word of the account name to search by."""
+    words = [word for word in fixtures["account_name"].split() if len(word) > 2]
+    return (words or [fixtures["account_name"]])[0]
+
+
+CALLS = [
+    ServiceCall(
+        "AccountService.get_accounts (first page, full)",
+        lambda s, f: s.account.get_accounts(page=page_args(None, None)),
+    ),
+    ServiceCall(
+        "AccountService.get_accounts (sales rep, next page, full)",
+        lambda s, f: s.account.get_accounts(
+            where={"sales_rep_id": f["sales_rep_id"]},
+            page=page_args(f["account_id"], None),
+        ),
+    ),
+    ServiceCall(
+        "AccountService.get_accounts (sales rep, summary)",
+        lambda s, f: s.account.get_accounts(
+            where={"sales_rep_id": f["sales_rep_id"]},
+            profile="summary",
+            page=page_args(None, None),
+        ),
+    ),
+    ServiceCall(
+        "AccountService.search_accounts",
+        lambda s, f: s.account.search_accounts(
+            _search_term(f), profile="summary", page=ranked_page_args(None, None)
+        ),
+    ),
+    ServiceCall(
+        "AccountService.get_account_insights (top of account)",
+        lambda s, f: s.account.get_account_insights(
+            where={"account_id": f["account_id"]},
+            fields=[],
+            page={"take": 5, "order": {"confidence": "desc"}},
+        ),
+    ),
+    ServiceCall(
+        "AccountService.search_account_insights_by_account_name",
+        lambda s, f: s.account.search_account_insights_by_account_name(
+            _search_term(f), profile="summary", page=ranked_page_args(None, None)
+        ),
+    ),
+    ServiceCall(
+        "AccountService.get_action_items (sales rep)",
+        lambda s, f: s.account.get_action_items(
+            where={"user_id": f["sales_rep_id"]}, page=page_args(None, None)
+        ),
+    ),
+    ServiceCall(
+        "AccountService.get_action_items (open, of account)",
+        lambda s, f: s.account.get_action_items(
+            where={"account_id": f["account_id"], "completed": False},
+            fields=[],
+            page={"take": 10, "order": [{"due_time": "asc"}, {"id": "asc"}]},
+        ),
+    ),
+    ServiceCall(
+        "OrderService.get_orders (first page, full)",
+        lambda s, f: s.order.get_orders(page=page_args(None, None)),
+    ),
+    ServiceCall(
+        "OrderService.get_orders (latest of account)",
+        lambda s, f: s.order.get_orders(
+            where={"account_id": f["account_id"]},
+            fields=[],
+            page={"take": 5, "order": {"created_at": "desc"}},
+        ),
+    ),
+    ServiceCall(
+        "OrderService.get_orders (account name, summary)",
+        lambda s, f: s.order.get_orders(
+            where={
+                "account": {
+                    "name": {"contains": _search_term(f), "mode": "insensitive"}
+                }
+            },
+            profile="summary",
+            page=page_args(None, None),
+        ),
+    ),
+    ServiceCall(
+        "OrderService.get_order_by_id",
+        lambda s, f: s.order.get_order_by_id(f["order_id"]),
+    ),
+    ServiceCall(
+        "OrderService.get_orders_by_ids",
+        lambda s, f: s.order.get_orders_by_ids([f["order_id"]]),
+    ),
+    ServiceCall(
+        "OrderService.get_order_totals (account)",
+        lambda s, f: s.order.get_order_totals(OrderFilters(account_id=f["account_id"])),
+    ),
+    ServiceCall(
+        "OrderService.get_order_totals (sales rep)",
+        lambda s, f: s.order.get_order_totals(
+            OrderFilters(sales_rep_id=f["sales_rep_id"])
+        ),
+    ),
+    ServiceCall(
+        "OrderService.get_top_products (account)",
+        lambda s, f: s.order.get_top_products(OrderFilters(account_id=f["account_id"])),
+    ),
+    ServiceCall(
+        "OrderService.get_order_totals_by_period (sales rep)",
+        lambda s, f: s.order.get_order_totals_by_period(
+            OrderFilters(sales_rep_id=f["sales_rep_id"])
+        ),
+    ),
+    ServiceCall(
+        "OrderService.get_order_items (of order)",
+        lambda s, f: s.order.get_order_items(
+            where={"order_id": f["order_id"]}, page=page_args(None, None)
+        ),
+    ),
+    ServiceCall(
+        "ProductService.get_products (catalog snapshot)",
+        lambda s, f: s.product.get_products(),
+    ),
+    ServiceCall(
+        "ProductService.get_product_by_id",
+        lambda s, f: s.product.get_product_by_id(f["product_id"]),
+    ),
+    ServiceCall(
+        "ProductService.get_products_by_skus",
+        lambda s, f: s.product.get_products_by_skus([f["product_sku"]]),
+    ),
+    ServiceCall(
+        "CategoryService.get_categories (catalog snapshot)",
+        lambda s, f: s.category.get_categories(),
+    ),
+    ServiceCall(
+        "CategoryService.get_subcategories (catalog snapshot)",
+        lambda s, f: s.category.get_subcategories(),
+    ),
+    ServiceCall(
+        "PromotionService.get_promotions (catalog snapshot)",
+        lambda s, f: s.promotion.get_promotions(),
+    ),
+    ServiceCall(
+        "PromotionService.get_promotion_by_id",
+        lambda s, f: s.promotion.get_promotion_by_id(f["promotion_id"]),
+    ),
+    ServiceCall(
+        "UserService.get_users (first page, full)",
+        lambda s, f: s.user.get_users(page=page_args(None, None)),
+    ),
+    ServiceCall(
+        "UserService.get_user_by_id",
+        lambda s, f: s.user.get_user_by_id(f["sales_rep_id"]),
+    ),
+    ServiceCall(
+        "DashboardService.get_sales_rep_dashboard",
+        lambda s, f: s.dashboard.get_sales_rep_dashboard(f["sales_rep_id"]),
+    ),
+]
+
+
+class QueryLog:
+    """Reads the statements the query engine logged, from where it last stopped."""
+
+    def __init__(self, file: IO[bytes]):
+        self._file = file
+        self._partial = b""
+
+    def statements(self) -> list[Statement]:
+        """Get the explainable statements logged since the last call."""
+        lines = (self._partial + self._file.read()).split(b"\n")
+        self._partial = lines.pop()
+
+        statements = []
+        for line in lines:
+            try:
+                fields = json.loads(line).get("fields", {})
+            except (json.JSONDecodeError, AttributeError):
+                continue
+            sql = fields.get("query")
+            if not sql or not EXPLAINABLE.match(sql):
+                continue
+            try:
+                params = json.loads(fields.get("params") or "[]")
+            except json.JSONDecodeError:
+                statements.append(
+                    Statement(sql, None, f"Unparsed params: {fields['params']}")
+                )
+                continue
+            statements.append(Statement(sql, params))
+        return statements
+
+
+@contextlib.asynccontextmanager
+async def logging_client(log_path: Path):
+    """Connect a client whose query engine logs its statements to a file.
+
+    The engine inherits stdout when it is spawned, so stdout points at the
+    log file while the client connects. The file is opened for appending, so
+    the engine writes stay at its end while it is read.
+    """
+    client = create_client(settings.database_url, log_queries=True)
+    with log_path.open("ab") as engine_log, contextlib.redirect_stdout(engine_log):
+        await client.connect()
+    try:
+        yield client
+    finally:
+        await client.disconnect()
+
+
+def seq_scans(plan: dict[str, Any]) -> list[str]:
+    """Get the tables a plan node and its children scan sequentially."""
+    tables = []
+    if plan.get("Node Type") == "Seq Scan":
+        tables.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        tables.extend(seq_scans(child))
+    return tables
+
+
+async def explain(client: Prisma, statement: Statement, strict: bool) -> dict[str, Any]:
+    """Explain and run a captured statement.
+
+    The statement runs in a transaction, so that ``--strict`` only turns
+    sequential scans off for it.
+
+    Returns:
+        dict[str, Any]: The top plan node with its execution time.
+    """
+    async with client.tx() as tx:
+        if strict:
+            await tx.execute_raw("SET LOCAL enable_seqscan = off")
+        rows = await tx.query_raw(
+            f"EXPLAIN (ANALYZE, FORMAT JSON) {statement.sql}", *statement.params
+        )
+
+    plan = rows[0]["QUERY PLAN"]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]
+
+
+def _short_sql(sql: str, width: int = 90) -> str:
+    sql = " ".join(sql.split())
+    return sql if len(sql) <= width else sql[: width - 3] + "..."
+
+
+async def check_statement(
+    client: Prisma,
+    statement: Statement,
+    table_rows: dict[str, int],
+    args: argparse.Namespace,
+) -> dict[str, Any]:
+    """Explain a statement and flag the sequential scans of large tables."""
+    result: dict[str, Any] = {
+        "sql": statement.sql,
+        "params": statement.params,
+        "error": statement.error,
+        "execution_ms": None,
+        "seq_scans": [],
+        "flagged": [],
+        "plan": None,
+    }
+    if statement.error is not None:
+        return result
+
+    try:
+        explained = await explain(client, statement, args.strict)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    scanned = sorted(set(seq_scans(explained["Plan"])))
+    result.update(
+        execution_ms=explained.get("Execution Time"),
+        seq_scans=scanned,
+        flagged=[
+            table
+            for table in scanned
+            if args.strict or table_rows.get(table, 0) >= args.min_rows
+        ],
+        plan=explained["Plan"],
+    )
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Capture the statements of every service call and explain them."""
+    with tempfile.TemporaryDirectory() as log_dir:
+        log_path = Path(log_dir) / "engine.log"
+        async with logging_client(log_path) as client:
+            fixture_rows = await client.query_raw(FIXTURES_SQL)
+            if not fixture_rows:
+                raise SystemExit("The database has no accounts. Seed it first.")
+            fixtures = fixture_rows[0]
+
+            table_rows = {
+                row["name"]: row["rows"]
+                for row in await client.query_raw(TABLE_ROWS_SQL)
+            }
+
+            # Capture every call first, so the log holds no EXPLAIN statements
+            services = Services.create(DatabaseRouter(client))
+            captured = []
+            with log_path.open("rb") as log_file:
+                query_log = QueryLog(log_file)
+                query_log.statements()
+                for call in CALLS:
+                    await call.call(services, fixtures)
+                    captured.append((call, query_log.statements()))
+
+            results = []
+            for call, statements in captured:
+                results.append(
+                    {
+                        "name": call.name,
+                        "statements": [
+                            await check_statement(client, statement, table_rows, args)
+                            for statement in statements
+                        ],
+                    }
+                )
+
+    return {
+        "strict": args.strict,
+        "min_rows": args.min_rows,
+        "table_rows": table_rows,
+        "calls": results,
+    }
+
+
+def failures(call: dict[str, Any]) -> list[str]:
+    """Get the reasons a service call fails the check."""
+    if not call["statements"]:
+        return ["no statements captured"]
+    reasons = []
+    for statement in call["statements"]:
+        if statement["error"] is not None:
+            reasons.append(statement["error"])
+        elif statement["flagged"]:
+            reasons.append(f"seq scan of {', '.join(statement['flagged'])}")
+    return reasons
+
+
+def main():
+    """Main entry point for the query plan check."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--min-rows",
+        type=int,
+        default=10_000,
+        help="Estimated rows from which a table counts as large.",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Turn sequential scans off and flag any that remain.",
+    )
+    parser.add_argument("--output", type=Path, help="Write the plans to this file.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    for call in results["calls"]:
+        flag = "  FAIL" if failures(call) else ""
+        print(f"{call['name']}{flag}")
+        for statement in call["statements"]:
+            status = statement["error"] or ", ".join(statement["seq_scans"]) or "-"
+            print(
+                f"  {statement['execution_ms'] or 0:>8.2f}ms  "
+                f"{_short_sql(statement['sql'])}\n{'':>14}seq scans: {status}"
+            )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, default=str))
+        print(f"\nPlans written to {args.output}")
+
+    failed = {call["name"]: failures(call) for call in results["calls"]}
+    failed = {name: reasons for name, reasons in failed.items() if reasons}
+    if failed:
+        print(f"\n{len(failed)} service calls failed the check:")
+        for name, reasons in failed.items():
+            print(f"  {name}: {'; '.join(reasons)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Replay captured tool calls against a running MCP server.
+
+Reads a capture written with ``TOOL_CAPTURE_FILE`` and re-issues its calls
+over SSE at the original pace, or faster with ``--speed``. Reports the
+replayed round-trip latency per tool next to the server time that was
+captured, and counts the results whose hash differs from the captured one.
+
+Tools that write (create, add, update, delete, send) are skipped unless
+``--include-writes`` is passed.
+
+Usage:
+    TOOL_CAPTURE_FILE=calls.jsonl uv run python main.py     # capture
+    uv run python -m benchmarks.replay calls.jsonl --speed 4 --output replay.json
+    uv run python -m benchmarks.replay calls.jsonl --compare replay.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from fastmcp import Client
+
+from benchmarks.load import is_error, percentile, result_text
+
+WRITE_PREFIXES = ("create_", "add_", "update_", "delete_", "send_")
+
+
+@dataclass
+class ToolStats:
+    """Captured and replayed results of the calls of one tool."""
+
+    captured: list[float] = field(default_factory=list)
+    replayed: list[float] = field(default_factory=list)
+    errors: int = 0
+    mismatches: int = 0
+
+
+def is_write(tool: str) -> bool:
+    """Check if a tool writes, from its name without the server prefix."""
+    name = tool.split("_", 1)[-1]
+    return name.startswith(WRITE_PREFIXES)
+
+
+def load_capture(
+    path: Path, include_writes: bool, limit: int | None
+) -> list[dict[str, Any]]:
+    """Load the captured calls, oldest first."""
+    calls = []
+    with path.open() as file:
+        for line in file:
+            if not line.strip():
+                continue
+            call = json.loads(line)
+            if include_writes or not is_write(call["tool"]):
+                calls.append(call)
+    calls.sort(key=lambda call: call["ts"])
+    return calls[:limit] if limit else calls
+
+
+async def replay_call(client: Client, call: dict[str, Any], stats: ToolStats) -> None:
+    """Issue one captured call and compare its result."""
+    stats.captured.append(call["duration_ms"] / 1000)
+    start_time = time.perf_counter()
+    try:
+        result = await client.call_tool_mcp(call["tool"], call["arguments"])
+    except Exception:
+        stats.errors += 1
+        return
+    stats.replayed.append(time.perf_counter() - start_time)
+
+    if is_error(result):
+        stats.errors += 1
+    expected = call.get("result_sha256")
+    if expected is not None:
+        digest = hashlib.sha256(result_text(result).encode()).hexdigest()
+        if digest != expected:
+            stats.mismatches += 1
+
+
+async def replay(
+    url: str, calls: list[dict[str, Any]], speed: float, clients: int
+) -> tuple[dict[str, ToolStats], float, float]:
+    """Replay the calls on a pool of MCP sessions.
+
+    Each call is issued at its captured offset from the first call, divided
+    by ``speed``, without waiting for earlier calls to finish. A speed of 0
+    issues every call at once.
+
+    Returns:
+        tuple[dict[str, ToolStats], float, float]: The stats per tool, the
+            wall time of the replay and the largest scheduling lag in seconds.
+    """
+    stats: dict[str, ToolStats] = defaultdict(ToolStats)
+    max_lag = 0.0
+
+    sessions = [Client(url) for _ in range(clients)]
+    for session in sessions:
+        await session.__aenter__()
+    try:
+        pool = itertools.cycle(sessions)
+        first_ts = calls[0]["ts"]
+        start_time = time.perf_counter()
+        tasks = []
+        for call in calls:
+            if speed > 0:
+                due = start_time + (call["ts"] - first_ts) / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                max_lag = max(max_lag, time.perf_counter() - due)
+            tasks.append(
+                asyncio.create_task(replay_call(next(pool), call, stats[call["tool"]]))
+            )
+        await asyncio.gather(*tasks)
+        wall_time = time.perf_counter() - start_time
+    finally:
+        for session in sessions:
+            await session.__aexit__(None, None, None)
+
+    return stats, wall_time, max_lag
+
+
+def summarize(stats: ToolStats) -> dict:
+    """Summarize the captured and replayed latencies of a tool in ms."""
+    return {
+        "calls": len(stats.captured),
+        "errors": stats.errors,
+        "mismatches": stats.mismatches,
+        "captured_p50_ms": percentile(stats.captured, 50) * 1000,
+        "captured_p95_ms": percentile(stats.captured, 95) * 1000,
+        "replayed_p50_ms": percentile(stats.replayed, 50) * 1000,
+        "replayed_p95_ms": percentile(stats.replayed, 95) * 1000,
+        "replayed_p99_ms": percentile(stats.replayed, 99) * 1000,
+    }
+
+
+def print_report(results: dict, baseline: dict | None) -> None:
+    """Print the per tool results, with the change against a baseline replay."""
+    header = (
+        f"{'tool':<50} {'calls':>6} {'err':>4} {'diff':>5} "
+        f"{'cap p50':>9} {'p50':>9} {'p95':>9} {'p99':>9}"
+    )
+    if baseline is not None:
+        header += f" {'p50 vs base':>12}"
+    print(header)
+
+    for tool, summary in results["tools"].items():
+        line = (
+            f"{tool:<50} {summary['calls']:>6} {summary['errors']:>4} "
+            f"{summary['mismatches']:>5} {summary['captured_p50_ms']:>7.1f}ms "
+            f"{summary['replayed_p50_ms']:>7.1f}ms "
+            f"{summary['replayed_p95_ms']:>7.1f}ms "
+            f"{summary['replayed_p99_ms']:>7.1f}ms"
+        )
+        before = (baseline or {}).get("tools", {}).get(tool)
+        if before and before["replayed_p50_ms"]:
+            change = (summary["replayed_p50_ms"] / before["replayed_p50_ms"] - 1) * 100
+            line += f" {change:>+11.1f}%"
+        print(line)
+
+    print(
+        f"\n{results['calls']} calls in {results['wall_time_s']:.1f}s "
+        f"(captured span {results['captured_span_s']:.1f}s, speed "
+        f"{results['speed']}x, max lag {results['max_lag_ms']:.1f}ms)"
+    )
+
+
+def main():
+    """Main entry point for the replay benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("capture", type=Path, help="The captured calls (JSONL).")
+    parser.add_argument(
+        "--url", default="http://127.0.0.1:8080/sse", help="The SSE URL of the server."
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Pace multiplier (1 is the original pace, 0 issues all calls at once).",
+    )
+    parser.add_argument(
+        "--clients", type=int, default=8, help="MCP sessions to spread calls over."
+    )
+    parser.add_argument(
+        "--include-writes",
+        action="store_true",
+        help="Also replay the tools that write.",
+    )
+    parser.add_argument("--limit", type=int, help="Replay only the first N calls.")
+    parser.add_argument("--output", type=Path, help="Write the results to this file.")
+    parser.add_argument(
+        "--compare", type=Path, help="Compare with an earlier replay result file."
+    )
+    args = parser.parse_args()
+
+    calls = load_capture(args.capture, args.include_writes, args.limit)
+    if not calls:
+        raise SystemExit("No calls to replay.")
+
+    stats, wall_time, max_lag = asyncio.run(
+        replay(args.url, calls, args.speed, args.clients)
+    )
+    results = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "capture": str(args.capture),
+        "url": args.url,
+        "speed": args.speed,
+        "calls": len(calls),
+        "captured_span_s": calls[-1]["ts"] - calls[0]["ts"],
+        "wall_time_s": wall_time,
+        "max_lag_ms": max_lag * 1000,
+        "tools": {tool: summarize(stats[tool]) for tool in sorted(stats)},
+    }
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(results, baseline)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
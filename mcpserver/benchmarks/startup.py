@@ -0,0 +1,348 @@
+"""
+Startup and import-time benchmark for the MCP server.
+
+Measures, for the current checkout:
+
+- the import time of ``app`` and of each sub-server module (``-X importtime``)
+- the time from process start until the server listens, reports ready on
+  ``/health`` and serves its first successful tool call over SSE
+- the resident memory of the server and its Prisma query engine at idle
+
+The server runs against the database configured in ``.env`` (a local
+Postgres). Results are written to a JSON file that can be compared with the
+results of another commit.
+
+Usage:
+    uv run python -m benchmarks.startup --output startup.json
+    uv run python -m benchmarks.startup --compare main.json --max-regression 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+import psutil
+from fastmcp import Client
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules whose cumulative import time is reported on its own
+TRACKED_MODULES = (
+    "app",
+    "core.db",
+    "tools.catalog",
+    "tools.crm",
+    "tools.erp",
+    "tools.notification",
+    "prisma",
+    "fastmcp",
+    "pydantic",
+    "starlette",
+)
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)$")
+
+
+def measure_imports(top: int) -> dict:
+    """Import ``app`` in a fresh interpreter with ``-X importtime``.
+
+    Args:
+        top: The number of modules with the highest self time to report.
+
+    Returns:
+        dict: The total, per tracked module and top self import times in ms.
+    """
+    env = {**os.environ, "LAZY_MOUNT": "false"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, name = match.groups()
+        modules[name] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+
+    top_self = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)
+    return {
+        "total_ms": modules.get("app", (0.0, 0.0))[1],
+        "modules": {
+            name: modules[name][1] for name in TRACKED_MODULES if name in modules
+        },
+        "top_self": [
+            {"module": name, "self_ms": self_ms, "cumulative_ms": cumulative_ms}
+            for name, (self_ms, cumulative_ms) in top_self[:top]
+        ],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _is_listening(port: int) -> bool:
+    with socket.socket() as sock:
+        sock.settimeout(0.05)
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+
+def _is_ready(port: int) -> bool:
+    try:
+        with urllib.request.urlopen(
+            f"http://127.0.0.1:{port}/health", timeout=1
+        ) as response:
+            return response.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+async def _wait_for(condition, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Server did not start in time")
+        await asyncio.sleep(0.01)
+
+
+async def _first_tool_call(
+    url: str, tool: str, arguments: dict, process: subprocess.Popen, timeout: float
+) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            async with Client(url) as client:
+                await client.call_tool(tool, arguments)
+            return
+        except Exception:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def _rss_mb(pid: int) -> tuple[float, float]:
+    """Get the RSS of a process and of it plus its children, in MB."""
+    process = psutil.Process(pid)
+    rss = process.memory_info().rss
+    children = 0
+    for child in process.children(recursive=True):
+        try:
+            children += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return rss / 2**20, (rss + children) / 2**20
+
+
+async def measure_startup(
+    tool: str, arguments: dict, idle_seconds: float, timeout: float
+) -> dict:
+    """Start the server over SSE and time it until its first tool call.
+
+    Args:
+        tool: The tool to call.
+        arguments: The arguments of the tool call.
+        idle_seconds: How long to let the server idle before reading its memory.
+        timeout: The maximum number of seconds to wait for each step.
+
+    Returns:
+        dict: The startup times in ms and the idle memory in MB.
+    """
+    port = _free_port()
+    env = {**os.environ, "TRANSPORT": "sse", "HOST": "127.0.0.1", "PORT": str(port)}
+
+    start_time = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        await _wait_for(lambda: _is_listening(port), process, timeout)
+        listen_ms = (time.perf_counter() - start_time) * 1000
+
+        await _wait_for(lambda: _is_ready(port), process, timeout)
+        ready_ms = (time.perf_counter() - start_time) * 1000
+
+        await _first_tool_call(
+            f"http://127.0.0.1:{port}/sse", tool, arguments, process, timeout
+        )
+        first_tool_call_ms = (time.perf_counter() - start_time) * 1000
+
+        await asyncio.sleep(idle_seconds)
+        rss_mb, total_rss_mb = _rss_mb(process.pid)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    return {
+        "listen_ms": listen_ms,
+        "ready_ms": ready_ms,
+        "first_tool_call_ms": first_tool_call_ms,
+        "idle_rss_mb": rss_mb,
+        "idle_total_rss_mb": total_rss_mb,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results: dict) -> dict[str, float]:
+    """Get the comparable metrics of a result file as ``{path: value}``."""
+    metrics = {"import.total_ms": results["import"]["total_ms"]}
+    for name, value in results["import"]["modules"].items():
+        metrics[f"import.{name}_ms"] = value
+    for name, value in results["startup"].items():
+        if name != "samples":
+            metrics[f"startup.{name}"] = value
+    return metrics
+
+
+def compare(baseline: dict, current: dict, max_regression: float) -> bool:
+    """Print the change of every metric against a baseline.
+
+    Args:
+        baseline: The baseline results.
+        current: The current results.
+        max_regression: The largest allowed increase, in percent.
+
+    Returns:
+        bool: Whether no metric regressed by more than ``max_regression``.
+    """
+    before, after = flatten(baseline), flatten(current)
+    ok = True
+    print(f"\n{'metric':<40} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, value in after.items():
+        if name not in before:
+            continue
+        change = (value - before[name]) / before[name] * 100 if before[name] else 0.0
+        flag = ""
+        if change > max_regression:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{name:<40} {before[name]:>10.1f} {value:>10.1f} {change:>+7.1f}%{flag}")
+    return ok
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Run the benchmark and aggregate the runs."""
+    imports = measure_imports(args.top)
+
+    samples = []
+    for _ in range(args.runs):
+        samples.append(
+            await measure_startup(
+                args.tool, json.loads(args.arguments), args.idle_seconds, args.timeout
+            )
+        )
+
+    startup = {
+        name: statistics.median(sample[name] for sample in samples)
+        for name in samples[0]
+    }
+    startup["samples"] = samples
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "tool": args.tool,
+        "import": imports,
+        "startup": startup,
+    }
+
+
+def main():
+    """Main entry point for the startup benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Server starts to time.")
+    parser.add_argument(
+        "--tool", default="catalog_get_categories", help="The first tool to call."
+    )
+    parser.add_argument(
+        "--arguments", default="{}", help="The tool arguments, as JSON."
+    )
+    parser.add_argument(
+        "--idle-seconds",
+        type=float,
+        default=2.0,
+        help="Idle time before reading the memory.",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="Timeout of each startup step."
+    )
+    parser.add_argument(
+        "--top", type=int, default=15, help="Modules to list by self import time."
+    )
+    parser.add_argument("--output", type=Path, help="Write the results to this file.")
+    parser.add_argument(
+        "--compare", type=Path, help="Compare with the results in this file."
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=10.0,
+        help="Fail when a metric grows by more than this percentage.",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print(f"import app: {results['import']['total_ms']:.1f}ms")
+    for name, value in results["import"]["modules"].items():
+        print(f"  {name:<30} {value:>8.1f}ms")
+    for name, value in results["startup"].items():
+        if name != "samples":
+            print(f"{name}: {value:.1f}")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if not compare(baseline, results, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
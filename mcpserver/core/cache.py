@@ -0,0 +1,207 @@
+"""
+In-process snapshot cache for slow-changing reference data.
+
+Entries are loaded on demand, expire after a TTL and can be invalidated
+explicitly. Every entity carries a version counter that is bumped whenever
+its snapshot is replaced or invalidated, so consumers can detect changes
+cheaply.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from core.config import settings
+
+logger = logging.getLogger("mcpserver.core.cache")
+
+
+@dataclass
+class CacheEntry:
+    """A cached snapshot of an entity."""
+
+    value: Any
+    version: int
+    loaded_at: float
+
+
+class VersionedCache:
+    """Versioned in-memory snapshot cache with TTL and explicit invalidation."""
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        dependents: dict[str, tuple[str, ...]] | None = None,
+    ):
+        """
+        Args:
+            name: The name of the cache, used in logs and stats.
+            ttl_seconds: How long a snapshot is served before it is reloaded.
+                A value of 0 disables caching.
+            dependents: Entities that embed another entity and must be
+                invalidated with it, e.g. ``{"categories": ("products",)}``.
+        """
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.dependents = dependents or {}
+
+        self._entries: dict[str, CacheEntry] = {}
+        self._versions: dict[str, int] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self, entity: str) -> int:
+        """Get the current version of an entity."""
+        return self._versions.get(entity, 0)
+
+    def _is_fresh(self, entry: CacheEntry) -> bool:
+        return time.monotonic() - entry.loaded_at < self.ttl_seconds
+
+    def peek(self, entity: str) -> Any | None:
+        """Get a fresh snapshot without loading it or touching the counters."""
+        entry = self._entries.get(entity)
+        if entry is None or not self._is_fresh(entry):
+            return None
+        return entry.value
+
+    async def get_or_load(
+        self, entity: str, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Get the snapshot of an entity, loading it on a miss.
+
+        Concurrent misses for the same entity share a single load.
+
+        Args:
+            entity: The entity to get, e.g. ``"products"``.
+            loader: Coroutine function that loads the entity from the database.
+
+        Returns:
+            Any: The cached snapshot.
+        """
+        if self.ttl_seconds <= 0:
+            return await loader()
+
+        entry = self._entries.get(entity)
+        if entry is not None and self._is_fresh(entry):
+            self.hits += 1
+            return entry.value
+
+        lock = self._locks.setdefault(entity, asyncio.Lock())
+        async with lock:
+            # Another task may have loaded the entity while we waited
+            entry = self._entries.get(entity)
+            if entry is not None and self._is_fresh(entry):
+                self.hits += 1
+                return entry.value
+
+            if entry is not None:
+                self.evictions += 1
+
+            self.misses += 1
+            version = self.version(entity)
+            value = await loader()
+
+            # Only store the snapshot if it was not invalidated mid-load
+            if version == self.version(entity):
+                self._versions[entity] = version + 1
+                self._entries[entity] = CacheEntry(
+                    value=value,
+                    version=version + 1,
+                    loaded_at=time.monotonic(),
+                )
+            return value
+
+    def update(self, entity: str, change: Callable[[Any], None]) -> bool:
+        """Apply a change to the snapshot of an entity in place.
+
+        Keeps a snapshot current after a write without reloading it. The
+        version is bumped either way, so a load that started before the write
+        is not stored.
+
+        Args:
+            entity: The entity to update.
+            change: Function that updates the snapshot in place.
+
+        Returns:
+            bool: Whether a fresh snapshot was updated.
+        """
+        version = self.version(entity) + 1
+        self._versions[entity] = version
+
+        entry = self._entries.get(entity)
+        if entry is None or not self._is_fresh(entry):
+            return False
+        change(entry.value)
+        entry.version = version
+        return True
+
+    def invalidate(self, *entities: str) -> list[str]:
+        """Invalidate entities and everything that embeds them.
+
+        Args:
+            entities: The entities to invalidate. Invalidates all when empty.
+
+        Returns:
+            list[str]: The entities that were invalidated.
+        """
+        pending = list(entities) if entities else list(self._versions)
+        invalidated: list[str] = []
+
+        while pending:
+            entity = pending.pop()
+            if entity in invalidated:
+                continue
+            invalidated.append(entity)
+            pending.extend(self.dependents.get(entity, ()))
+
+            self._versions[entity] = self.version(entity) + 1
+            if self._entries.pop(entity, None) is not None:
+                self.evictions += 1
+
+        logger.info("♻️ CACHE: %s | INVALIDATED %s", self.name, invalidated)
+        return invalidated
+
+    def stats(self) -> dict[str, Any]:
+        """Get the hit/miss/eviction counters and entity versions."""
+        return {
+            "name": self.name,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": {
+                entity: {
+                    "version": entry.version,
+                    "age_seconds": round(time.monotonic() - entry.loaded_at, 3),
+                    "fresh": self._is_fresh(entry),
+                }
+                for entity, entry in self._entries.items()
+            },
+            "versions": dict(self._versions),
+        }
+
+
+# Global catalog snapshot cache
+catalog_cache = VersionedCache(
+    name="catalog",
+    ttl_seconds=settings.catalog_cache_ttl,
+    dependents={
+        "categories": ("subcategories", "products"),
+        "subcategories": ("categories", "products"),
+        "promotions": ("products",),
+        "products": ("promotions",),
+    },
+)
+
+# Global per sales rep dashboard cache, kept current by the order writes
+dashboard_cache = VersionedCache(
+    name="dashboards",
+    ttl_seconds=settings.dashboard_cache_ttl,
+)
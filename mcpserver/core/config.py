@@ -38,6 +38,25 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = os.getenv("DATABASE_URL")
+    database_read_replica_url: str | None = None
+    db_pool_size: int | None = None
+    db_pool_timeout: float | None = None
+    db_connect_timeout: float = 10.0
+    db_query_timeout: float | None = None
+    db_statement_timeout_ms: int | None = None
+    db_read_your_writes_seconds: float = 5.0
+    db_coalesce_window_ms: float = 2.0
+
+    # Pagination
+    default_page_size: int = 50
+    max_page_size: int = 200
+
+    # Caching
+    catalog_cache_ttl: float = 300.0
+    dashboard_cache_ttl: float = 300.0
+
+    # Startup
+    lazy_mount: bool = False
 
     # Anthropic
     anthropic_model: str = os.getenv("ANTHROPIC_MODEL")
@@ -2,6 +2,232 @@
 Database client for the application.
 """
 
+import asyncio
+import logging
+import time
+from collections.abc import Hashable
+from datetime import timedelta
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from fastmcp.server.dependencies import get_context
 from prisma import Prisma
 
-prisma = Prisma()
+from core.config import settings
+
+logger = logging.getLogger("mcpserver.core.db")
+
+
+def build_database_url(url: str) -> str:
+    """Apply the pool and timeout settings to a connection string.
+
+    Parameters that are already present in the URL take precedence.
+
+    Args:
+        url: The PostgreSQL connection string.
+
+    Returns:
+        str: The connection string with the pool parameters applied.
+    """
+    params: dict[str, Any] = {
+        "connection_limit": settings.db_pool_size,
+        "pool_timeout": settings.db_pool_timeout,
+        "connect_timeout": settings.db_connect_timeout,
+        "socket_timeout": settings.db_query_timeout,
+    }
+    if settings.db_statement_timeout_ms is not None:
+        params["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    for key, value in params.items():
+        if value is not None:
+            query.setdefault(key, str(value))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def create_client(url: str | None, log_queries: bool = False) -> Prisma:
+    """Create a database client for a connection string.
+
+    Args:
+        url: The PostgreSQL connection string. Falls back to the schema
+            datasource when None.
+        log_queries: Whether the query engine logs every SQL statement it
+            sends, with its parameters, to stdout.
+
+    Returns:
+        Prisma: The configured database client.
+    """
+    http_config = (
+        {"timeout": settings.db_query_timeout} if settings.db_query_timeout else None
+    )
+    return Prisma(
+        datasource={"url": build_database_url(url)} if url else None,
+        connect_timeout=timedelta(seconds=settings.db_connect_timeout),
+        http=http_config,
+        log_queries=log_queries,
+    )
+
+
+prisma = create_client(settings.database_url)
+
+# Read-only client, only when a replica is configured
+prisma_replica = (
+    create_client(settings.database_read_replica_url)
+    if settings.database_read_replica_url
+    else None
+)
+
+
+def current_session_key() -> Hashable | None:
+    """Get a key identifying the MCP session of the current request.
+
+    Returns:
+        Hashable | None: The session key, or None outside of a request.
+    """
+    try:
+        ctx = get_context()
+    except RuntimeError:
+        return None
+    return getattr(ctx, "session_id", None) or id(ctx.session)
+
+
+class DatabaseRouter:
+    """Routes reads to the read replica and writes to the primary.
+
+    A session that wrote recently keeps reading from the primary for a short
+    window so it always sees its own writes despite replication lag.
+    """
+
+    def __init__(
+        self,
+        primary: Prisma,
+        replica: Prisma | None = None,
+        read_your_writes_seconds: float = 5.0,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self._last_writes: dict[Hashable | None, float] = {}
+
+    def _wrote_recently(self, session: Hashable | None) -> bool:
+        last_write = self._last_writes.get(session)
+        if last_write is None:
+            return False
+        if time.monotonic() - last_write < self.read_your_writes_seconds:
+            return True
+        del self._last_writes[session]
+        return False
+
+    def _record_write(self, session: Hashable | None) -> None:
+        now = time.monotonic()
+        self._last_writes[session] = now
+
+        # Forget sessions whose window has long expired
+        if len(self._last_writes) > 1024:
+            self._last_writes = {
+                key: last_write
+                for key, last_write in self._last_writes.items()
+                if now - last_write < self.read_your_writes_seconds
+            }
+
+    def reads_primary(self) -> bool:
+        """Check if the reads of the current session must go to the primary."""
+        return self.replica is not None and self._wrote_recently(current_session_key())
+
+    @property
+    def reader(self) -> Prisma:
+        """Get the client to use for a read-only query."""
+        if self.replica is None:
+            return self.primary
+        if self._wrote_recently(current_session_key()):
+            return self.primary
+        return self.replica
+
+    @property
+    def writer(self) -> Prisma:
+        """Get the client to use for a write, starting the read-your-writes window."""
+        if self.replica is not None:
+            self._record_write(current_session_key())
+        return self.primary
+
+
+database = DatabaseRouter(
+    prisma,
+    prisma_replica,
+    read_your_writes_seconds=settings.db_read_your_writes_seconds,
+)
+
+# Whether the client is connected and warmed up
+_ready = asyncio.Event()
+
+
+def is_ready() -> bool:
+    """Check if the database client is connected and warmed up."""
+    return _ready.is_set()
+
+
+async def connect() -> None:
+    """Connect the database client and warm up the query engine.
+
+    The warm-up issues a round trip plus one representative query per hot
+    model so that the engine and the first pooled connections are primed
+    before the first tool call arrives.
+    """
+    if prisma.is_connected():
+        return
+
+    start_time = time.perf_counter()
+    await prisma.connect()
+    if prisma_replica is not None:
+        await prisma_replica.connect()
+        await prisma_replica.query_raw("SELECT 1")
+    logger.info("Database connected [%.3fs]", time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    await prisma.query_raw("SELECT 1")
+    await asyncio.gather(
+        prisma.product.find_first(),
+        prisma.account.find_first(),
+        prisma.order.find_first(),
+        prisma.user.find_first(),
+    )
+    logger.info("Database warmed up [%.3fs]", time.perf_counter() - start_time)
+
+    _ready.set()
+
+
+async def disconnect() -> None:
+    """Disconnect the database client."""
+    _ready.clear()
+    for client in (prisma, prisma_replica):
+        if client is not None and client.is_connected():
+            await client.disconnect()
+    logger.info("Database connections closed")
+
+
+async def pool_metrics(client: Prisma = prisma) -> dict[str, Any]:
+    """Get the connection pool metrics of a database client.
+
+    Reads the query engine metrics (``metrics`` preview feature) and derives
+    the pool saturation from the busy connections and the pool size.
+
+    Args:
+        client: The database client.
+
+    Returns:
+        dict[str, Any]: The pool gauges and counters, keyed by metric name.
+    """
+    if not client.is_connected():
+        return {"connected": False}
+
+    metrics = await client.get_metrics()
+    values: dict[str, Any] = {"connected": True, "pool_size": settings.db_pool_size}
+    for metric in [*metrics.counters, *metrics.gauges]:
+        values[metric.key] = metric.value
+
+    busy = values.get("prisma_pool_connections_busy")
+    pool_size = settings.db_pool_size or values.get("prisma_pool_connections_open")
+    if busy is not None and pool_size:
+        values["pool_saturation"] = round(busy / pool_size, 3)
+    return values
@@ -0,0 +1,275 @@
+"""
+In-memory n-gram inverted index for fuzzy text search.
+
+Documents are indexed per field as sets of character n-grams. Queries are
+scored by how many of their n-grams a field contains, which tolerates partial
+words without touching the database. Fields that contain the query as a
+substring always match, and words within a small edit distance of a query word
+catch typos and transpositions that share too few n-grams.
+"""
+
+import re
+from collections import defaultdict
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass
+
+_NORMALIZE_RE = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str | None) -> str:
+    """Lowercase a string and collapse punctuation and whitespace."""
+    if not text:
+        return ""
+    return _NORMALIZE_RE.sub(" ", text.lower()).strip()
+
+
+def ngrams(text: str, n: int = 3) -> set[str]:
+    """Get the character n-grams of each word of a normalized string.
+
+    Words are padded so that prefixes and suffixes produce their own grams.
+
+    Args:
+        text: The normalized text.
+        n: The n-gram size.
+
+    Returns:
+        set[str]: The n-grams of the text.
+    """
+    grams: set[str] = set()
+    for word in text.split():
+        padded = f"{' ' * (n - 1)}{word} "
+        grams.update(padded[i : i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Get the edit distance between two strings, counting transpositions.
+
+    Args:
+        a: The first string.
+        b: The second string.
+        limit: The distance above which the exact value does not matter.
+
+    Returns:
+        int: The distance, or ``limit + 1`` when it exceeds the limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    before: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char != other),
+            )
+            if i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == other:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def typo_budget(word: str) -> int:
+    """Get the number of edits a query word tolerates, by its length."""
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+
+@dataclass
+class SearchHit:
+    """A ranked search result."""
+
+    doc_id: Hashable
+    score: float
+    field: str
+
+
+class NGramIndex:
+    """Inverted n-gram index over the text fields of a set of documents."""
+
+    def __init__(self, fields: Iterable[str], n: int = 3):
+        """
+        Args:
+            fields: The names of the fields that are indexed.
+            n: The n-gram size.
+        """
+        self.fields = tuple(fields)
+        self.n = n
+        self._postings: dict[str, dict[str, set[Hashable]]] = {
+            field: defaultdict(set) for field in self.fields
+        }
+        self._words: dict[str, dict[str, set[Hashable]]] = {
+            field: defaultdict(set) for field in self.fields
+        }
+        self._texts: dict[Hashable, dict[str, str]] = {}
+        self._grams: dict[Hashable, dict[str, set[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._texts
+
+    def add(self, doc_id: Hashable, texts: dict[str, str | None]) -> bool:
+        """Add or update a document.
+
+        Args:
+            doc_id: The id of the document.
+            texts: The raw text of each indexed field.
+
+        Returns:
+            bool: Whether the index changed.
+        """
+        normalized = {field: normalize(texts.get(field)) for field in self.fields}
+        if self._texts.get(doc_id) == normalized:
+            return False
+
+        self.remove(doc_id)
+        self._texts[doc_id] = normalized
+        self._grams[doc_id] = {}
+        for field, text in normalized.items():
+            grams = ngrams(text, self.n)
+            self._grams[doc_id][field] = grams
+            postings = self._postings[field]
+            for gram in grams:
+                postings[gram].add(doc_id)
+            words = self._words[field]
+            for word in text.split():
+                words[word].add(doc_id)
+        return True
+
+    def remove(self, doc_id: Hashable) -> bool:
+        """Remove a document.
+
+        Args:
+            doc_id: The id of the document.
+
+        Returns:
+            bool: Whether the document was indexed.
+        """
+        grams_by_field = self._grams.pop(doc_id, None)
+        if grams_by_field is None:
+            return False
+
+        texts = self._texts.pop(doc_id)
+        for field, grams in grams_by_field.items():
+            _discard(self._postings[field], grams, doc_id)
+            _discard(self._words[field], texts[field].split(), doc_id)
+        return True
+
+    def search(
+        self,
+        query: str,
+        fields: Iterable[str] | None = None,
+        limit: int | None = 50,
+        min_score: float = 0.5,
+    ) -> list[SearchHit]:
+        """Search documents by fuzzy matching the query against fields.
+
+        A field matches when it contains the query as a substring, when every
+        query word is within a few edits of one of its words, or when it
+        contains at least ``min_score`` of the query n-grams. Matches score the
+        share of the query n-grams the field contains, blended with the Dice
+        similarity of the two gram sets so that closer matches rank first.
+        Exact substring matches always rank above fuzzy ones.
+
+        Args:
+            query: The search query.
+            fields: The fields to search. Searches every field when None.
+            limit: The maximum number of hits to return.
+            min_score: The minimum share of query n-grams a field must contain
+                when it matches neither the query substring nor its words.
+
+        Returns:
+            list[SearchHit]: The hits, best first.
+        """
+        text = normalize(query)
+        query_grams = ngrams(text, self.n)
+        if not query_grams:
+            return []
+
+        # A field that contains a query word of at least n characters shares
+        # its inner n-grams, so only shorter queries need a full scan
+        scan = all(len(word) < self.n for word in text.split())
+
+        best: dict[Hashable, SearchHit] = {}
+        for field in fields or self.fields:
+            postings = self._postings[field]
+            shared: dict[Hashable, int] = defaultdict(int)
+            for gram in query_grams:
+                for doc_id in postings.get(gram, ()):
+                    shared[doc_id] += 1
+
+            candidates = self._texts if scan else shared
+            contains = {
+                doc_id for doc_id in candidates if text in self._texts[doc_id][field]
+            }
+            typos = self._typo_matches(field, text.split())
+
+            for doc_id in shared.keys() | contains | typos:
+                count = shared.get(doc_id, 0)
+                containment = count / len(query_grams)
+                if (
+                    containment < min_score
+                    and doc_id not in contains
+                    and doc_id not in typos
+                ):
+                    continue
+
+                doc_grams = self._grams[doc_id][field]
+                dice = 2 * count / (len(query_grams) + len(doc_grams))
+                score = 0.8 * containment + 0.2 * dice
+                if doc_id in contains:
+                    score += 1.0
+
+                hit = best.get(doc_id)
+                if hit is None or score > hit.score:
+                    best[doc_id] = SearchHit(doc_id=doc_id, score=score, field=field)
+
+        hits = sorted(best.values(), key=lambda hit: hit.score, reverse=True)
+        return hits[:limit] if limit else hits
+
+    def _typo_matches(self, field: str, words: list[str]) -> set[Hashable]:
+        """Get the documents with a close word for every query word.
+
+        Args:
+            field: The field to match.
+            words: The normalized query words.
+
+        Returns:
+            set[Hashable]: The ids of the matching documents.
+        """
+        vocabulary = self._words[field]
+        matches: set[Hashable] | None = None
+        for word in words:
+            budget = typo_budget(word)
+            docs: set[Hashable] = set()
+            for candidate, doc_ids in vocabulary.items():
+                if candidate.startswith(word) or (
+                    budget and edit_distance(word, candidate, budget) <= budget
+                ):
+                    docs |= doc_ids
+            matches = docs if matches is None else matches & docs
+            if not matches:
+                return set()
+        return matches or set()
+
+
+def _discard(
+    postings: dict[str, set[Hashable]], keys: Iterable[str], doc_id: Hashable
+) -> None:
+    """Remove a document from postings lists, dropping the empty ones."""
+    for key in keys:
+        docs = postings.get(key)
+        if docs is None:
+            continue
+        docs.discard(doc_id)
+        if not docs:
+            del postings[key]
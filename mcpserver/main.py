@@ -4,11 +4,14 @@ Entry point for running the MCP module.
 Usage: uv run main
 """
 
+import asyncio
+import atexit
 import logging
 import sys
 
-from app import mcp
+from app import lifespan, mcp
 from core.config import settings
+from utils.logs import setup_queue_logging
 
 # Configure logging
 logging.basicConfig(
@@ -17,9 +20,25 @@ logging.basicConfig(
     handlers=[logging.StreamHandler(sys.stdout)],
 )
 
+# Write log records from a background thread to keep I/O off the event loop
+log_listener = setup_queue_logging()
+atexit.register(log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
 
+async def serve():
+    """Run the MCP server inside the application lifespan."""
+    transport_kwargs = (
+        {"host": settings.host, "port": settings.port}
+        if settings.transport == "sse"
+        else {}
+    )
+
+    async with lifespan(mcp):
+        await mcp.run_async(transport=settings.transport, **transport_kwargs)
+
+
 def main():
     """Main entry point for the MCP server."""
     try:
@@ -30,11 +49,7 @@ def main():
         if settings.transport == "sse":
             logger.info("Server URL: http://%s:%s", settings.host, settings.port)
 
-        mcp.run(
-            transport=settings.transport,
-            port=settings.port if settings.transport == "sse" else None,
-            host=settings.host if settings.transport == "sse" else None,
-        )
+        asyncio.run(serve())
 
     except KeyboardInterrupt:
         logger.info("Received interrupt signal")
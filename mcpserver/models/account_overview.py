@@ -0,0 +1,65 @@
+"""
+Account overview response models.
+"""
+
+from datetime import datetime
+
+from prisma.enums import OrderStatus, PaymentStatus
+
+from .account import AccountResponse
+from .base import CamelCaseModel
+from .order_stats import OrderTotals
+
+
+class OrderSummary(CamelCaseModel):
+    """
+    Order summary without its account and items.
+    """
+
+    id: int
+    status: OrderStatus | None = None
+    payment_status: PaymentStatus | None = None
+    created_at: datetime
+    item_count: int = 0
+    total: float = 0.0
+
+
+class ActionItemSummary(CamelCaseModel):
+    """
+    Action item summary without its account.
+    """
+
+    id: int
+    user_id: int
+    type: str
+    priority: str
+    title: str
+    due_time: datetime | None = None
+
+
+class AccountInsightSummary(CamelCaseModel):
+    """
+    Account insight summary without its account.
+    """
+
+    id: int
+    account_id: int
+    type: str
+    priority: str
+    title: str
+    description: str
+    confidence: float
+    value: float | None = None
+
+
+class AccountOverview(CamelCaseModel):
+    """
+    An account with its order totals, latest orders, open action items and
+    top insights.
+    """
+
+    account: AccountResponse
+    order_totals: OrderTotals
+    recent_orders: list[OrderSummary] = []
+    open_action_items: list[ActionItemSummary] = []
+    top_insights: list[AccountInsightSummary] = []
@@ -2,9 +2,14 @@
 Base models for API responses with automatic camelCase conversion.
 """
 
+import functools
 import re
+from collections.abc import Callable, Iterable
+from typing import Any, TypeVar
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+
+M = TypeVar("M", bound=BaseModel)
 
 
 def to_camel_case(string: str) -> str:
@@ -52,3 +57,68 @@ class SnakeCaseModel(BaseModel):
         populate_by_name=True,  # Allow both camelCase and snake_case when parsing input
         from_attributes=True,  # Allow creation from ORM objects
     )
+
+
+@functools.cache
+def list_adapter(model: type[M]) -> TypeAdapter[list[M]]:
+    """Get the cached adapter for a list of a response model.
+
+    Building an adapter compiles its validator and serializer, so each model
+    gets one adapter for the lifetime of the process.
+    """
+    return TypeAdapter(list[model])
+
+
+def validate_rows(model: type[M], rows: Iterable[Any]) -> list[M]:
+    """Validate a list of ORM rows into response models in a single call.
+
+    Args:
+        model: The response model.
+        rows: The rows, e.g. Prisma models.
+
+    Returns:
+        list[M]: The response models.
+    """
+    return list_adapter(model).validate_python(rows, from_attributes=True)
+
+
+def row_model(data: Any) -> type[BaseModel] | None:
+    """Get the model of a non-empty list of rows that all share one model.
+
+    Args:
+        data: A tool result.
+
+    Returns:
+        type[BaseModel] | None: The model of the rows, or None if the result is
+            not such a list.
+    """
+    if not isinstance(data, list) or not data:
+        return None
+    model = type(data[0])
+    if not issubclass(model, BaseModel):
+        return None
+    if any(type(row) is not model for row in data):
+        return None
+    return model
+
+
+def dump_rows_json(
+    model: type[M],
+    rows: list[M],
+    by_alias: bool = True,
+    fallback: Callable[[Any], Any] | None = None,
+) -> bytes:
+    """Serialize a list of response models to JSON with the cached adapter.
+
+    The rows are dumped as they are, without being validated again.
+
+    Args:
+        model: The model of the rows.
+        rows: The rows, already instances of the model.
+        by_alias: Whether to use the aliases of the fields.
+        fallback: Called for values that cannot be serialized otherwise.
+
+    Returns:
+        bytes: The JSON array.
+    """
+    return list_adapter(model).dump_json(rows, by_alias=by_alias, fallback=fallback)
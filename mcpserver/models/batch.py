@@ -0,0 +1,18 @@
+"""
+Batch lookup response models.
+"""
+
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class BatchResult(BaseModel, Generic[T]):
+    """
+    Results of a batch lookup, in the order of the requested keys.
+    """
+
+    items: list[T]
+    missing: list[int | str] = []
@@ -0,0 +1,95 @@
+"""
+Compact tabular response models.
+
+A compact page lists its rows as arrays under a single header of column names
+instead of repeating the keys of every row. Nested objects with an id, like a
+territory or a category, are dictionary encoded: the row holds the id and the
+object is listed once under ``refs``.
+"""
+
+import functools
+from typing import Any, get_args
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from models.pagination import Page
+
+
+class CompactPage(BaseModel):
+    """
+    Cursor-paginated page of results in columnar form.
+    """
+
+    columns: list[str]
+    rows: list[list[Any]]
+    refs: dict[str, dict[int, dict[str, Any]]] = {}
+    next_cursor: int | None = None
+    has_more: bool = False
+
+
+def _nested_model(annotation: Any) -> type[BaseModel] | None:
+    """Get the model of a nested field, unwrapping optionals and lists."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        model = _nested_model(arg)
+        if model is not None:
+            return model
+    return None
+
+
+@functools.cache
+def _fields(model: type[BaseModel]) -> tuple[tuple[str, type[BaseModel] | None], ...]:
+    """Get the field names of a response model with their nested models."""
+    return tuple(
+        (name, _nested_model(field.annotation))
+        for name, field in model.model_fields.items()
+    )
+
+
+def _encode(
+    value: dict[str, Any],
+    model: type[BaseModel],
+    refs: dict[str, dict[int, dict[str, Any]]],
+) -> dict[str, Any]:
+    """Project a row onto a response model, moving nested objects to refs."""
+    encoded = {}
+    for name, nested in _fields(model):
+        field_value = value.get(name)
+        if nested is not None and isinstance(field_value, dict):
+            field_value = _encode(field_value, nested, refs)
+            if "id" in field_value:
+                refs.setdefault(name, {})[field_value["id"]] = field_value
+                field_value = field_value["id"]
+        elif nested is not None and isinstance(field_value, list):
+            field_value = [_encode(item, nested, refs) for item in field_value]
+        encoded[name] = field_value
+    return encoded
+
+
+def to_compact(page: Page[Any], model: type[BaseModel]) -> CompactPage:
+    """Turn a page of rows into a compact page.
+
+    Args:
+        page: The page of rows, as Prisma models.
+        model: The response model that defines the columns of the rows and
+            of their nested objects.
+
+    Returns:
+        CompactPage: The page in columnar form.
+    """
+    refs: dict[str, dict[int, dict[str, Any]]] = {}
+    columns = [name for name, _ in _fields(model)]
+    rows = []
+    for item in to_jsonable_python(page.items, by_alias=False):
+        encoded = _encode(item, model, refs)
+        rows.append([encoded[column] for column in columns])
+
+    return CompactPage(
+        columns=columns,
+        rows=rows,
+        refs=refs,
+        next_cursor=page.next_cursor,
+        has_more=page.has_more,
+    )
@@ -0,0 +1,34 @@
+"""
+Sales rep dashboard response models.
+"""
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from .account_overview import AccountInsightSummary, OrderSummary
+
+
+class StatusTotals(BaseModel):
+    """
+    Totals of the orders with one status.
+    """
+
+    order_count: int = 0
+    item_count: int = 0
+    revenue: float = 0.0
+
+
+class SalesRepDashboard(BaseModel):
+    """
+    Summary of the accounts, open action items, orders and top insights of a
+    sales rep.
+    """
+
+    sales_rep_id: int
+    account_count: int = 0
+    open_action_items_by_priority: dict[str, int] = {}
+    order_totals_by_status: dict[str, StatusTotals] = {}
+    recent_orders: list[OrderSummary] = []
+    top_insights: list[AccountInsightSummary] = []
+    loaded_at: datetime
@@ -5,6 +5,7 @@ User route models.
 from datetime import datetime
 
 from prisma.enums import OrderStatus, PaymentStatus
+from pydantic import BaseModel, Field
 
 from .account import AccountResponse
 from .base import CamelCaseModel
@@ -41,4 +42,18 @@ class OrderResponse(CamelCaseModel):
     created_at: datetime
     updated_at: datetime | None = None
     collection_date: datetime | None = None
+    subtotal: float = 0.0
+    item_count: int = 0
+    total: float = 0.0
     items: list[OrderItemResponse] = []
+
+
+class OrderLine(BaseModel):
+    """
+    Line of an order to create. The price is taken from the product and
+    discounted by the promotion, if any.
+    """
+
+    product_id: int
+    quantity: int = Field(gt=0)
+    promotion_id: int | None = None
@@ -0,0 +1,44 @@
+"""
+Order aggregation response models.
+"""
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class OrderTotals(BaseModel):
+    """
+    Totals over a set of orders.
+    """
+
+    order_count: int = 0
+    item_count: int = 0
+    revenue: float = 0.0
+    average_order_value: float = 0.0
+    first_order_at: datetime | None = None
+    last_order_at: datetime | None = None
+
+
+class ProductSales(BaseModel):
+    """
+    Sales of a single product over a set of orders.
+    """
+
+    product_id: int
+    sku: str
+    name: str
+    order_count: int
+    quantity: int
+    revenue: float
+
+
+class PeriodTotals(BaseModel):
+    """
+    Totals of the orders placed in one period.
+    """
+
+    period_start: datetime
+    order_count: int
+    item_count: int
+    revenue: float
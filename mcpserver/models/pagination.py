@@ -0,0 +1,19 @@
+"""
+Pagination response models.
+"""
+
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """
+    Cursor-paginated page of results.
+    """
+
+    items: list[T]
+    next_cursor: int | None = None
+    has_more: bool = False
@@ -0,0 +1,108 @@
+"""
+Backfill or reconcile the stored order totals with the order items.
+
+Usage: uv run python -m scripts.reconcile_order_totals [--dry-run] [--server-url URL]
+
+The sales rep dashboards of a running server are built from the stored totals.
+When any order is repaired, the script invalidates them through the server's
+``POST /cache/dashboards/invalidate`` endpoint.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import urllib.error
+import urllib.request
+
+from core import db
+from core.config import settings
+from services.order import OrderService
+
+logger = logging.getLogger("mcpserver.scripts.reconcile_order_totals")
+
+
+def default_server_url() -> str:
+    """Get the URL of the server from the settings, as seen from this host."""
+    host = "127.0.0.1" if settings.host in ("", "0.0.0.0", "::") else settings.host
+    if ":" in host:
+        host = f"[{host}]"
+    return f"http://{host}:{settings.port}"
+
+
+async def reconcile(dry_run: bool) -> int:
+    """Reconcile the order totals and return the number of drifted orders."""
+    await db.connect()
+    try:
+        return await OrderService(db.database).reconcile_order_totals(dry_run)
+    finally:
+        await db.disconnect()
+
+
+def invalidate_dashboards(server_url: str) -> list[str]:
+    """Invalidate every sales rep dashboard cached by the server.
+
+    Args:
+        server_url: The base URL of the server.
+
+    Returns:
+        list[str]: The dashboards that were invalidated.
+
+    Raises:
+        urllib.error.URLError: If the server cannot be reached.
+    """
+    request = urllib.request.Request(
+        f"{server_url.rstrip('/')}/cache/dashboards/invalidate", method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)["invalidated"]
+
+
+def main():
+    """Main entry point for the reconcile command."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Count the orders whose totals drifted without updating them.",
+    )
+    parser.add_argument(
+        "--server-url",
+        default=None,
+        help="The base URL of the server whose dashboards to invalidate. "
+        "Defaults to HOST and PORT.",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper()),
+        format=settings.log_format,
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+    drifted = asyncio.run(reconcile(args.dry_run))
+    if args.dry_run:
+        logger.info("%d orders have drifted totals", drifted)
+        return
+
+    logger.info("Reconciled the totals of %d orders", drifted)
+    if not drifted:
+        return
+
+    server_url = args.server_url or default_server_url()
+    try:
+        invalidated = invalidate_dashboards(server_url)
+    except (urllib.error.URLError, OSError) as e:
+        logger.error(
+            "Could not invalidate the dashboards of %s: %s. The totals were "
+            "repaired, call POST /cache/dashboards/invalidate on the server.",
+            server_url,
+            e,
+        )
+        sys.exit(1)
+    logger.info("Invalidated %d cached dashboards", len(invalidated))
+
+
+if __name__ == "__main__":
+    main()
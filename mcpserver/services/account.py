@@ -2,7 +2,8 @@
 Account service for interacting with the account.
 """
 
-from prisma import Prisma
+from typing import Any, TypeVar
+
 from prisma.models import Account, AccountInsight, ActionItem
 from prisma.types import (
     AccountInsightWhereInput,
@@ -10,82 +11,251 @@ from prisma.types import (
     ActionItemWhereInput,
 )
 
+from core.db import DatabaseRouter
+from services.query import IncludeProfile, like_pattern, resolve_include
+from utils.logs import track_db_time
+
+T = TypeVar("T", Account, AccountInsight)
+
+ACCOUNT_INCLUDE = {
+    "sales_rep": True,
+    "contact": True,
+    "address": True,
+    "territory": True,
+    "insights": True,
+    "action_items": True,
+    "ordering_pattern": True,
+}
+
+ACCOUNT_PROFILES = {
+    "summary": ["territory"],
+    "standard": ["sales_rep", "contact", "address", "territory", "ordering_pattern"],
+}
+
+ACCOUNT_INSIGHT_INCLUDE = {
+    "account": {
+        "include": {
+            "contact": True,
+            "address": True,
+            "territory": True,
+        },
+    },
+}
+
+ACCOUNT_INSIGHT_PROFILES = {
+    "summary": [],
+    "standard": ["account"],
+}
+
+ACTION_ITEM_INCLUDE = {
+    "account": {
+        "include": {
+            "contact": True,
+            "address": True,
+            "territory": True,
+        },
+    },
+}
+
+ACTION_ITEM_PROFILES = {
+    "summary": [],
+    "standard": ["account"],
+}
+
+# Accounts whose name or description contains the query, or whose name is
+# close to it, most similar first. Both conditions use the trigram indexes.
+ACCOUNT_SEARCH_SQL = """
+SELECT id
+FROM "Account"
+WHERE name ILIKE $2 OR description ILIKE $2 OR $1 <% name
+ORDER BY
+    GREATEST(
+        word_similarity($1, name),
+        word_similarity($1, COALESCE(description, ''))
+    ) DESC,
+    id
+LIMIT $3 OFFSET $4
+"""
+
+# Insights of the accounts matched by name, best account match first
+ACCOUNT_INSIGHT_SEARCH_SQL = """
+SELECT i.id
+FROM "AccountInsight" i
+JOIN "Account" a ON a.id = i.account_id
+WHERE a.name ILIKE $2 OR $1 <% a.name
+ORDER BY word_similarity($1, a.name) DESC, i.confidence DESC, i.id
+LIMIT $3 OFFSET $4
+"""
+
+
+def _in_order(rows: list[T], ids: list[int]) -> list[T]:
+    """Order the rows hydrated by id as the ranked ids."""
+    rows_by_id = {row.id: row for row in rows}
+    return [rows_by_id[id_] for id_ in ids if id_ in rows_by_id]
+
 
 class AccountService:
     """Service for interacting with the account."""
 
-    def __init__(self, db: Prisma):
+    def __init__(self, db: DatabaseRouter):
         self.db = db
 
+    @track_db_time
     async def get_accounts(
-        self, where: AccountWhereInput | None = None
+        self,
+        where: AccountWhereInput | None = None,
+        fields: list[str] | None = None,
+        profile: IncludeProfile = "full",
+        page: dict[str, Any] | None = None,
     ) -> list[Account]:
         """Get the accounts from the CRM.
 
         Args:
             where: The where clause to filter the accounts.
+            fields: The relations to include. Overrides the profile when given.
+            profile: The relations to include when no fields are given.
+            page: The pagination arguments from ``page_args``.
 
         Returns:
             list[Account]: The accounts from the CRM.
         """
 
-        return await self.db.account.find_many(
+        return await self.db.reader.account.find_many(
             where=where,
-            include={
-                "sales_rep": True,
-                "contact": True,
-                "address": True,
-                "territory": True,
-                "insights": True,
-                "action_items": True,
-                "ordering_pattern": True,
-            },
+            include=resolve_include(ACCOUNT_INCLUDE, ACCOUNT_PROFILES, profile, fields),
+            **(page or {}),
+        )
+
+    @track_db_time
+    async def search_accounts(
+        self,
+        query: str,
+        fields: list[str] | None = None,
+        profile: IncludeProfile = "full",
+        page: dict[str, int] | None = None,
+    ) -> list[Account]:
+        """Search the accounts by name and description, most relevant first.
+
+        Matches the accounts whose name or description contains the query,
+        and the accounts whose name is close to it, using the trigram indexes.
+
+        Args:
+            query: The search query.
+            fields: The relations to include. Overrides the profile when given.
+            profile: The relations to include when no fields are given.
+            page: The pagination arguments from ``ranked_page_args``.
+
+        Returns:
+            list[Account]: The matching accounts, most relevant first.
+        """
+        page = page or {}
+        rows = await self.db.reader.query_raw(
+            ACCOUNT_SEARCH_SQL,
+            query,
+            like_pattern(query),
+            page.get("take"),
+            page.get("skip", 0),
+        )
+        ids = [row["id"] for row in rows]
+        if not ids:
+            return []
+
+        accounts = await self.db.reader.account.find_many(
+            where={"id": {"in": ids}},
+            include=resolve_include(ACCOUNT_INCLUDE, ACCOUNT_PROFILES, profile, fields),
         )
+        return _in_order(accounts, ids)
 
+    @track_db_time
     async def get_account_insights(
-        self, where: AccountInsightWhereInput | None = None
+        self,
+        where: AccountInsightWhereInput | None = None,
+        fields: list[str] | None = None,
+        profile: IncludeProfile = "full",
+        page: dict[str, Any] | None = None,
     ) -> list[AccountInsight]:
         """Get the account insights from the CRM.
 
         Args:
             where: The where clause to filter the account insights.
+            fields: The relations to include. Overrides the profile when given.
+            profile: The relations to include when no fields are given.
+            page: The pagination arguments from ``page_args``.
 
         Returns:
             list[AccountInsight]: The account insights from the CRM.
         """
-        return await self.db.accountinsight.find_many(
+        return await self.db.reader.accountinsight.find_many(
             where=where,
-            include={
-                "account": {
-                    "include": {
-                        "contact": True,
-                        "address": True,
-                        "territory": True,
-                    },
-                },
-            },
+            include=resolve_include(
+                ACCOUNT_INSIGHT_INCLUDE, ACCOUNT_INSIGHT_PROFILES, profile, fields
+            ),
+            **(page or {}),
+        )
+
+    @track_db_time
+    async def search_account_insights_by_account_name(
+        self,
+        account_name: str,
+        fields: list[str] | None = None,
+        profile: IncludeProfile = "full",
+        page: dict[str, int] | None = None,
+    ) -> list[AccountInsight]:
+        """Search the account insights by account name, best match first.
+
+        Args:
+            account_name: The account name query.
+            fields: The relations to include. Overrides the profile when given.
+            profile: The relations to include when no fields are given.
+            page: The pagination arguments from ``ranked_page_args``.
+
+        Returns:
+            list[AccountInsight]: The insights of the matching accounts, best
+                account match first and most confident first within an account.
+        """
+        page = page or {}
+        rows = await self.db.reader.query_raw(
+            ACCOUNT_INSIGHT_SEARCH_SQL,
+            account_name,
+            like_pattern(account_name),
+            page.get("take"),
+            page.get("skip", 0),
+        )
+        ids = [row["id"] for row in rows]
+        if not ids:
+            return []
+
+        insights = await self.db.reader.accountinsight.find_many(
+            where={"id": {"in": ids}},
+            include=resolve_include(
+                ACCOUNT_INSIGHT_INCLUDE, ACCOUNT_INSIGHT_PROFILES, profile, fields
+            ),
         )
+        return _in_order(insights, ids)
 
+    @track_db_time
     async def get_action_items(
-        self, where: ActionItemWhereInput | None = None
+        self,
+        where: ActionItemWhereInput | None = None,
+        fields: list[str] | None = None,
+        profile: IncludeProfile = "full",
+        page: dict[str, Any] | None = None,
     ) -> list[ActionItem]:
         """Get the action items from the CRM.
 
         Args:
             where: The where clause to filter the action items.
+            fields: The relations to include. Overrides the profile when given.
+            profile: The relations to include when no fields are given.
+            page: The pagination arguments from ``page_args``.
 
         Returns:
             list[ActionItem]: The action items from the CRM.
         """
-        return await self.db.actionitem.find_many(
+        return await self.db.reader.actionitem.find_many(
             where=where,
-            include={
-                "account": {
-                    "include": {
-                        "contact": True,
-                        "address": True,
-                        "territory": True,
-                    },
-                },
-            },
+            include=resolve_include(
+                ACTION_ITEM_INCLUDE, ACTION_ITEM_PROFILES, profile, fields
+            ),
+            **(page or {}),
         )
@@ -2,55 +2,97 @@
 Product service for interacting with the product catalog.
 """
 
-from prisma import Prisma
+from typing import Any
+
 from prisma.models import Category, Subcategory
 from prisma.types import CategoryWhereInput, SubcategoryWhereInput
 
+from core.db import DatabaseRouter
+from services.query import IncludeProfile, resolve_include
+from utils.logs import track_db_time
+
+CATEGORY_INCLUDE = {
+    "subcategories": True,
+}
+
+CATEGORY_PROFILES = {
+    "summary": [],
+    "standard": ["subcategories"],
+}
+
+SUBCATEGORY_INCLUDE = {
+    "category": True,
+}
+
+SUBCATEGORY_PROFILES = {
+    "summary": [],
+    "standard": ["category"],
+}
+
 
 class CategoryService:
     """Service for interacting with the product catalog."""
 
-    def __init__(self, db: Prisma):
+    def __init__(self, db: DatabaseRouter):
         self.db = db
 
+    @track_db_time
     async def get_categories(
-        self, where: CategoryWhereInput | None = None
+        self,
+        where: CategoryWhereInput | None = None,
+        fields: list[str] | None = None,
+        profile: IncludeProfile = "full",
+        page: dict[str, Any] | None = None,
     ) -> list[Category]:
         """Get the categories from the catalog.
 
         Args:
             where: The where clause to filter the categories.
+            fields: The relations to include. Overrides the profile when given.
+            profile: The relations to include when no fields are given.
+            page: The pagination arguments from ``page_args``.
 
         Returns:
             list[Category]: The categories from the catalog.
         """
 
-        return await self.db.category.find_many(
+        return await self.db.reader.category.find_many(
             where=where,
-            include={
-                "subcategories": True,
-            },
+            include=resolve_include(
+                CATEGORY_INCLUDE, CATEGORY_PROFILES, profile, fields
+            ),
+            **(page or {}),
         )
 
+    @track_db_time
     async def get_subcategories(
-        self, where: SubcategoryWhereInput | None = None
+        self,
+        where: SubcategoryWhereInput | None = None,
+        fields: list[str] | None = None,
+        profile: IncludeProfile = "full",
+        page: dict[str, Any] | None = None,
     ) -> list[Subcategory]:
         """Get the subcategories from the catalog.
 
         Args:
             where: The where clause to filter the subcategories.
+            fields: The relations to include. Overrides the profile when given.
+            profile: The relations to include when no fields are given.
+            page: The pagination arguments from ``page_args``.
 
         Returns:
             list[Subcategory]: The subcategories from the catalog.
         """
 
-        return await self.db.subcategory.find_many(
+        return await self.db.reader.subcategory.find_many(
             where=where,
-            include={
-                "category": True,
-            },
+            include=resolve_include(
+                SUBCATEGORY_INCLUDE, SUBCATEGORY_PROFILES, profile, fields
+            ),
+            **(page or {}),
         )
 
+    @track_db_time
     async def fuzzy_search_by_category(self, category: str) -> list[Category]:
         """Fuzzy search for categories by category name.
 
@@ -61,10 +103,8 @@ class CategoryService:
             list[Category]: The categories from the catalog that match the category.
         """
 
-        return await self.db.category.find_many(
-            include={
-                "subcategories": True,
-            },
+        return await self.db.reader.category.find_many(
+            include=CATEGORY_INCLUDE,
             where={
                 "category": {
                     "name": {
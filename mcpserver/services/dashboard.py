@@ -0,0 +1,167 @@
+"""
+Dashboard service for the per sales rep summaries.
+
+A dashboard is computed once per sales rep and kept in ``dashboard_cache``.
+The order writes of the ``OrderService`` update the cached dashboard of their
+sales rep in place when the dashboard knows the status it counted the order
+under: the order was created by the write, or it is one of the recent orders
+with the same status. Any other order write invalidates the dashboard, since
+the order may have changed status elsewhere and its totals would be applied to
+the wrong status. Other writes made by other processes are picked up when the
+dashboard expires or is invalidated.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+from prisma.enums import OrderStatus
+from prisma.models import Order
+
+from core.cache import dashboard_cache
+from core.db import DatabaseRouter
+from models.account_overview import AccountInsightSummary, OrderSummary
+from models.base import validate_rows
+from models.dashboard import SalesRepDashboard, StatusTotals
+from utils.logs import track_db_time
+
+# Number of recent orders and top insights on a dashboard
+RECENT_ORDERS = 5
+TOP_INSIGHTS = 5
+
+OPEN_ACTION_ITEMS_BY_PRIORITY_SQL = """
+SELECT priority::text AS priority, COUNT(*) AS count
+FROM "ActionItem"
+WHERE user_id = $1 AND NOT completed
+GROUP BY priority
+"""
+
+ORDER_TOTALS_BY_STATUS_SQL = """
+SELECT
+    COALESCE(status::text, 'NONE') AS status,
+    COUNT(*) AS order_count,
+    COALESCE(SUM(item_count), 0) AS item_count,
+    COALESCE(SUM(total), 0) AS revenue
+FROM "Order"
+WHERE sales_rep_id = $1
+GROUP BY 1
+"""
+
+
+def _cache_key(sales_rep_id: int) -> str:
+    return f"sales_rep:{sales_rep_id}"
+
+
+def _status_key(status: OrderStatus | None) -> str:
+    return str(status) if status is not None else "NONE"
+
+
+def record_order_write(
+    order: Order, item_count: int, revenue: float, created: bool = False
+) -> None:
+    """Apply a committed order write to the cached dashboard of its sales rep.
+
+    The change is applied in place when the order was created by the write or
+    is one of the recent orders under the same status. Otherwise the status
+    the dashboard counted the order under is not known, e.g. the order was
+    cancelled elsewhere, so the dashboard is invalidated instead.
+
+    Args:
+        order: The order after the write, with its stored totals.
+        item_count: The change of the item count of the order.
+        revenue: The change of the total of the order.
+        created: Whether the order was created by the write.
+    """
+
+    key = _cache_key(order.sales_rep_id)
+    cached = dashboard_cache.peek(key)
+    if (
+        cached is not None
+        and not created
+        and not any(
+            summary.id == order.id and summary.status == order.status
+            for summary in cached.recent_orders
+        )
+    ):
+        dashboard_cache.invalidate(key)
+        return
+
+    def change(dashboard: SalesRepDashboard) -> None:
+        totals = dashboard.order_totals_by_status.setdefault(
+            _status_key(order.status), StatusTotals()
+        )
+        totals.order_count += int(created)
+        totals.item_count += item_count
+        totals.revenue += revenue
+
+        recent = [
+            summary for summary in dashboard.recent_orders if summary.id != order.id
+        ]
+        if created or len(recent) < len(dashboard.recent_orders):
+            recent.append(OrderSummary.model_validate(order))
+            recent.sort(
+                key=lambda summary: (summary.created_at, summary.id), reverse=True
+            )
+        dashboard.recent_orders = recent[:RECENT_ORDERS]
+
+    dashboard_cache.update(key, change)
+
+
+class DashboardService:
+    """Service for the per sales rep dashboards."""
+
+    def __init__(self, db: DatabaseRouter):
+        self.db = db
+
+    async def get_sales_rep_dashboard(self, sales_rep_id: int) -> SalesRepDashboard:
+        """Get the dashboard of a sales rep, computing it on a cache miss.
+
+        Args:
+            sales_rep_id: The ID of the sales rep.
+
+        Returns:
+            SalesRepDashboard: The dashboard of the sales rep.
+        """
+        return await dashboard_cache.get_or_load(
+            _cache_key(sales_rep_id),
+            lambda: self._load_sales_rep_dashboard(sales_rep_id),
+        )
+
+    @track_db_time
+    async def _load_sales_rep_dashboard(self, sales_rep_id: int) -> SalesRepDashboard:
+        """Compute the dashboard of a sales rep with concurrent queries."""
+        reader = self.db.reader
+        (
+            account_count,
+            action_items,
+            order_totals,
+            recent_orders,
+            insights,
+        ) = await asyncio.gather(
+            reader.account.count(where={"sales_rep_id": sales_rep_id}),
+            reader.query_raw(OPEN_ACTION_ITEMS_BY_PRIORITY_SQL, sales_rep_id),
+            reader.query_raw(ORDER_TOTALS_BY_STATUS_SQL, sales_rep_id),
+            reader.order.find_many(
+                where={"sales_rep_id": sales_rep_id},
+                order={"created_at": "desc"},
+                take=RECENT_ORDERS,
+            ),
+            reader.accountinsight.find_many(
+                where={"account": {"sales_rep_id": sales_rep_id}},
+                order={"confidence": "desc"},
+                take=TOP_INSIGHTS,
+            ),
+        )
+
+        return SalesRepDashboard(
+            sales_rep_id=sales_rep_id,
+            account_count=account_count,
+            open_action_items_by_priority={
+                row["priority"]: row["count"] for row in action_items
+            },
+            order_totals_by_status={
+                row["status"]: StatusTotals.model_validate(row) for row in order_totals
+            },
+            recent_orders=validate_rows(OrderSummary, recent_orders),
+            top_insights=validate_rows(AccountInsightSummary, insights),
+            loaded_at=datetime.now(timezone.utc),
+        )
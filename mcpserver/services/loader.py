@@ -0,0 +1,132 @@
+"""
+Request coalescing for single-row lookups.
+
+Concurrent ``find_unique`` style lookups that arrive within a short window
+are batched into one ``find_many(where id IN ...)`` query, and identical
+lookups that are already in flight share the same result (single-flight).
+
+Batches run in an empty context rather than in the context of whichever
+caller queued first, so no caller's session routing or DB time attribution
+leaks into them. Callers account for their own wait.
+"""
+
+import asyncio
+import contextvars
+import weakref
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+from core.config import settings
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class _LoaderState:
+    """Pending and in-flight lookups of a loader on one event loop."""
+
+    futures: dict = field(default_factory=dict)
+    queue: list = field(default_factory=list)
+    handle: asyncio.Handle | None = None
+    # Strong references to the running batches, which the loop only holds weakly
+    tasks: set = field(default_factory=set)
+
+
+class BatchLoader(Generic[K, V]):
+    """DataLoader-style coalescing of lookups by key."""
+
+    def __init__(
+        self,
+        batch_load: Callable[[list[K]], Awaitable[list[V]]],
+        key: str = "id",
+        window_ms: float | None = None,
+        max_batch_size: int | None = None,
+        bypass: Callable[[], bool] | None = None,
+    ):
+        """
+        Args:
+            batch_load: Loads the rows for a list of keys in one query.
+            key: The attribute of the rows that holds the key.
+            window_ms: How long to wait for more lookups before dispatching.
+            max_batch_size: The maximum number of keys per query.
+            bypass: Checked in the caller's context. When it returns True the
+                lookup is loaded on its own, in the caller's context, e.g. for
+                a session that must read its own writes from the primary.
+        """
+        self.batch_load = batch_load
+        self.key = key
+        self.window = (
+            settings.db_coalesce_window_ms if window_ms is None else window_ms
+        ) / 1000
+        self.max_batch_size = max_batch_size or settings.max_page_size
+        self.bypass = bypass
+
+        # State is kept per event loop since futures cannot cross loops
+        self._states: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, _LoaderState
+        ] = weakref.WeakKeyDictionary()
+
+    def _state(self, loop: asyncio.AbstractEventLoop) -> _LoaderState:
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoaderState()
+        return state
+
+    async def load(self, key: K) -> V | None:
+        """Load the row for a key, coalescing with concurrent lookups.
+
+        Args:
+            key: The key to load.
+
+        Returns:
+            V | None: The row, or None if it does not exist.
+        """
+        if self.bypass is not None and self.bypass():
+            rows = await self.batch_load([key])
+            return next((row for row in rows if getattr(row, self.key) == key), None)
+
+        loop = asyncio.get_running_loop()
+        state = self._state(loop)
+
+        future = state.futures.get(key)
+        if future is None:
+            future = loop.create_future()
+            state.futures[key] = future
+            state.queue.append(key)
+            if state.handle is None:
+                state.handle = loop.call_later(
+                    self.window,
+                    self._dispatch,
+                    state,
+                    context=contextvars.Context(),
+                )
+
+        # Shielded so one cancelled caller does not fail the others
+        return await asyncio.shield(future)
+
+    def _dispatch(self, state: _LoaderState) -> None:
+        keys, state.queue, state.handle = state.queue, [], None
+        for start in range(0, len(keys), self.max_batch_size):
+            task = asyncio.ensure_future(
+                self._resolve(state, keys[start : start + self.max_batch_size])
+            )
+            state.tasks.add(task)
+            task.add_done_callback(state.tasks.discard)
+
+    async def _resolve(self, state: _LoaderState, keys: list[K]) -> None:
+        try:
+            rows = await self.batch_load(keys)
+        except Exception as e:
+            for key in keys:
+                future = state.futures.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        rows_by_key = {getattr(row, self.key): row for row in rows}
+        for key in keys:
+            future = state.futures.pop(key)
+            if not future.done():
+                future.set_result(rows_by_key.get(key))
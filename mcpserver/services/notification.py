@@ -2,31 +2,43 @@
 Notification service for interacting with the notification.
 """
 
-from prisma import Prisma
+from typing import Any
+
 from prisma.models import Email
 from prisma.types import EmailCreateInput, EmailUpdateInput, EmailWhereInput
 
+from core.db import DatabaseRouter
+from utils.logs import track_db_time
+
 
 class NotificationService:
     """Service for interacting with the notification."""
 
-    def __init__(self, db: Prisma):
+    def __init__(self, db: DatabaseRouter):
         self.db = db
 
-    async def get_emails(self, where: EmailWhereInput | None = None) -> list[Email]:
+    @track_db_time
+    async def get_emails(
+        self,
+        where: EmailWhereInput | None = None,
+        page: dict[str, Any] | None = None,
+    ) -> list[Email]:
         """Get the emails from the CRM.
 
         Args:
             where: The where clause to filter the emails.
+            page: The pagination arguments from ``page_args``.
 
         Returns:
             list[Email]: The emails from the CRM.
         """
 
-        return await self.db.email.find_many(
+        return await self.db.reader.email.find_many(
             where=where,
+            **(page or {}),
         )
 
+    @track_db_time
     async def get_email_by_id(self, email_id: int) -> Email | None:
         """Get an email by id.
 
@@ -37,8 +49,9 @@ class NotificationService:
             Email: The email from the CRM.
         """
 
-        return await self.db.email.find_unique(where={"id": email_id})
+        return await self.db.reader.email.find_unique(where={"id": email_id})
 
+    @track_db_time
     async def create_email(self, email: EmailCreateInput) -> Email:
         """Create an email.
 
@@ -49,8 +62,9 @@ class NotificationService:
             Email: The created email.
         """
 
-        return await self.db.email.create(data=email)
+        return await self.db.writer.email.create(data=email)
 
+    @track_db_time
     async def update_email(self, email: EmailUpdateInput) -> Email:
         """Update an email.
 
@@ -61,8 +75,11 @@ class NotificationService:
             Email: The updated email.
         """
 
-        return await self.db.email.update(where={"id": email.get("id")}, data=email)
+        return await self.db.writer.email.update(
+            where={"id": email.get("id")}, data=email
+        )
 
+    @track_db_time
     async def delete_email(self, email_id: int) -> Email:
         """Delete an email.
 
@@ -73,4 +90,4 @@ class NotificationService:
             Email: The deleted email.
         """
 
-        return await self.db.email.delete(where={"id": email_id})
+        return await self.db.writer.email.delete(where={"id": email_id})
@@ -2,8 +2,13 @@
 Order service for interacting with the order.
 """
 
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Literal
+
 from prisma import Prisma
-from prisma.models import Order, OrderItem
+from prisma.enums import OrderStatus, PromotionStatus, PromotionType
+from prisma.models import Order, OrderItem, Promotion
 from prisma.types import (
     OrderCreateInput,
     OrderItemCreateInput,
@@ -12,47 +17,195 @@ from prisma.types import (
     OrderWhereInput,
 )
 
+from core.db import DatabaseRouter
+from models.base import list_adapter
+from models.order import OrderLine
+from models.order_stats import OrderTotals, PeriodTotals, ProductSales
+from services.dashboard import record_order_write
+from services.query import IncludeProfile, resolve_include, resolve_limit
+from utils.logs import track_db_time
+
+ORDER_INCLUDE = {
+    "account": {
+        "include": {
+            "address": True,
+            "contact": True,
+            "territory": True,
+        },
+    },
+    "items": {
+        "include": {
+            "product": {
+                "include": {
+                    "category": True,
+                    "subcategory": True,
+                },
+            },
+            "promotion": True,
+        },
+    },
+}
+
+ORDER_PROFILES = {
+    "summary": [],
+    "standard": ["account"],
+}
+
+ORDER_ITEM_INCLUDE = {
+    "product": True,
+    "promotion": True,
+}
+
+ORDER_ITEM_PROFILES = {
+    "summary": [],
+    "standard": ["product"],
+}
+
+# Order totals recomputed from the order items
+ORDER_ITEM_TOTALS_SQL = """
+    SELECT
+        ord.id,
+        COALESCE(SUM(oi.price * oi.quantity), 0) AS subtotal,
+        COALESCE(SUM(oi.quantity), 0)::int AS item_count,
+        COALESCE(SUM(oi.total), 0) AS total
+    FROM "Order" ord
+    LEFT JOIN "OrderItem" oi ON oi.order_id = ord.id
+    GROUP BY ord.id
+"""
+
+# Whether the stored totals of order ``o`` differ from the recomputed ``t``
+TOTALS_DRIFTED_SQL = """
+    o.item_count <> t.item_count
+    OR ABS(o.subtotal - t.subtotal) > 0.005
+    OR ABS(o.total - t.total) > 0.005
+"""
+
+Period = Literal["day", "week", "month", "quarter", "year"]
+
+
+def line_total(price: float, line: OrderLine, promotion: Promotion | None) -> float:
+    """Get the total of an order line after its promotion.
+
+    A percentage promotion takes its share off the line, a fixed amount
+    promotion takes its amount off each unit, down to zero.
+
+    Args:
+        price: The unit price of the product.
+        line: The line of the order.
+        promotion: The promotion of the line, if any.
+
+    Returns:
+        float: The total of the line.
+
+    Raises:
+        ValueError: If the promotion does not apply to the line.
+    """
+    if promotion is None:
+        return price * line.quantity
+
+    if promotion.product_id != line.product_id:
+        raise ValueError(
+            f"Promotion {promotion.id} does not apply to product {line.product_id}."
+        )
+    if promotion.status != PromotionStatus.ACTIVE:
+        raise ValueError(f"Promotion {promotion.id} is not active.")
+    if promotion.min_quantity is not None and line.quantity < promotion.min_quantity:
+        raise ValueError(
+            f"Promotion {promotion.id} needs a quantity of at least "
+            f"{promotion.min_quantity}."
+        )
+
+    if promotion.type == PromotionType.PERCENTAGE:
+        return price * line.quantity * (1 - min(promotion.discount, 100) / 100)
+    return max(price - promotion.discount, 0) * line.quantity
+
+
+@dataclass(frozen=True)
+class OrderFilters:
+    """Filters of the order aggregation queries.
+
+    Cancelled orders are left out unless a status is given.
+    """
+
+    account_id: int | None = None
+    account_name: str | None = None
+    sales_rep_id: int | None = None
+    start_date: datetime | None = None
+    end_date: datetime | None = None
+    status: OrderStatus | None = None
+
+    def to_sql(self, params: list[Any]) -> str:
+        """Build the WHERE clause over the ``o`` alias of the order table.
+
+        Args:
+            params: The query parameters. The filter values are appended.
+
+        Returns:
+            str: The WHERE clause.
+        """
+
+        def param(value: Any) -> str:
+            params.append(value)
+            return f"${len(params)}"
+
+        conditions = []
+        if self.account_id is not None:
+            conditions.append(f"o.account_id = {param(self.account_id)}")
+        if self.account_name:
+            conditions.append(
+                'o.account_id IN (SELECT id FROM "Account" '
+                f"WHERE name ILIKE '%' || {param(self.account_name)} || '%')"
+            )
+        if self.sales_rep_id is not None:
+            conditions.append(f"o.sales_rep_id = {param(self.sales_rep_id)}")
+        if self.start_date is not None:
+            conditions.append(
+                f"o.created_at >= {param(self.start_date.isoformat())}::timestamp"
+            )
+        if self.end_date is not None:
+            conditions.append(
+                f"o.created_at < {param(self.end_date.isoformat())}::timestamp"
+            )
+        if self.status is not None:
+            conditions.append(f"o.status::text = {param(str(self.status))}")
+        else:
+            conditions.append("o.status IS DISTINCT FROM 'CANCELLED'")
+        return "WHERE " + " AND ".join(conditions)
+
 
 class OrderService:
     """Service for interacting with the order."""
 
-    def __init__(self, db: Prisma):
+    def __init__(self, db: DatabaseRouter):
         self.db = db
 
-    async def get_orders(self, where: OrderWhereInput | None = None) -> list[Order]:
+    @track_db_time
+    async def get_orders(
+        self,
+        where: OrderWhereInput | None = None,
+        fields: list[str] | None = None,
+        profile: IncludeProfile = "full",
+        page: dict[str, Any] | None = None,
+    ) -> list[Order]:
         """Get the orders from the ERP.
 
         Args:
             where: The where clause to filter the orders.
+            fields: The relations to include. Overrides the profile when given.
+            profile: The relations to include when no fields are given.
+            page: The pagination arguments from ``page_args``.
 
         Returns:
             list[Order]: The orders from the ERP.
         """
 
-        return await self.db.order.find_many(
+        return await self.db.reader.order.find_many(
             where=where,
-            include={
-                "account": {
-                    "include": {
-                        "address": True,
-                        "contact": True,
-                        "territory": True,
-                    },
-                },
-                "items": {
-                    "include": {
-                        "product": {
-                            "include": {
-                                "category": True,
-                                "subcategory": True,
-                            },
-                        },
-                        "promotion": True,
-                    },
-                },
-            },
+            include=resolve_include(ORDER_INCLUDE, ORDER_PROFILES, profile, fields),
+            **(page or {}),
         )
 
+    @track_db_time
     async def get_order_by_id(self, order_id: int) -> Order:
         """Get an order from the ERP.
 
@@ -66,30 +219,28 @@ class OrderService:
         print("ORDER ID")
         print(order_id)
 
-        return await self.db.order.find_unique(
+        return await self.db.reader.order.find_unique(
             where={"id": order_id},
-            include={
-                "account": {
-                    "include": {
-                        "address": True,
-                        "contact": True,
-                        "territory": True,
-                    },
-                },
-                "items": {
-                    "include": {
-                        "promotion": True,
-                        "product": {
-                            "include": {
-                                "category": True,
-                                "subcategory": True,
-                            },
-                        },
-                    },
-                },
-            },
+            include=ORDER_INCLUDE,
+        )
+
+    @track_db_time
+    async def get_orders_by_ids(self, order_ids: list[int]) -> list[Order]:
+        """Get the orders from the ERP that match any of the IDs.
+
+        Args:
+            order_ids: The ids of the orders.
+
+        Returns:
+            list[Order]: The orders that were found, in no particular order.
+        """
+
+        return await self.db.reader.order.find_many(
+            where={"id": {"in": order_ids}},
+            include=ORDER_INCLUDE,
         )
 
+    @track_db_time
     async def create_order(self, payload: OrderCreateInput) -> Order:
         """Create an order in the ERP.
 
@@ -102,7 +253,7 @@ class OrderService:
         print("CREATING ORDER")
         print(payload)
         try:
-            return await self.db.order.create(
+            order = await self.db.writer.order.create(
                 data={
                     "account_id": payload.get("account_id"),
                     "sales_rep_id": payload.get("sales_rep_id"),
@@ -121,25 +272,219 @@ class OrderService:
             print(e)
             raise e
 
+        record_order_write(order, item_count=0, revenue=0.0, created=True)
+        return order
+
+    @track_db_time
+    async def create_order_with_items(
+        self, payload: OrderCreateInput, lines: list[OrderLine]
+    ) -> Order:
+        """Create an order and all of its items in one transaction.
+
+        The prices of the products and the promotions of the lines are looked
+        up in a single query each, and the items are inserted with one
+        ``create_many``, so either the whole order is created or nothing is.
+        The subtotal is the sum of the list prices and the total is the sum of
+        the line totals after their promotions (see ``line_total``).
+
+        Args:
+            payload: The payload of the order.
+            lines: The lines of the order.
+
+        Returns:
+            Order: The order from the ERP, with all relations included.
+
+        Raises:
+            ValueError: If there are no lines, a product or promotion does not
+                exist, or a promotion does not apply to its line.
+        """
+        if not lines:
+            raise ValueError("An order needs at least one line.")
+
+        product_ids = list(dict.fromkeys(line.product_id for line in lines))
+        promotion_ids = list(
+            dict.fromkeys(
+                line.promotion_id for line in lines if line.promotion_id is not None
+            )
+        )
+
+        async with self.db.writer.tx() as tx:
+            products = await tx.product.find_many(where={"id": {"in": product_ids}})
+            prices = {product.id: product.price for product in products}
+            missing = [pid for pid in product_ids if pid not in prices]
+            if missing:
+                raise ValueError(f"Products not found: {missing}")
+
+            promotions = {}
+            if promotion_ids:
+                rows = await tx.promotion.find_many(where={"id": {"in": promotion_ids}})
+                promotions = {promotion.id: promotion for promotion in rows}
+                missing = [pid for pid in promotion_ids if pid not in promotions]
+                if missing:
+                    raise ValueError(f"Promotions not found: {missing}")
+
+            items = [
+                {
+                    "product_id": line.product_id,
+                    "quantity": line.quantity,
+                    "price": prices[line.product_id],
+                    "total": line_total(
+                        prices[line.product_id],
+                        line,
+                        promotions.get(line.promotion_id),
+                    ),
+                    "promotion_id": line.promotion_id,
+                }
+                for line in lines
+            ]
+            order = await tx.order.create(
+                data={
+                    "account_id": payload.get("account_id"),
+                    "sales_rep_id": payload.get("sales_rep_id"),
+                    "subtotal": sum(item["price"] * item["quantity"] for item in items),
+                    "item_count": sum(item["quantity"] for item in items),
+                    "total": sum(item["total"] for item in items),
+                },
+            )
+            await tx.orderitem.create_many(
+                data=[{**item, "order_id": order.id} for item in items]
+            )
+            order = await tx.order.find_unique(
+                where={"id": order.id},
+                include=ORDER_INCLUDE,
+            )
+
+        record_order_write(order, order.item_count, order.total, created=True)
+        return order
+
+    @track_db_time
+    async def get_order_totals(self, filters: OrderFilters) -> OrderTotals:
+        """Get the order, item and revenue totals of the matching orders.
+
+        Args:
+            filters: The filters of the orders.
+
+        Returns:
+            OrderTotals: The totals of the orders.
+        """
+        params: list[Any] = []
+        rows = await self.db.reader.query_raw(
+            f"""
+            SELECT
+                COUNT(*) AS order_count,
+                COALESCE(SUM(o.item_count), 0) AS item_count,
+                COALESCE(SUM(o.total), 0) AS revenue,
+                MIN(o.created_at) AS first_order_at,
+                MAX(o.created_at) AS last_order_at
+            FROM "Order" o
+            {filters.to_sql(params)}
+            """,
+            *params,
+        )
+        totals = OrderTotals.model_validate(rows[0])
+        if totals.order_count:
+            totals.average_order_value = totals.revenue / totals.order_count
+        return totals
+
+    @track_db_time
+    async def get_top_products(
+        self,
+        filters: OrderFilters,
+        order_by: Literal["revenue", "quantity"] = "revenue",
+        limit: int | None = None,
+    ) -> list[ProductSales]:
+        """Get the best selling products of the matching orders.
+
+        Args:
+            filters: The filters of the orders.
+            order_by: Rank the products by revenue or by quantity sold.
+            limit: The maximum number of products to return.
+
+        Returns:
+            list[ProductSales]: The products, best selling first.
+        """
+        params: list[Any] = []
+        where = filters.to_sql(params)
+        params.append(resolve_limit(limit))
+        rows = await self.db.reader.query_raw(
+            f"""
+            SELECT
+                p.id AS product_id,
+                p.sku,
+                p.name,
+                COUNT(DISTINCT o.id) AS order_count,
+                SUM(oi.quantity) AS quantity,
+                SUM(oi.total) AS revenue
+            FROM "OrderItem" oi
+            JOIN "Order" o ON o.id = oi.order_id
+            JOIN "Product" p ON p.id = oi.product_id
+            {where}
+            GROUP BY p.id, p.sku, p.name
+            ORDER BY {"revenue" if order_by == "revenue" else "quantity"} DESC, p.id
+            LIMIT ${len(params)}
+            """,
+            *params,
+        )
+        return list_adapter(ProductSales).validate_python(rows)
+
+    @track_db_time
+    async def get_order_totals_by_period(
+        self, filters: OrderFilters, period: Period = "month"
+    ) -> list[PeriodTotals]:
+        """Get the totals of the matching orders per period.
+
+        Args:
+            filters: The filters of the orders.
+            period: The length of the periods.
+
+        Returns:
+            list[PeriodTotals]: The totals of each period with orders, oldest first.
+        """
+        params: list[Any] = [period]
+        rows = await self.db.reader.query_raw(
+            f"""
+            SELECT
+                date_trunc($1, o.created_at) AS period_start,
+                COUNT(*) AS order_count,
+                SUM(o.item_count) AS item_count,
+                SUM(o.total) AS revenue
+            FROM "Order" o
+            {filters.to_sql(params)}
+            GROUP BY 1
+            ORDER BY 1
+            """,
+            *params,
+        )
+        return list_adapter(PeriodTotals).validate_python(rows)
+
+    @track_db_time
     async def get_order_items(
-        self, where: OrderItemWhereInput | None = None
+        self,
+        where: OrderItemWhereInput | None = None,
+        fields: list[str] | None = None,
+        profile: IncludeProfile = "full",
+        page: dict[str, Any] | None = None,
     ) -> list[OrderItem]:
         """Get the order items from the ERP.
 
         Args:
             where: The where clause to filter the order items.
+            fields: The relations to include. Overrides the profile when given.
+            profile: The relations to include when no fields are given.
+            page: The pagination arguments from ``page_args``.
 
         Returns:
             list[OrderItem]: The order items from the ERP.
         """
-        return await self.db.orderitem.find_many(
+        return await self.db.reader.orderitem.find_many(
             where=where,
-            include={
-                "product": True,
-                "promotion": True,
-            },
+            include=resolve_include(
+                ORDER_ITEM_INCLUDE, ORDER_ITEM_PROFILES, profile, fields
+            ),
+            **(page or {}),
         )
 
+    @track_db_time
     async def get_order_item_by_id(self, order_item_id: int) -> OrderItem:
         """Get an order item from the ERP.
 
@@ -149,16 +494,14 @@ class OrderService:
         Returns:
             OrderItem: The order item from the ERP.
         """
-        return await self.db.orderitem.find_unique(
+        return await self.db.reader.orderitem.find_unique(
             where={"id": order_item_id},
-            include={
-                "product": True,
-                "promotion": True,
-            },
+            include=ORDER_ITEM_INCLUDE,
         )
 
+    @track_db_time
     async def create_order_item(self, payload: OrderItemCreateInput) -> OrderItem:
-        """Create an order item in the ERP.
+        """Create an order item in the ERP and add it to the order totals.
 
         Args:
             payload: The payload of the order item.
@@ -168,10 +511,16 @@ class OrderService:
         """
         print("CREATING ORDER ITEM")
         print(payload)
-        return await self.db.orderitem.create(data=payload)
+        async with self.db.writer.tx() as tx:
+            order_item = await tx.orderitem.create(data=payload)
+            order = await self._add_to_order_totals(tx, order_item)
 
+        record_order_write(order, order_item.quantity, order_item.total)
+        return order_item
+
+    @track_db_time
     async def update_order_item(self, payload: OrderItemUpdateInput) -> OrderItem:
-        """Update an order item in the ERP.
+        """Update an order item in the ERP and adjust the order totals.
 
         Args:
             payload: The payload of the order item.
@@ -181,19 +530,98 @@ class OrderService:
         """
         print("UPDATING ORDER ITEM")
         print(payload)
-        return await self.db.orderitem.update(
-            data=payload, where={"id": payload.get("id")}
-        )
+        async with self.db.writer.tx() as tx:
+            previous = await tx.orderitem.find_unique(where={"id": payload.get("id")})
+            order_item = await tx.orderitem.update(
+                data=payload, where={"id": payload.get("id")}
+            )
+            if previous is not None:
+                previous_order = await self._add_to_order_totals(tx, previous, sign=-1)
+            order = await self._add_to_order_totals(tx, order_item)
+
+        if previous is not None:
+            record_order_write(previous_order, -previous.quantity, -previous.total)
+        record_order_write(order, order_item.quantity, order_item.total)
+        return order_item
 
+    @track_db_time
     async def delete_order_item(self, where: OrderItemWhereInput) -> OrderItem:
-        """Delete an order item in the ERP.
+        """Delete an order item in the ERP and remove it from the order totals.
 
         Args:
             where: The where clause to filter the order item.
 
         Returns:
             OrderItem: The order item from the ERP.
+
+        Raises:
+            ValueError: If no order item matches the where clause.
         """
         print("DELETING ORDER ITEM")
         print(where)
-        return await self.db.orderitem.delete(where=where)
+        async with self.db.writer.tx() as tx:
+            order_item = await tx.orderitem.find_first(where=where)
+            if order_item is None:
+                raise ValueError("Order item not found.")
+
+            await tx.orderitem.delete(where={"id": order_item.id})
+            order = await self._add_to_order_totals(tx, order_item, sign=-1)
+
+        record_order_write(order, -order_item.quantity, -order_item.total)
+        return order_item
+
+    @staticmethod
+    async def _add_to_order_totals(
+        tx: Prisma, order_item: OrderItem, sign: int = 1
+    ) -> Order:
+        """Add an order item to, or with a negative sign remove it from, the
+        stored totals of its order.
+
+        Returns:
+            Order: The order with its updated totals.
+        """
+        return await tx.order.update(
+            where={"id": order_item.order_id},
+            data={
+                "subtotal": {
+                    "increment": sign * order_item.price * order_item.quantity
+                },
+                "item_count": {"increment": sign * order_item.quantity},
+                "total": {"increment": sign * order_item.total},
+            },
+        )
+
+    @track_db_time
+    async def reconcile_order_totals(self, dry_run: bool = False) -> int:
+        """Recompute the stored totals of the orders from their items.
+
+        Only the orders whose stored totals drifted are updated. Dashboards
+        cached by a running server are not touched, see
+        ``scripts.reconcile_order_totals``.
+
+        Args:
+            dry_run: Count the drifted orders without updating them.
+
+        Returns:
+            int: The number of orders whose totals drifted.
+        """
+        if dry_run:
+            rows = await self.db.reader.query_raw(
+                f"""
+                SELECT COUNT(*) AS count
+                FROM "Order" o
+                JOIN ({ORDER_ITEM_TOTALS_SQL}) t ON t.id = o.id
+                WHERE {TOTALS_DRIFTED_SQL}
+                """
+            )
+            return int(rows[0]["count"])
+
+        count = await self.db.writer.execute_raw(
+            f"""
+            UPDATE "Order" o
+            SET subtotal = t.subtotal, item_count = t.item_count, total = t.total
+            FROM ({ORDER_ITEM_TOTALS_SQL}) t
+            WHERE t.id = o.id AND ({TOTALS_DRIFTED_SQL})
+            """
+        )
+        return count
@@ -2,41 +2,69 @@
 Product service for interacting with the product catalog.
 """
 
-from prisma import Prisma
+from typing import Any
+
 from prisma.models import Product
 from prisma.types import ProductWhereInput
 
+from core.db import DatabaseRouter
+from services.loader import BatchLoader
+from services.query import IncludeProfile, resolve_include
+from utils.logs import track_db_time
+
+PRODUCT_INCLUDE = {
+    "category": True,
+    "subcategory": True,
+    "promotions": True,
+}
+
+PRODUCT_PROFILES = {
+    "summary": [],
+    "standard": ["category", "subcategory"],
+}
+
 
 class ProductService:
     """Service for interacting with the product catalog."""
 
-    def __init__(self, db: Prisma):
+    def __init__(self, db: DatabaseRouter):
         self.db = db
+        self._product_loader = BatchLoader(
+            self.get_products_by_ids, bypass=db.reads_primary
+        )
 
+    @track_db_time
     async def get_products(
-        self, where: ProductWhereInput | None = None
+        self,
+        where: ProductWhereInput | None = None,
+        fields: list[str] | None = None,
+        profile: IncludeProfile = "full",
+        page: dict[str, Any] | None = None,
     ) -> list[Product]:
         """Get the products from the catalog.
 
         Args:
             where: The where clause to filter the products.
+            fields: The relations to include. Overrides the profile when given.
+            profile: The relations to include when no fields are given.
+            page: The pagination arguments from ``page_args``.
 
         Returns:
             list[Product]: The products from the catalog.
         """
 
-        return await self.db.product.find_many(
-            include={
-                "category": True,
-                "subcategory": True,
-                "promotions": True,
-            },
+        return await self.db.reader.product.find_many(
+            include=resolve_include(PRODUCT_INCLUDE, PRODUCT_PROFILES, profile, fields),
             where=where,
+            **(page or {}),
         )
 
+    @track_db_time
     async def get_product_by_id(self, product_id: int) -> Product:
         """Get the product from the catalog that matches the ID.
 
+        Concurrent lookups are coalesced into a single batched query.
+
         Args:
             product_id: The id of the product.
 
@@ -44,11 +72,36 @@ class ProductService:
             Product: The product from the catalog that matches the ID.
         """
 
-        return await self.db.product.find_unique(
-            where={"id": product_id},
-            include={
-                "category": True,
-                "subcategory": True,
-                "promotions": True,
-            },
+        return await self._product_loader.load(product_id)
+
+    @track_db_time
+    async def get_products_by_ids(self, product_ids: list[int]) -> list[Product]:
+        """Get the products from the catalog that match any of the IDs.
+
+        Args:
+            product_ids: The ids of the products.
+
+        Returns:
+            list[Product]: The products that were found, in no particular order.
+        """
+
+        return await self.db.reader.product.find_many(
+            where={"id": {"in": product_ids}},
+            include=PRODUCT_INCLUDE,
+        )
+
+    @track_db_time
+    async def get_products_by_skus(self, skus: list[str]) -> list[Product]:
+        """Get the products from the catalog that match any of the SKUs.
+
+        Args:
+            skus: The SKUs of the products.
+
+        Returns:
+            list[Product]: The products that were found, in no particular order.
+        """
+
+        return await self.db.reader.product.find_many(
+            where={"sku": {"in": skus}},
+            include=PRODUCT_INCLUDE,
         )
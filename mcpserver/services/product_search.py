@@ -0,0 +1,68 @@
+"""
+Product search service backed by an in-memory n-gram index.
+"""
+
+from prisma.models import Product
+
+from core.search import NGramIndex
+
+
+class ProductSearchService:
+    """Service for fuzzy searching the product catalog in memory."""
+
+    def __init__(self):
+        self.index = NGramIndex(fields=("name", "sku", "category", "subcategory"))
+        self.version: int | None = None
+        self._products: dict[int, Product] = {}
+
+    def sync(self, products: list[Product], version: int | None) -> None:
+        """Bring the index up to date with a catalog snapshot.
+
+        Only products that were added, removed or whose indexed text changed
+        are reindexed.
+
+        Args:
+            products: The products snapshot, with category and subcategory.
+            version: The version of the snapshot, or None if it is unversioned.
+        """
+        if version is not None and version == self.version:
+            return
+
+        current = {product.id: product for product in products}
+        for product_id in self._products.keys() - current.keys():
+            self.index.remove(product_id)
+
+        for product_id, product in current.items():
+            self.index.add(
+                product_id,
+                {
+                    "name": product.name,
+                    "sku": product.sku,
+                    "category": product.category.name if product.category else None,
+                    "subcategory": (
+                        product.subcategory.name if product.subcategory else None
+                    ),
+                },
+            )
+
+        self._products = current
+        self.version = version
+
+    def search(
+        self,
+        query: str,
+        fields: tuple[str, ...],
+        limit: int | None = 50,
+    ) -> list[Product]:
+        """Search products by fuzzy matching the given fields.
+
+        Args:
+            query: The search query.
+            fields: The fields to match, any of name, sku, category, subcategory.
+            limit: The maximum number of products to return.
+
+        Returns:
+            list[Product]: The matching products, best match first.
+        """
+        hits = self.index.search(query, fields=fields, limit=limit)
+        return [self._products[hit.doc_id] for hit in hits]
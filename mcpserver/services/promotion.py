@@ -2,39 +2,69 @@
 Promotion service for interacting with the promotion catalog.
 """
 
-from prisma import Prisma
+from typing import Any
+
 from prisma.models import Promotion
 from prisma.types import PromotionWhereInput
 
+from core.db import DatabaseRouter
+from services.loader import BatchLoader
+from services.query import IncludeProfile, resolve_include
+from utils.logs import track_db_time
+
+PROMOTION_INCLUDE = {
+    "product": True,
+}
+
+PROMOTION_PROFILES = {
+    "summary": [],
+    "standard": ["product"],
+}
+
 
 class PromotionService:
     """Service for interacting with the promotion catalog."""
 
-    def __init__(self, db: Prisma):
+    def __init__(self, db: DatabaseRouter):
         self.db = db
+        self._promotion_loader = BatchLoader(
+            self.get_promotions_by_ids, bypass=db.reads_primary
+        )
 
+    @track_db_time
     async def get_promotions(
-        self, where: PromotionWhereInput | None = None
+        self,
+        where: PromotionWhereInput | None = None,
+        fields: list[str] | None = None,
+        profile: IncludeProfile = "full",
+        page: dict[str, Any] | None = None,
     ) -> list[Promotion]:
         """Get the promotions from the catalog.
 
         Args:
             where: The where clause to filter the promotions.
+            fields: The relations to include. Overrides the profile when given.
+            profile: The relations to include when no fields are given.
+            page: The pagination arguments from ``page_args``.
 
         Returns:
             list[Promotion]: The promotions from the catalog.
         """
 
-        return await self.db.promotion.find_many(
-            include={
-                "product": True,
-            },
+        return await self.db.reader.promotion.find_many(
+            include=resolve_include(
+                PROMOTION_INCLUDE, PROMOTION_PROFILES, profile, fields
+            ),
             where=where,
+            **(page or {}),
         )
 
+    @track_db_time
     async def get_promotion_by_id(self, promotion_id: int) -> Promotion:
         """Get the promotion from the catalog that matches the ID.
 
+        Concurrent lookups are coalesced into a single batched query.
+
         Args:
             promotion_id: The id of the promotion.
 
@@ -42,9 +72,20 @@ class PromotionService:
             Promotion: The promotion from the catalog that matches the ID.
         """
 
-        return await self.db.promotion.find_unique(
-            where={"id": promotion_id},
-            include={
-                "product": True,
-            },
+        return await self._promotion_loader.load(promotion_id)
+
+    @track_db_time
+    async def get_promotions_by_ids(self, promotion_ids: list[int]) -> list[Promotion]:
+        """Get the promotions from the catalog that match any of the IDs.
+
+        Args:
+            promotion_ids: The ids of the promotions.
+
+        Returns:
+            list[Promotion]: The promotions that were found, in no particular order.
+        """
+
+        return await self.db.reader.promotion.find_many(
+            where={"id": {"in": promotion_ids}},
+            include=PROMOTION_INCLUDE,
         )
@@ -0,0 +1,265 @@
+"""
+Query helpers shared by the services for pagination, include projection
+and batch lookups.
+"""
+
+from bisect import bisect_right
+from collections.abc import Hashable
+from operator import attrgetter
+from typing import Any, Literal, TypeVar
+
+from core.config import settings
+from models.batch import BatchResult
+from models.pagination import Page
+
+T = TypeVar("T")
+
+# Named sets of relations to include. Each service maps ``summary`` and
+# ``standard`` to its relations; ``full`` includes all of them.
+IncludeProfile = Literal["summary", "standard", "full"]
+
+
+def resolve_limit(limit: int | None) -> int:
+    """Clamp a requested page size to the configured bounds.
+
+    Args:
+        limit: The requested page size, or None for the default.
+
+    Returns:
+        int: The page size to use.
+    """
+    if limit is None or limit <= 0:
+        return settings.default_page_size
+    return min(limit, settings.max_page_size)
+
+
+def page_args(cursor: int | None, limit: int | None) -> dict[str, Any]:
+    """Build the ``find_many`` arguments for a cursor-paginated query.
+
+    One extra row is requested so that ``to_page`` can tell whether there is
+    a next page without a count query.
+
+    Args:
+        cursor: The id of the last row of the previous page.
+        limit: The requested page size.
+
+    Returns:
+        dict[str, Any]: The take/skip/cursor/order arguments.
+    """
+    args: dict[str, Any] = {
+        "take": resolve_limit(limit) + 1,
+        "order": {"id": "asc"},
+    }
+    if cursor is not None:
+        args["cursor"] = {"id": cursor}
+        args["skip"] = 1
+    return args
+
+
+def to_page(rows: list[T], limit: int | None) -> Page[T]:
+    """Turn the rows fetched with ``page_args`` into a page.
+
+    Args:
+        rows: The rows, including the extra look-ahead row.
+        limit: The requested page size.
+
+    Returns:
+        Page[T]: The page of results.
+    """
+    size = resolve_limit(limit)
+    has_more = len(rows) > size
+    items = rows[:size]
+    return Page(
+        items=items,
+        next_cursor=items[-1].id if has_more else None,
+        has_more=has_more,
+    )
+
+
+def ranked_page_args(cursor: int | None, limit: int | None) -> dict[str, int]:
+    """Build the take/skip arguments for a page of relevance-ranked results.
+
+    Ranked results are not ordered by id, so their cursor is the offset of
+    the next page instead of the id of the last row.
+
+    Args:
+        cursor: The next_cursor of the previous page.
+        limit: The requested page size.
+
+    Returns:
+        dict[str, int]: The take/skip arguments, with one extra look-ahead row.
+    """
+    return {"take": resolve_limit(limit) + 1, "skip": cursor or 0}
+
+
+def to_ranked_page(rows: list[T], cursor: int | None, limit: int | None) -> Page[T]:
+    """Turn the rows fetched with ``ranked_page_args`` into a page.
+
+    Args:
+        rows: The rows, including the extra look-ahead row.
+        cursor: The next_cursor of the previous page.
+        limit: The requested page size.
+
+    Returns:
+        Page[T]: The page of results.
+    """
+    size = resolve_limit(limit)
+    has_more = len(rows) > size
+    return Page(
+        items=rows[:size],
+        next_cursor=(cursor or 0) + size if has_more else None,
+        has_more=has_more,
+    )
+
+
+def like_pattern(query: str) -> str:
+    """Build an ``ILIKE`` pattern that matches the query anywhere in a value.
+
+    Args:
+        query: The search query. ``%``, ``_`` and ``\\`` match themselves.
+
+    Returns:
+        str: The pattern.
+    """
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def paginate_list(rows: list[T], cursor: int | None, limit: int | None) -> Page[T]:
+    """Paginate an in-memory list of rows ordered by id.
+
+    Args:
+        rows: The rows to paginate, sorted by id.
+        cursor: The id of the last row of the previous page.
+        limit: The requested page size.
+
+    Returns:
+        Page[T]: The page of results.
+    """
+    start = 0 if cursor is None else bisect_right(rows, cursor, key=attrgetter("id"))
+    return to_page(rows[start : start + resolve_limit(limit) + 1], limit)
+
+
+def project_include(
+    include: dict[str, Any], fields: list[str] | None
+) -> dict[str, Any]:
+    """Narrow an include to the requested relations.
+
+    Args:
+        include: The full include of the query.
+        fields: The relations to keep. Keeps everything when None.
+
+    Returns:
+        dict[str, Any]: The projected include.
+
+    Raises:
+        ValueError: If a field is not a relation of the include.
+    """
+    if fields is None:
+        return include
+
+    unknown = set(fields) - include.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown fields {sorted(unknown)}. Available fields: {sorted(include)}"
+        )
+    return {field: value for field, value in include.items() if field in fields}
+
+
+def profile_fields(
+    profiles: dict[str, list[str]],
+    profile: IncludeProfile,
+    fields: list[str] | None,
+) -> list[str] | None:
+    """Get the relations to include for a profile.
+
+    Args:
+        profiles: The relations of the ``summary`` and ``standard`` profiles.
+        profile: The requested profile.
+        fields: The requested relations. They take precedence over the profile.
+
+    Returns:
+        list[str] | None: The relations to include, or None for all of them.
+    """
+    if fields is not None or profile == "full":
+        return fields
+    return profiles[profile]
+
+
+def resolve_include(
+    include: dict[str, Any],
+    profiles: dict[str, list[str]],
+    profile: IncludeProfile,
+    fields: list[str] | None,
+) -> dict[str, Any]:
+    """Narrow an include to the relations of a profile or to the requested ones.
+
+    Args:
+        include: The full include of the query.
+        profiles: The relations of the ``summary`` and ``standard`` profiles.
+        profile: The requested profile.
+        fields: The requested relations. They take precedence over the profile.
+
+    Returns:
+        dict[str, Any]: The projected include.
+    """
+    return project_include(include, profile_fields(profiles, profile, fields))
+
+
+def project_rows(
+    rows: list[T], include: dict[str, Any], fields: list[str] | None
+) -> list[T]:
+    """Drop the relations that were not requested from already loaded rows.
+
+    Args:
+        rows: The rows, loaded with the full include.
+        include: The full include the rows were loaded with.
+        fields: The relations to keep. Keeps everything when None.
+
+    Returns:
+        list[T]: The projected rows.
+    """
+    if fields is None:
+        return rows
+
+    dropped = include.keys() - project_include(include, fields).keys()
+    return [row.model_copy(update=dict.fromkeys(dropped)) for row in rows]
+
+
+def unique_keys(keys: list[Hashable]) -> list[Hashable]:
+    """Deduplicate batch lookup keys, keeping their order.
+
+    Args:
+        keys: The requested keys.
+
+    Returns:
+        list[Hashable]: The unique keys.
+
+    Raises:
+        ValueError: If more keys are requested than a page can hold.
+    """
+    unique = list(dict.fromkeys(keys))
+    if len(unique) > settings.max_page_size:
+        raise ValueError(
+            f"Too many keys ({len(unique)}). "
+            f"At most {settings.max_page_size} can be looked up at once."
+        )
+    return unique
+
+
+def to_batch_result(rows: list[T], keys: list[Hashable], key: str) -> BatchResult[T]:
+    """Order the rows of a batch lookup by the requested keys.
+
+    Args:
+        rows: The rows returned by the ``IN`` query.
+        keys: The requested keys, in order.
+        key: The attribute of the rows that holds the key.
+
+    Returns:
+        BatchResult[T]: The rows in key order and the keys that were not found.
+    """
+    rows_by_key = {getattr(row, key): row for row in rows}
+    return BatchResult(
+        items=[rows_by_key[k] for k in keys if k in rows_by_key],
+        missing=[k for k in keys if k not in rows_by_key],
+    )
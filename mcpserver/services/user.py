@@ -2,38 +2,66 @@
 User service for getting users.
 """
 
-from prisma import Prisma
+from typing import Any
+
 from prisma.models import User
 from prisma.types import UserWhereInput
 
+from core.db import DatabaseRouter
+from services.loader import BatchLoader
+from services.query import IncludeProfile, resolve_include
+from utils.logs import track_db_time
+
+USER_INCLUDE = {
+    "territory": True,
+    "chat_sessions": True,
+}
+
+USER_PROFILES = {
+    "summary": ["territory"],
+    "standard": ["territory"],
+}
+
 
 class UserService:
     """Service for getting users."""
 
-    def __init__(self, db: Prisma):
+    def __init__(self, db: DatabaseRouter):
         self.db = db
+        self._user_loader = BatchLoader(self.get_users_by_ids, bypass=db.reads_primary)
 
-    async def get_users(self, where: UserWhereInput | None = None) -> list[User]:
+    @track_db_time
+    async def get_users(
+        self,
+        where: UserWhereInput | None = None,
+        fields: list[str] | None = None,
+        profile: IncludeProfile = "full",
+        page: dict[str, Any] | None = None,
+    ) -> list[User]:
         """Get all users.
 
         Args:
             where: The where clause to filter the users.
+            fields: The relations to include. Overrides the profile when given.
+            profile: The relations to include when no fields are given.
+            page: The pagination arguments from ``page_args``.
 
         Returns:
             User: The user.
         """
 
-        return await self.db.user.find_many(
+        return await self.db.reader.user.find_many(
             where=where,
-            include={
-                "territory": True,
-                "chat_sessions": True,
-            },
+            include=resolve_include(USER_INCLUDE, USER_PROFILES, profile, fields),
+            **(page or {}),
         )
 
+    @track_db_time
     async def get_user_by_id(self, user_id: int) -> User:
         """Get a user by ID.
 
+        Concurrent lookups are coalesced into a single batched query.
+
         Args:
             id: The ID of the user.
 
@@ -41,10 +69,21 @@ class UserService:
             User: The user.
         """
 
-        return await self.db.user.find_unique(
-            where={
-                "id": user_id,
-            },
+        return await self._user_loader.load(user_id)
+
+    @track_db_time
+    async def get_users_by_ids(self, user_ids: list[int]) -> list[User]:
+        """Get the users that match any of the IDs.
+
+        Args:
+            user_ids: The IDs of the users.
+
+        Returns:
+            list[User]: The users that were found, in no particular order.
+        """
+
+        return await self.db.reader.user.find_many(
+            where={"id": {"in": user_ids}},
             include={
                 "territory": True,
             },
@@ -0,0 +1,20 @@
+"""
+Shared test setup.
+
+The settings are read from the environment when ``core.config`` is imported,
+so defaults for the required ones are set before any test module imports it.
+"""
+
+import os
+
+for name, value in {
+    "TRANSPORT": "sse",
+    "HOST": "127.0.0.1",
+    "PORT": "8080",
+    "DATABASE_URL": "postgresql://pg:pg@localhost:5432/test",
+    "ANTHROPIC_MODEL": "test",
+    "ANTHROPIC_CHEAP_MODEL": "test",
+    "ANTHROPIC_API_KEY": "test",
+    "ANTHROPIC_MAX_TOKENS": "1024",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,197 @@
+"""
+Tests for the versioned snapshot cache.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from core import cache
+from core.cache import VersionedCache
+
+
+class Clock:
+    """Controllable replacement for ``time.monotonic``."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    # Patch the module reference only, the event loop keeps the real clock
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def counting_loader(value="snapshot"):
+    calls = []
+
+    async def load():
+        calls.append(value)
+        return value
+
+    return load, calls
+
+
+def test_get_or_load_caches_until_ttl(clock):
+    store = VersionedCache("test", ttl_seconds=10)
+    load, calls = counting_loader()
+
+    assert asyncio.run(store.get_or_load("products", load)) == "snapshot"
+    assert asyncio.run(store.get_or_load("products", load)) == "snapshot"
+    assert len(calls) == 1
+    assert (store.hits, store.misses, store.evictions) == (1, 1, 0)
+    assert store.version("products") == 1
+
+    clock.now += 10
+    asyncio.run(store.get_or_load("products", load))
+    assert len(calls) == 2
+    assert (store.misses, store.evictions) == (2, 1)
+    assert store.version("products") == 2
+
+
+def test_zero_ttl_disables_caching():
+    store = VersionedCache("test", ttl_seconds=0)
+    load, calls = counting_loader()
+
+    asyncio.run(store.get_or_load("products", load))
+    asyncio.run(store.get_or_load("products", load))
+    assert len(calls) == 2
+    assert store.peek("products") is None
+    assert store.version("products") == 0
+
+
+def test_concurrent_misses_share_one_load():
+    store = VersionedCache("test", ttl_seconds=10)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "snapshot"
+
+    async def main():
+        return await asyncio.gather(
+            *(store.get_or_load("products", load) for _ in range(5))
+        )
+
+    assert asyncio.run(main()) == ["snapshot"] * 5
+    assert len(calls) == 1
+    assert (store.hits, store.misses) == (4, 1)
+
+
+def test_invalidate_bumps_version_and_evicts():
+    store = VersionedCache("test", ttl_seconds=10)
+    load, calls = counting_loader()
+    asyncio.run(store.get_or_load("products", load))
+
+    assert store.invalidate("products") == ["products"]
+    assert store.version("products") == 2
+    assert store.peek("products") is None
+    assert store.evictions == 1
+
+    asyncio.run(store.get_or_load("products", load))
+    assert len(calls) == 2
+    assert store.version("products") == 3
+
+
+def test_invalidate_cascades_to_dependents():
+    store = VersionedCache(
+        "test",
+        ttl_seconds=10,
+        dependents={
+            "categories": ("subcategories", "products"),
+            "subcategories": ("categories", "products"),
+            "products": ("promotions",),
+            "promotions": ("products",),
+        },
+    )
+    for entity in ("categories", "subcategories", "products", "promotions"):
+        load, _ = counting_loader(entity)
+        asyncio.run(store.get_or_load(entity, load))
+
+    invalidated = store.invalidate("categories")
+
+    # Cycles between dependents are followed once
+    assert sorted(invalidated) == [
+        "categories",
+        "products",
+        "promotions",
+        "subcategories",
+    ]
+    assert len(invalidated) == 4
+    assert all(store.version(entity) == 2 for entity in invalidated)
+
+
+def test_invalidate_leaves_unrelated_entities():
+    store = VersionedCache("test", ttl_seconds=10, dependents={"promotions": ()})
+    for entity in ("categories", "promotions"):
+        load, _ = counting_loader(entity)
+        asyncio.run(store.get_or_load(entity, load))
+
+    store.invalidate("promotions")
+    assert store.peek("categories") == "categories"
+    assert store.version("categories") == 1
+
+
+def test_invalidate_without_entities_invalidates_all():
+    store = VersionedCache("test", ttl_seconds=10)
+    for entity in ("categories", "products"):
+        load, _ = counting_loader(entity)
+        asyncio.run(store.get_or_load(entity, load))
+
+    assert sorted(store.invalidate()) == ["categories", "products"]
+    assert store.peek("categories") is None
+    assert store.peek("products") is None
+
+
+def test_load_invalidated_midway_is_not_stored():
+    store = VersionedCache("test", ttl_seconds=10)
+
+    async def load():
+        store.invalidate("products")
+        return "stale"
+
+    assert asyncio.run(store.get_or_load("products", load)) == "stale"
+    assert store.peek("products") is None
+
+    fresh, _ = counting_loader("fresh")
+    assert asyncio.run(store.get_or_load("products", fresh)) == "fresh"
+
+
+def test_update_changes_fresh_snapshot_in_place():
+    store = VersionedCache("test", ttl_seconds=10)
+
+    async def load():
+        return {"count": 1}
+
+    asyncio.run(store.get_or_load("dashboard", load))
+    assert store.update("dashboard", lambda snapshot: snapshot.update(count=2))
+    assert store.peek("dashboard") == {"count": 2}
+    assert store.version("dashboard") == 2
+
+
+def test_update_without_fresh_snapshot_only_bumps_version():
+    store = VersionedCache("test", ttl_seconds=10)
+    changes = []
+
+    assert not store.update("dashboard", changes.append)
+    assert changes == []
+    assert store.version("dashboard") == 1
+
+
+def test_update_during_load_discards_the_load():
+    store = VersionedCache("test", ttl_seconds=10)
+
+    async def load():
+        store.update("dashboard", lambda snapshot: None)
+        return {"count": 1}
+
+    asyncio.run(store.get_or_load("dashboard", load))
+    assert store.peek("dashboard") is None
@@ -0,0 +1,96 @@
+"""
+Tests for the compact columnar page encoding.
+"""
+
+from pydantic import BaseModel
+
+from models.compact import to_compact
+from models.pagination import Page
+
+
+class Region(BaseModel):
+    id: int
+    name: str
+
+
+class Territory(BaseModel):
+    id: int
+    name: str
+    region: Region | None = None
+
+
+class Contact(BaseModel):
+    name: str
+
+
+class AccountResponse(BaseModel):
+    id: int
+    name: str
+    territory: Territory | None = None
+    contacts: list[Contact] | None = None
+
+
+class Account(AccountResponse):
+    """Stands in for the Prisma model, which has more fields than the response."""
+
+    description: str = "internal"
+
+
+def account(id: int, territory: Territory | None, **kwargs) -> Account:
+    return Account(id=id, name=f"Account {id}", territory=territory, **kwargs)
+
+
+NORTH = Territory(id=10, name="North", region=Region(id=100, name="EMEA"))
+SOUTH = Territory(id=20, name="South")
+
+
+def test_rows_follow_the_response_columns():
+    page = to_compact(
+        Page(items=[account(1, None)], next_cursor=1, has_more=True),
+        AccountResponse,
+    )
+
+    assert page.columns == ["id", "name", "territory", "contacts"]
+    assert page.rows == [[1, "Account 1", None, None]]
+    assert page.refs == {}
+    assert (page.next_cursor, page.has_more) == (1, True)
+
+
+def test_nested_objects_are_listed_once_under_refs():
+    page = to_compact(
+        Page(items=[account(1, NORTH), account(2, SOUTH), account(3, NORTH)]),
+        AccountResponse,
+    )
+
+    assert [row[2] for row in page.rows] == [10, 20, 10]
+    assert page.refs["territory"] == {
+        10: {"id": 10, "name": "North", "region": 100},
+        20: {"id": 20, "name": "South", "region": None},
+    }
+    # Objects nested in refs are encoded as refs too
+    assert page.refs["region"] == {100: {"id": 100, "name": "EMEA"}}
+
+
+def test_lists_are_projected_inline():
+    page = to_compact(
+        Page(items=[account(1, None, contacts=[Contact(name="Ada")])]),
+        AccountResponse,
+    )
+
+    assert page.rows[0][3] == [{"name": "Ada"}]
+    assert "contacts" not in page.refs
+
+
+def test_fields_outside_the_response_model_are_dropped():
+    page = to_compact(Page(items=[account(1, SOUTH)]), AccountResponse)
+
+    assert "description" not in page.columns
+    assert len(page.rows[0]) == len(page.columns)
+
+
+def test_empty_page():
+    page = to_compact(Page(items=[]), AccountResponse)
+
+    assert page.rows == []
+    assert page.refs == {}
+    assert page.has_more is False
@@ -0,0 +1,156 @@
+"""
+Tests for coalescing lookups with the batch loader.
+"""
+
+import asyncio
+import contextvars
+from types import SimpleNamespace
+
+import pytest
+
+from services.loader import BatchLoader
+
+session = contextvars.ContextVar("session", default=None)
+
+
+class Source:
+    """Batch load function that records the batches it was called with."""
+
+    def __init__(self, *ids: int, delay: float = 0, error: Exception | None = None):
+        self.rows = {id: SimpleNamespace(id=id) for id in ids}
+        self.delay = delay
+        self.error = error
+        self.batches: list[list[int]] = []
+        self.sessions: list[str | None] = []
+
+    async def __call__(self, keys: list[int]) -> list[SimpleNamespace]:
+        self.batches.append(keys)
+        self.sessions.append(session.get())
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        # In no particular order, like an IN query
+        return [self.rows[key] for key in reversed(keys) if key in self.rows]
+
+
+def test_concurrent_lookups_share_one_batch():
+    source = Source(1, 2, 3)
+    loader = BatchLoader(source, window_ms=1)
+
+    async def main():
+        return await asyncio.gather(*(loader.load(key) for key in (1, 2, 3)))
+
+    assert [row.id for row in asyncio.run(main())] == [1, 2, 3]
+    assert source.batches == [[1, 2, 3]]
+
+
+def test_duplicate_lookups_are_deduplicated():
+    source = Source(1, 2, delay=0.01)
+    loader = BatchLoader(source, window_ms=1)
+
+    async def main():
+        first = asyncio.ensure_future(loader.load(1))
+        await asyncio.sleep(0.005)
+        # Joins the batch that is already in flight
+        return await asyncio.gather(first, loader.load(1), loader.load(2))
+
+    first, second, other = asyncio.run(main())
+    assert first is second
+    assert other.id == 2
+    assert source.batches == [[1], [2]]
+
+
+def test_missing_keys_load_none():
+    source = Source(1)
+    loader = BatchLoader(source, window_ms=0)
+
+    async def main():
+        return await asyncio.gather(loader.load(1), loader.load(404))
+
+    found, missing = asyncio.run(main())
+    assert found.id == 1
+    assert missing is None
+
+
+def test_batches_are_split_by_max_batch_size():
+    source = Source(*range(5))
+    loader = BatchLoader(source, window_ms=0, max_batch_size=2)
+
+    async def main():
+        return await asyncio.gather(*(loader.load(key) for key in range(5)))
+
+    assert [row.id for row in asyncio.run(main())] == list(range(5))
+    assert source.batches == [[0, 1], [2, 3], [4]]
+
+
+def test_cancelled_caller_does_not_fail_the_others():
+    source = Source(1, delay=0.01)
+    loader = BatchLoader(source, window_ms=0)
+
+    async def main():
+        cancelled = asyncio.ensure_future(loader.load(1))
+        waiting = asyncio.ensure_future(loader.load(1))
+        await asyncio.sleep(0.005)
+        cancelled.cancel()
+        row = await waiting
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return row
+
+    assert asyncio.run(main()).id == 1
+    assert source.batches == [[1]]
+
+
+def test_errors_reach_every_caller_and_are_not_cached():
+    source = Source(1, 2, error=RuntimeError("connection lost"))
+    loader = BatchLoader(source, window_ms=0)
+
+    async def main():
+        results = await asyncio.gather(
+            loader.load(1), loader.load(2), return_exceptions=True
+        )
+        source.error = None
+        return results, await loader.load(1)
+
+    results, retried = asyncio.run(main())
+    assert [str(result) for result in results] == ["connection lost"] * 2
+    assert retried.id == 1
+    assert source.batches == [[1, 2], [1]]
+
+
+def test_batches_run_outside_the_callers_context():
+    source = Source(1, 2)
+    loader = BatchLoader(source, window_ms=0)
+
+    async def lookup(key: int, name: str):
+        session.set(name)
+        return await loader.load(key)
+
+    async def main():
+        await asyncio.gather(lookup(1, "first"), lookup(2, "second"))
+
+    asyncio.run(main())
+    assert source.batches == [[1, 2]]
+    assert source.sessions == [None]
+
+
+def test_bypass_loads_alone_in_the_callers_context():
+    source = Source(1, 2)
+    loader = BatchLoader(source, window_ms=0, bypass=lambda: session.get() == "primary")
+
+    async def lookup(key: int, name: str | None):
+        session.set(name)
+        return await loader.load(key)
+
+    async def main():
+        return await asyncio.gather(
+            lookup(1, "primary"), lookup(2, None), lookup(3, "primary")
+        )
+
+    first, second, missing = asyncio.run(main())
+    assert (first.id, second.id, missing) == (1, 2, None)
+    assert sorted(zip(source.batches, source.sessions, strict=True)) == [
+        ([1], "primary"),
+        ([2], None),
+        ([3], "primary"),
+    ]
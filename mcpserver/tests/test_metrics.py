@@ -0,0 +1,76 @@
+"""
+Tests for rendering metrics in the Prometheus text format.
+"""
+
+import pytest
+
+from utils import metrics as metrics_module
+from utils.metrics import MetricsRegistry, process_counters, process_gauges
+
+
+@pytest.fixture(autouse=True)
+def no_process_metrics(monkeypatch):
+    monkeypatch.setattr(metrics_module, "process_gauges", dict)
+    monkeypatch.setattr(metrics_module, "process_counters", dict)
+
+
+def test_counter_renders_help_type_and_labelled_samples():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls.", ("tool", "status"))
+    calls.inc("crm_get_accounts", "ok")
+    calls.inc("crm_get_accounts", "ok")
+    calls.inc("catalog_get_products", "error", amount=0.5)
+
+    assert registry.render().splitlines() == [
+        "# HELP calls_total Calls.",
+        "# TYPE calls_total counter",
+        'calls_total{tool="catalog_get_products",status="error"} 0.5',
+        'calls_total{tool="crm_get_accounts",status="ok"} 2',
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    errors = registry.counter("errors_total", "Errors.", ("error",))
+    errors.inc('bad "quote"\\\n')
+
+    assert registry.render().splitlines()[-1] == (
+        'errors_total{error="bad \\"quote\\"\\\\\\n"} 1'
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    duration = registry.histogram("duration_seconds", "Time.", ("tool",), (0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        duration.observe(value, "t")
+
+    assert registry.render().splitlines()[2:] == [
+        'duration_seconds_bucket{tool="t",le="0.1"} 2',
+        'duration_seconds_bucket{tool="t",le="1"} 3',
+        'duration_seconds_bucket{tool="t",le="+Inf"} 4',
+        'duration_seconds_sum{tool="t"} 3.65',
+        'duration_seconds_count{tool="t"} 4',
+    ]
+
+
+def test_collected_gauges_and_counters_keep_their_types():
+    text = MetricsRegistry().render(
+        gauges={"entries": ("Cached entries.", 3), "unknown": ("Skipped.", None)},
+        counters={"hits_total": ("Cache hits.", 7)},
+    )
+
+    assert text.splitlines() == [
+        "# HELP entries Cached entries.",
+        "# TYPE entries gauge",
+        "entries 3",
+        "# HELP hits_total Cache hits.",
+        "# TYPE hits_total counter",
+        "hits_total 7",
+    ]
+    assert text.endswith("\n")
+
+
+def test_process_metrics_are_collected():
+    assert "process_resident_memory_bytes" in process_gauges()
+    assert "process_cpu_seconds_total" in process_counters()
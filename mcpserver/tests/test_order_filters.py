@@ -0,0 +1,78 @@
+"""
+Tests for the WHERE clause of the order aggregation queries.
+"""
+
+from datetime import datetime
+
+import pytest
+
+# The services import the generated Prisma client (``prisma generate``)
+pytest.importorskip("prisma.models")
+
+from prisma.enums import OrderStatus  # noqa: E402
+
+from services.order import OrderFilters  # noqa: E402
+
+
+def test_no_filters_leave_out_cancelled_orders():
+    params = []
+
+    assert OrderFilters().to_sql(params) == (
+        "WHERE o.status IS DISTINCT FROM 'CANCELLED'"
+    )
+    assert params == []
+
+
+def test_filters_are_parameterized_in_order():
+    params = []
+    filters = OrderFilters(
+        account_id=1,
+        account_name="acme",
+        sales_rep_id=2,
+        start_date=datetime(2025, 1, 1),
+        end_date=datetime(2025, 2, 1),
+        status=OrderStatus.SHIPPED,
+    )
+
+    assert filters.to_sql(params) == (
+        "WHERE o.account_id = $1"
+        ' AND o.account_id IN (SELECT id FROM "Account"'
+        " WHERE name ILIKE '%' || $2 || '%')"
+        " AND o.sales_rep_id = $3"
+        " AND o.created_at >= $4::timestamp"
+        " AND o.created_at < $5::timestamp"
+        " AND o.status::text = $6"
+    )
+    assert params == [
+        1,
+        "acme",
+        2,
+        "2025-01-01T00:00:00",
+        "2025-02-01T00:00:00",
+        "SHIPPED",
+    ]
+
+
+def test_placeholders_continue_after_existing_params():
+    params = ["already bound"]
+
+    assert OrderFilters(sales_rep_id=3).to_sql(params) == (
+        "WHERE o.sales_rep_id = $2 AND o.status IS DISTINCT FROM 'CANCELLED'"
+    )
+    assert params == ["already bound", 3]
+
+
+def test_empty_account_name_is_ignored():
+    params = []
+
+    assert "ILIKE" not in OrderFilters(account_name="").to_sql(params)
+    assert params == []
+
+
+def test_status_filter_includes_cancelled_orders():
+    params = []
+
+    assert OrderFilters(status=OrderStatus.CANCELLED).to_sql(params) == (
+        "WHERE o.status::text = $1"
+    )
+    assert params == ["CANCELLED"]
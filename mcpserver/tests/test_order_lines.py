@@ -0,0 +1,58 @@
+"""
+Tests for pricing order lines with their promotions.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+# The services import the generated Prisma client (``prisma generate``)
+pytest.importorskip("prisma.models")
+
+from prisma.enums import PromotionStatus, PromotionType  # noqa: E402
+
+from models.order import OrderLine  # noqa: E402
+from services.order import line_total  # noqa: E402
+
+
+def promotion(**kwargs) -> SimpleNamespace:
+    defaults = {
+        "id": 7,
+        "product_id": 1,
+        "status": PromotionStatus.ACTIVE,
+        "type": PromotionType.PERCENTAGE,
+        "discount": 20,
+        "min_quantity": None,
+    }
+    return SimpleNamespace(**{**defaults, **kwargs})
+
+
+def test_line_without_promotion_is_list_price():
+    assert line_total(10.0, OrderLine(product_id=1, quantity=3), None) == 30.0
+
+
+def test_percentage_promotion_discounts_the_line():
+    line = OrderLine(product_id=1, quantity=3, promotion_id=7)
+    assert line_total(10.0, line, promotion()) == pytest.approx(24.0)
+    assert line_total(10.0, line, promotion(discount=150)) == 0
+
+
+def test_fixed_amount_promotion_discounts_each_unit():
+    line = OrderLine(product_id=1, quantity=3, promotion_id=7)
+    fixed = promotion(type=PromotionType.FIXED_AMOUNT, discount=4)
+    assert line_total(10.0, line, fixed) == pytest.approx(18.0)
+    assert line_total(3.0, line, fixed) == 0
+
+
+@pytest.mark.parametrize(
+    ("overrides", "message"),
+    [
+        ({"product_id": 2}, "does not apply to product 1"),
+        ({"status": PromotionStatus.DRAFT}, "is not active"),
+        ({"min_quantity": 5}, "at least 5"),
+    ],
+)
+def test_promotion_must_apply_to_the_line(overrides, message):
+    line = OrderLine(product_id=1, quantity=3, promotion_id=7)
+    with pytest.raises(ValueError, match=message):
+        line_total(10.0, line, promotion(**overrides))
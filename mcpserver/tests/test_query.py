@@ -0,0 +1,161 @@
+"""
+Tests for the pagination and projection helpers shared by the services.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from core.config import settings
+from services.query import (
+    page_args,
+    paginate_list,
+    project_include,
+    project_rows,
+    ranked_page_args,
+    resolve_limit,
+    to_batch_result,
+    to_page,
+    to_ranked_page,
+    unique_keys,
+)
+
+
+class Row(BaseModel):
+    id: int
+    territory: dict | None = None
+    chat_sessions: list | None = None
+
+
+INCLUDE = {"territory": True, "chat_sessions": True}
+
+
+def rows(*ids: int) -> list[SimpleNamespace]:
+    return [SimpleNamespace(id=id) for id in ids]
+
+
+def test_resolve_limit_clamps_to_bounds():
+    assert resolve_limit(None) == settings.default_page_size
+    assert resolve_limit(0) == settings.default_page_size
+    assert resolve_limit(-1) == settings.default_page_size
+    assert resolve_limit(10) == 10
+    assert resolve_limit(settings.max_page_size + 1) == settings.max_page_size
+
+
+def test_page_args_fetch_one_extra_row():
+    assert page_args(None, 10) == {"take": 11, "order": {"id": "asc"}}
+    assert page_args(7, 10) == {
+        "take": 11,
+        "order": {"id": "asc"},
+        "cursor": {"id": 7},
+        "skip": 1,
+    }
+
+
+def test_to_page_uses_the_extra_row_as_look_ahead():
+    page = to_page(rows(1, 2, 3), 2)
+    assert [row.id for row in page.items] == [1, 2]
+    assert (page.next_cursor, page.has_more) == (2, True)
+
+    page = to_page(rows(1, 2), 2)
+    assert [row.id for row in page.items] == [1, 2]
+    assert (page.next_cursor, page.has_more) == (None, False)
+
+
+@pytest.mark.parametrize(
+    ("cursor", "limit", "items", "next_cursor"),
+    [
+        (None, 2, [1, 3], 3),
+        (3, 2, [5, 7], 7),
+        # A cursor between ids resumes after it, e.g. when the row was deleted
+        (4, 2, [5, 7], 7),
+        (7, 2, [9], None),
+        (9, 2, [], None),
+        (0, 10, [1, 3, 5, 7, 9], None),
+        (10, 1, [], None),
+        (None, 5, [1, 3, 5, 7, 9], None),
+    ],
+)
+def test_paginate_list_cursor_edges(cursor, limit, items, next_cursor):
+    page = paginate_list(rows(1, 3, 5, 7, 9), cursor, limit)
+
+    assert [row.id for row in page.items] == items
+    assert page.next_cursor == next_cursor
+    assert page.has_more is (next_cursor is not None)
+
+
+def test_paginate_list_walks_every_row_once():
+    snapshot = rows(*range(1, 12))
+    seen, cursor = [], None
+    while True:
+        page = paginate_list(snapshot, cursor, 3)
+        seen.extend(row.id for row in page.items)
+        if not page.has_more:
+            break
+        cursor = page.next_cursor
+
+    assert seen == list(range(1, 12))
+
+
+def test_project_include():
+    assert project_include(INCLUDE, None) is INCLUDE
+    assert project_include(INCLUDE, ["territory"]) == {"territory": True}
+    assert project_include(INCLUDE, []) == {}
+    with pytest.raises(ValueError, match="Unknown fields \\['orders'\\]"):
+        project_include(INCLUDE, ["orders"])
+
+
+def test_project_rows_drops_unrequested_relations():
+    loaded = [Row(id=1, territory={"id": 2}, chat_sessions=[{"id": 3}])]
+
+    assert project_rows(loaded, INCLUDE, None) is loaded
+
+    (row,) = project_rows(loaded, INCLUDE, ["territory"])
+    assert row.territory == {"id": 2}
+    assert row.chat_sessions is None
+    # The cached row is left untouched
+    assert loaded[0].chat_sessions == [{"id": 3}]
+
+
+def test_unique_keys_keeps_first_occurrence_order():
+    assert unique_keys([3, 1, 3, 2, 1]) == [3, 1, 2]
+
+
+def test_unique_keys_caps_batch_size():
+    assert len(unique_keys(list(range(settings.max_page_size)) * 2)) == (
+        settings.max_page_size
+    )
+    with pytest.raises(ValueError, match="Too many keys"):
+        unique_keys(list(range(settings.max_page_size + 1)))
+
+
+def test_to_batch_result_orders_rows_by_key_and_reports_missing():
+    found = [SimpleNamespace(sku="B"), SimpleNamespace(sku="A")]
+
+    result = to_batch_result(found, ["A", "C", "B"], "sku")
+
+    assert [row.sku for row in result.items] == ["A", "B"]
+    assert result.missing == ["C"]
+
+
+def test_to_batch_result_with_nothing_found():
+    result = to_batch_result([], [1, 2], "id")
+    assert result.items == []
+    assert result.missing == [1, 2]
+
+
+def test_ranked_pages_use_offsets_as_cursors():
+    assert ranked_page_args(None, 2) == {"take": 3, "skip": 0}
+    assert ranked_page_args(4, 2) == {"take": 3, "skip": 4}
+
+    page = to_ranked_page(rows(9, 2, 5), None, 2)
+    assert [row.id for row in page.items] == [9, 2]
+    assert (page.next_cursor, page.has_more) == (2, True)
+
+    page = to_ranked_page(rows(7, 1, 3), 2, 2)
+    assert (page.next_cursor, page.has_more) == (4, True)
+
+    page = to_ranked_page(rows(4), 4, 2)
+    assert [row.id for row in page.items] == [4]
+    assert (page.next_cursor, page.has_more) == (None, False)
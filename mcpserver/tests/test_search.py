@@ -0,0 +1,96 @@
+"""
+Tests for the in-memory n-gram search index.
+"""
+
+import pytest
+
+from core.search import NGramIndex, edit_distance, ngrams, normalize
+
+
+@pytest.fixture
+def index() -> NGramIndex:
+    index = NGramIndex(fields=("name", "sku"))
+    index.add(1, {"name": "Laptop Pro 15", "sku": "ELEC00123"})
+    index.add(2, {"name": "Wireless Mouse", "sku": "ELEC00456"})
+    index.add(3, {"name": "Office Chair", "sku": "FURN00001"})
+    return index
+
+
+def ids(hits) -> list:
+    return [hit.doc_id for hit in hits]
+
+
+def test_normalize_and_ngrams():
+    assert normalize("  Laptop-Pro_15! ") == "laptop pro 15"
+    assert normalize(None) == ""
+    assert ngrams("ab", n=3) == {"  a", " ab", "ab "}
+
+
+def test_edit_distance_counts_transpositions():
+    assert edit_distance("mouse", "mouse", 1) == 0
+    assert edit_distance("muose", "mouse", 1) == 1
+    assert edit_distance("mose", "mouse", 1) == 1
+    assert edit_distance("mice", "mouse", 1) == 2
+    assert edit_distance("laptop", "lap", 1) == 2
+
+
+def test_exact_match_ranks_first(index):
+    index.add(4, {"name": "Laptop Sleeve", "sku": "ACC00001"})
+
+    hits = index.search("laptop pro", fields=("name",))
+
+    assert ids(hits) == [1, 4]
+    assert hits[0].score > 1.0 > hits[1].score
+
+
+@pytest.mark.parametrize(
+    ("query", "field", "expected"),
+    [
+        ("apt", "name", [1]),
+        ("C00", "sku", [1, 2]),
+        ("ch", "name", [3]),
+        ("o", "name", [1, 2, 3]),
+    ],
+)
+def test_substrings_match_below_min_score(index, query, field, expected):
+    assert sorted(ids(index.search(query, fields=(field,)))) == expected
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("lpatop", [1]),
+        ("muose", [2]),
+        ("wireles mous", [2]),
+        ("ofice chiar", [3]),
+    ],
+)
+def test_typos_match(index, query, expected):
+    assert ids(index.search(query, fields=("name",))) == expected
+
+
+def test_unrelated_query_matches_nothing(index):
+    assert index.search("xyz") == []
+    assert index.search("   ") == []
+
+
+def test_limit_caps_hits(index):
+    assert len(index.search("elec", fields=("sku",), limit=1)) == 1
+
+
+def test_add_is_incremental(index):
+    assert not index.add(1, {"name": "laptop pro 15", "sku": "elec00123"})
+
+    assert index.add(1, {"name": "Desktop Tower", "sku": "ELEC00123"})
+    assert index.search("laptop", fields=("name",)) == []
+    assert ids(index.search("desktop", fields=("name",))) == [1]
+    assert len(index) == 3
+
+
+def test_remove_drops_document(index):
+    assert index.remove(2)
+    assert not index.remove(2)
+    assert 2 not in index
+    assert index.search("mouse") == []
+    assert index.search("muose") == []
+    assert ids(index.search("elec", fields=("sku",))) == [1]
@@ -3,58 +3,146 @@ Catalog tools for the MCP server.
 """
 
 import logging
-from contextlib import asynccontextmanager
+from collections.abc import Awaitable, Callable
+from operator import attrgetter
+from typing import Any
 
 from fastmcp import FastMCP
 
-from core.db import prisma
+from core.cache import catalog_cache
+from core.db import database
+from models.batch import BatchResult
+from models.compact import CompactPage, to_compact
+from models.pagination import Page
+from models.product import ProductResponse
 from models.promotion import PromotionResponse
 from prisma.models import Category, Product, Promotion, Subcategory
-from services.category import CategoryService
-from services.product import ProductService
-from services.promotion import PromotionService
-from utils.logs import log_tool
+from services.category import (
+    CATEGORY_INCLUDE,
+    CATEGORY_PROFILES,
+    SUBCATEGORY_INCLUDE,
+    SUBCATEGORY_PROFILES,
+    CategoryService,
+)
+from services.product import PRODUCT_INCLUDE, PRODUCT_PROFILES, ProductService
+from services.product_search import ProductSearchService
+from services.promotion import PROMOTION_INCLUDE, PROMOTION_PROFILES, PromotionService
+from services.query import (
+    IncludeProfile,
+    page_args,
+    paginate_list,
+    profile_fields,
+    project_rows,
+    resolve_limit,
+    to_batch_result,
+    to_page,
+    unique_keys,
+)
+from utils.logs import log_tool, serialize_tool_result
 
 logger = logging.getLogger("mcpserver.tools.catalog")
 
 
-@asynccontextmanager
-async def lifespan(_: FastMCP):
-    """Application lifespan manager."""
-    # Startup
-    logger.info("Starting up application...")
-    await prisma.connect()
-    logger.info("Database initialized")
-
-    yield
-
-    # Shutdown
-    logger.info("Shutting down application...")
-    await prisma.disconnect()
-    logger.info("Database connections closed")
-
-
 mcp = FastMCP(
     name="catalog",
     instructions="This server provides catalog management tools for the catalog.",
-    lifespan=lifespan,
+    tool_serializer=serialize_tool_result,
 )
 
 # Services
-product_service = ProductService(prisma)
-category_service = CategoryService(prisma)
-promotion_service = PromotionService(prisma)
+product_service = ProductService(database)
+category_service = CategoryService(database)
+promotion_service = PromotionService(database)
+product_search_service = ProductSearchService()
+
+
+async def get_snapshot(
+    entity: str, loader: Callable[[], Awaitable[list[Any]]]
+) -> list[Any]:
+    """Get a catalog snapshot, sorted by id once when it is loaded."""
+
+    async def load() -> list[Any]:
+        return sorted(await loader(), key=attrgetter("id"))
+
+    return await catalog_cache.get_or_load(entity, load)
+
+
+CONTAINS_FILTERS: dict[str, Callable[[str], dict[str, Any]]] = {
+    "name": lambda query: {"name": {"contains": query, "mode": "insensitive"}},
+    "sku": lambda query: {"sku": {"contains": query, "mode": "insensitive"}},
+    "category": lambda query: {
+        "category": {"name": {"contains": query, "mode": "insensitive"}}
+    },
+    "subcategory": lambda query: {
+        "subcategory": {"name": {"contains": query, "mode": "insensitive"}}
+    },
+}
+
+
+async def search_products(
+    query: str,
+    search_fields: tuple[str, ...],
+    limit: int | None,
+    fields: list[str] | None,
+    profile: IncludeProfile,
+) -> list[Product]:
+    """Search the in-memory product index, syncing it with the catalog snapshot.
+
+    The hits are projected to the relations of the profile or to the
+    requested ones. When the catalog cache is disabled there is no snapshot
+    to keep the index in sync with, so the search falls back to a
+    case-insensitive ``contains`` query instead of rebuilding the index from
+    the whole catalog on every call.
+    """
+    if catalog_cache.ttl_seconds <= 0:
+        return await product_service.get_products(
+            where={"OR": [CONTAINS_FILTERS[field](query) for field in search_fields]},
+            fields=fields,
+            profile=profile,
+            page={"take": resolve_limit(limit)},
+        )
+
+    products = await get_snapshot("products", product_service.get_products)
+    product_search_service.sync(products, catalog_cache.version("products"))
+    hits = product_search_service.search(
+        query, fields=search_fields, limit=resolve_limit(limit)
+    )
+    return project_rows(
+        hits, PRODUCT_INCLUDE, profile_fields(PRODUCT_PROFILES, profile, fields)
+    )
 
 
 @mcp.tool
 @log_tool
-async def get_products() -> list[Product]:
-    """Get all the products from the catalog.
+async def get_products(
+    cursor: int | None = None,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
+    compact: bool = False,
+) -> Page[Product] | CompactPage:
+    """Get the products from the catalog, one page at a time.
+
+    Args:
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of products to return.
+        fields: The relations to include (category, subcategory, promotions).
+            Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (none), standard (category, subcategory) or full
+            (category, subcategory, promotions). Defaults to summary.
+        compact: Return the page as columns and rows, with repeated nested
+            objects listed once under refs. Saves tokens on large pages.
 
     Returns:
-        list[Product]: A list of products from the catalog.
+        Page[Product] | CompactPage: A page of products from the catalog.
     """
-    return await product_service.get_products()
+    rows = await get_snapshot("products", product_service.get_products)
+    page = paginate_list(rows, cursor, limit)
+    page.items = project_rows(
+        page.items, PRODUCT_INCLUDE, profile_fields(PRODUCT_PROFILES, profile, fields)
+    )
+    return to_compact(page, ProductResponse) if compact else page
 
 
 @mcp.tool
@@ -71,6 +159,44 @@ async def get_products_by_id(product_id: int) -> Product:
     return await product_service.get_product_by_id(product_id)
 
 
+@mcp.tool
+@log_tool
+async def get_products_by_ids(product_ids: list[int]) -> BatchResult[Product]:
+    """Get many products from the catalog by ID in a single call.
+
+    Prefer this over calling get_products_by_id repeatedly.
+
+    Args:
+        product_ids: The IDs of the products to get.
+
+    Returns:
+        BatchResult[Product]: The products in the requested order and the IDs
+            that were not found.
+    """
+    product_ids = unique_keys(product_ids)
+    products = await product_service.get_products_by_ids(product_ids)
+    return to_batch_result(products, product_ids, "id")
+
+
+@mcp.tool
+@log_tool
+async def get_products_by_skus(skus: list[str]) -> BatchResult[Product]:
+    """Get many products from the catalog by SKU in a single call.
+
+    Prefer this over calling get_product_by_sku repeatedly.
+
+    Args:
+        skus: The SKUs of the products to get.
+
+    Returns:
+        BatchResult[Product]: The products in the requested order and the SKUs
+            that were not found.
+    """
+    skus = unique_keys(skus)
+    products = await product_service.get_products_by_skus(skus)
+    return to_batch_result(products, skus, "sku")
+
+
 @mcp.tool
 @log_tool
 async def get_product_by_sku(sku: str) -> Product:
@@ -89,30 +215,28 @@ async def get_product_by_sku(sku: str) -> Product:
 @log_tool
 async def fuzzy_search_products_by_category_or_subcategory(
     search_term: str,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
 ) -> list[Product]:
     """Fuzzy search for products by category or subcategory.
 
+    Results are ranked by similarity and tolerate typos.
+
     Args:
         search_term: The term to fuzzy search the products by.
+        limit: The maximum number of products to return.
+        fields: The relations to include (category, subcategory, promotions).
+            Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (none), standard (category, subcategory) or full
+            (category, subcategory, promotions). Defaults to summary.
 
     Returns:
-        list[Product]: A list of products that match the query.
+        list[Product]: A list of products that match the query, best match first.
     """
-    return await product_service.get_products(
-        where={
-            "OR": [
-                {
-                    "category": {
-                        "name": {"contains": search_term, "mode": "insensitive"}
-                    }
-                },
-                {
-                    "subcategory": {
-                        "name": {"contains": search_term, "mode": "insensitive"}
-                    }
-                },
-            ]
-        }
+    return await search_products(
+        search_term, ("category", "subcategory"), limit, fields, profile
     )
 
 
@@ -120,77 +244,145 @@ async def fuzzy_search_products_by_category_or_subcategory(
 @log_tool
 async def fuzzy_search_products_by_product_name(
     product_name_query: str,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
 ) -> list[Product]:
     """Fuzzy search for products by product name.
 
+    Results are ranked by similarity and tolerate typos.
+
     Args:
         product_name_query: The query to fuzzy search the products by.
+        limit: The maximum number of products to return.
+        fields: The relations to include (category, subcategory, promotions).
+            Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (none), standard (category, subcategory) or full
+            (category, subcategory, promotions). Defaults to summary.
 
     Returns:
-        list[Product]: A list of products that match the query.
+        list[Product]: A list of products that match the query, best match first.
     """
-    return await product_service.get_products(
-        where={
-            "name": {
-                "contains": product_name_query,
-                "mode": "insensitive",
-            }
-        }
-    )
+    return await search_products(product_name_query, ("name",), limit, fields, profile)
 
 
 @mcp.tool
 @log_tool
-async def fuzzy_search_products_by_sku(sku_name_query: str) -> list[Product]:
+async def fuzzy_search_products_by_sku(
+    sku_name_query: str,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
+) -> list[Product]:
     """Fuzzy search for products by sku query.
 
+    Results are ranked by similarity and tolerate typos.
+
     Args:
         sku_name_query: The query to fuzzy search the products by.
+        limit: The maximum number of products to return.
+        fields: The relations to include (category, subcategory, promotions).
+            Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (none), standard (category, subcategory) or full
+            (category, subcategory, promotions). Defaults to summary.
 
     Returns:
-        list[Product]: A list of products that match the query.
+        list[Product]: A list of products that match the query, best match first.
     """
-    return await product_service.get_products(
-        where={
-            "sku": {
-                "contains": sku_name_query,
-                "mode": "insensitive",
-            }
-        }
-    )
+    return await search_products(sku_name_query, ("sku",), limit, fields, profile)
 
 
 @mcp.tool
 @log_tool
-async def get_categories() -> list[Category]:
-    """Get the categories from the catalog.
+async def get_categories(
+    cursor: int | None = None,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
+) -> Page[Category]:
+    """Get the categories from the catalog, one page at a time.
+
+    Args:
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of categories to return.
+        fields: The relations to include (subcategories).
+            Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (none), standard or full (subcategories). Defaults to summary.
 
     Returns:
-        list[Category]: A list of categories from the catalog.
+        Page[Category]: A page of categories from the catalog.
     """
-    return await category_service.get_categories()
+    rows = await get_snapshot("categories", category_service.get_categories)
+    page = paginate_list(rows, cursor, limit)
+    page.items = project_rows(
+        page.items, CATEGORY_INCLUDE, profile_fields(CATEGORY_PROFILES, profile, fields)
+    )
+    return page
 
 
 @mcp.tool
 @log_tool
-async def get_subcategories() -> list[Subcategory]:
-    """Get the subcategories from the catalog.
+async def get_subcategories(
+    cursor: int | None = None,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
+) -> Page[Subcategory]:
+    """Get the subcategories from the catalog, one page at a time.
+
+    Args:
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of subcategories to return.
+        fields: The relations to include (category).
+            Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (none), standard or full (category). Defaults to summary.
 
     Returns:
-        list[Subcategory]: A list of subcategories from the catalog.
+        Page[Subcategory]: A page of subcategories from the catalog.
     """
-    return await category_service.get_subcategories()
+    rows = await get_snapshot("subcategories", category_service.get_subcategories)
+    page = paginate_list(rows, cursor, limit)
+    page.items = project_rows(
+        page.items,
+        SUBCATEGORY_INCLUDE,
+        profile_fields(SUBCATEGORY_PROFILES, profile, fields),
+    )
+    return page
 
 
 @mcp.tool
 @log_tool
-async def get_promotions() -> list[Promotion]:
-    """Get the promotions from the catalog.
+async def get_promotions(
+    cursor: int | None = None,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
+) -> Page[Promotion]:
+    """Get the promotions from the catalog, one page at a time.
+
+    Args:
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of promotions to return.
+        fields: The relations to include (product).
+            Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (none), standard or full (product). Defaults to summary.
 
     Returns:
-        list[Promotion]: A list of promotions from the catalog.
+        Page[Promotion]: A page of promotions from the catalog.
     """
-    return await promotion_service.get_promotions()
+    rows = await get_snapshot("promotions", promotion_service.get_promotions)
+    page = paginate_list(rows, cursor, limit)
+    page.items = project_rows(
+        page.items,
+        PROMOTION_INCLUDE,
+        profile_fields(PROMOTION_PROFILES, profile, fields),
+    )
+    return page
 
 
 @mcp.tool
@@ -207,43 +399,72 @@ async def get_promotion_by_id(promotion_id: int) -> Promotion:
     return await promotion_service.get_promotion_by_id(promotion_id)
 
 
+@mcp.tool
+@log_tool
+async def get_promotions_by_ids(promotion_ids: list[int]) -> BatchResult[Promotion]:
+    """Get many promotions from the catalog by ID in a single call.
+
+    Prefer this over calling get_promotion_by_id repeatedly.
+
+    Args:
+        promotion_ids: The IDs of the promotions to get.
+
+    Returns:
+        BatchResult[Promotion]: The promotions in the requested order and the
+            IDs that were not found.
+    """
+    promotion_ids = unique_keys(promotion_ids)
+    promotions = await promotion_service.get_promotions_by_ids(promotion_ids)
+    return to_batch_result(promotions, promotion_ids, "id")
+
+
 @mcp.tool
 @log_tool
 async def fuzzy_search_promotions_by_name(
     promotion_name_query: str,
-) -> list[Promotion]:
+    cursor: int | None = None,
+    limit: int | None = None,
+) -> Page[Promotion]:
     """Fuzzy search for promotions by promotion name.
 
     Args:
         promotion_name_query: The query to fuzzy search the promotions by.
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of promotions to return.
 
     Returns:
-        list[Promotion]: A list of promotions that match the query.
+        Page[Promotion]: A page of promotions that match the query.
     """
-    return await promotion_service.get_promotions(
+    rows = await promotion_service.get_promotions(
         where={
             "name": {
                 "contains": promotion_name_query,
                 "mode": "insensitive",
             }
-        }
+        },
+        page=page_args(cursor, limit),
     )
+    return to_page(rows, limit)
 
 
 @mcp.tool
 @log_tool
 async def fuzzy_search_promotions_by_product_name(
     product_name_query: str,
-) -> list[PromotionResponse]:
+    cursor: int | None = None,
+    limit: int | None = None,
+) -> Page[PromotionResponse]:
     """Fuzzy search for promotions by product name.
 
     Args:
         product_name_query: The query to fuzzy search the promotions by.
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of promotions to return.
 
     Returns:
-        list[PromotionResponse]: A list of promotions that match the query.
+        Page[PromotionResponse]: A page of promotions that match the query.
     """
-    return await promotion_service.get_promotions(
+    rows = await promotion_service.get_promotions(
         where={
             "product": {
                 "name": {
@@ -251,24 +472,30 @@ async def fuzzy_search_promotions_by_product_name(
                     "mode": "insensitive",
                 }
             }
-        }
+        },
+        page=page_args(cursor, limit),
     )
+    return to_page(rows, limit)
 
 
 @mcp.tool
 @log_tool
 async def fuzzy_search_promotions_by_product_sku(
     product_sku_query: str,
-) -> list[PromotionResponse]:
+    cursor: int | None = None,
+    limit: int | None = None,
+) -> Page[PromotionResponse]:
     """Fuzzy search for promotions by product sku.
 
     Args:
         product_sku_query: The query to fuzzy search the promotions by.
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of promotions to return.
 
     Returns:
-        list[PromotionResponse]: A list of promotions that match the query.
+        Page[PromotionResponse]: A page of promotions that match the query.
     """
-    return await promotion_service.get_promotions(
+    rows = await promotion_service.get_promotions(
         where={
             "product": {
                 "sku": {
@@ -276,5 +503,7 @@ async def fuzzy_search_promotions_by_product_sku(
                     "mode": "insensitive",
                 }
             }
-        }
+        },
+        page=page_args(cursor, limit),
     )
+    return to_page(rows, limit)
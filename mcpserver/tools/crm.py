@@ -2,105 +2,173 @@
 CRM tools for the MCP server.
 """
 
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+from collections.abc import Awaitable
 
 from fastmcp import FastMCP
 
-from core.db import prisma
-from models.account import ActionItemResponse
+from core.db import database
+from models.account import AccountResponse, ActionItemResponse
+from models.account_overview import (
+    AccountInsightSummary,
+    AccountOverview,
+    ActionItemSummary,
+    OrderSummary,
+)
+from models.base import validate_rows
+from models.batch import BatchResult
+from models.compact import CompactPage, to_compact
+from models.dashboard import SalesRepDashboard
+from models.pagination import Page
 from prisma.models import Account, AccountInsight, User
 from services.account import AccountService
+from services.dashboard import DashboardService
+from services.order import OrderFilters, OrderService
+from services.query import (
+    IncludeProfile,
+    page_args,
+    ranked_page_args,
+    resolve_limit,
+    to_batch_result,
+    to_page,
+    to_ranked_page,
+    unique_keys,
+)
 from services.user import UserService
-from utils.logs import log_tool
+from utils.logs import log_tool, serialize_tool_result
 
 logger = logging.getLogger("mcpserver.tools.crm")
 
 
-@asynccontextmanager
-async def lifespan(_: FastMCP):
-    """Application lifespan manager."""
-    # Startup
-    logger.info("Starting up application...")
-    await prisma.connect()
-    logger.info("Database initialized")
-
-    yield
-
-    # Shutdown
-    logger.info("Shutting down application...")
-    await prisma.disconnect()
-    logger.info("Database connections closed")
-
-
 mcp = FastMCP(
     name="crm",
     instructions="This server provides CRM management tools for the CRM.",
-    lifespan=lifespan,
+    tool_serializer=serialize_tool_result,
 )
 
 # Services
-account_service = AccountService(prisma)
-user_service = UserService(prisma)
+account_service = AccountService(database)
+user_service = UserService(database)
+order_service = OrderService(database)
+dashboard_service = DashboardService(database)
+
+# Relations of the account in an overview. Insights and action items are
+# fetched on their own, trimmed and without their account.
+OVERVIEW_ACCOUNT_FIELDS = ["contact", "address", "territory", "ordering_pattern"]
 
 
 @mcp.tool
 @log_tool
-async def get_accounts() -> list[Account]:
-    """Get the accounts from the CRM in table format.
+async def get_accounts(
+    cursor: int | None = None,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
+    compact: bool = False,
+) -> Page[Account] | CompactPage:
+    """Get the accounts from the CRM in table format, one page at a time.
+
+    Args:
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of accounts to return.
+        fields: The relations to include (sales_rep, contact, address, territory,
+            insights, action_items, ordering_pattern). Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (territory), standard (sales_rep, contact, address, territory,
+            ordering_pattern) or full (all relations). Defaults to summary.
+        compact: Return the page as columns and rows, with repeated nested
+            objects listed once under refs. Saves tokens on large pages.
 
     Returns:
-        list[Account]: A list of accounts from the CRM.
+        Page[Account] | CompactPage: A page of accounts from the CRM.
     """
-    return await account_service.get_accounts()
+    accounts = await account_service.get_accounts(
+        fields=fields,
+        profile=profile,
+        page=page_args(cursor, limit),
+    )
+    page = to_page(accounts, limit)
+    return to_compact(page, AccountResponse) if compact else page
 
 
 @mcp.tool
 @log_tool
-async def get_sales_rep_accounts(sales_rep_id: int) -> list[Account]:
+async def get_sales_rep_accounts(
+    sales_rep_id: int,
+    cursor: int | None = None,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
+    compact: bool = False,
+) -> Page[Account] | CompactPage:
     """Get sales rep accounts by sales rep id.
 
     Args:
         sales_rep_id: The ID of the sales rep to get accounts for.
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of accounts to return.
+        fields: The relations to include (sales_rep, contact, address, territory,
+            insights, action_items, ordering_pattern). Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (territory), standard (sales_rep, contact, address, territory,
+            ordering_pattern) or full (all relations). Defaults to summary.
+        compact: Return the page as columns and rows, with repeated nested
+            objects listed once under refs. Saves tokens on large pages.
 
     Returns:
-        list[Account]: A list of accounts for the sales rep.
+        Page[Account] | CompactPage: A page of accounts for the sales rep.
     """
-    return await account_service.get_accounts(where={"sales_rep_id": sales_rep_id})
+    accounts = await account_service.get_accounts(
+        where={"sales_rep_id": sales_rep_id},
+        fields=fields,
+        profile=profile,
+        page=page_args(cursor, limit),
+    )
+    page = to_page(accounts, limit)
+    return to_compact(page, AccountResponse) if compact else page
 
 
 @mcp.tool
 @log_tool
-async def fuzzy_search_accounts(account_name_query: str) -> list[Account]:
-    """Fuzzy search the accounts from the CRM.
+async def fuzzy_search_accounts(
+    account_name_query: str,
+    cursor: int | None = None,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
+    compact: bool = False,
+) -> Page[Account] | CompactPage | str:
+    """Fuzzy search the accounts from the CRM by name and description, most
+    relevant first. Tolerates typos in the name.
 
     Args:
         account_name_query: The query to fuzzy search the accounts by.
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of accounts to return.
+        fields: The relations to include (sales_rep, contact, address, territory,
+            insights, action_items, ordering_pattern). Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (territory), standard (sales_rep, contact, address, territory,
+            ordering_pattern) or full (all relations). Defaults to summary.
+        compact: Return the page as columns and rows, with repeated nested
+            objects listed once under refs. Saves tokens on large pages.
 
     Returns:
-        list[Account]: A list of accounts that match the query.
+        Page[Account] | CompactPage | str: A page of accounts that match the query.
     """
-    accounts = await account_service.get_accounts(
-        where={
-            "OR": [
-                {"name": {"contains": account_name_query, "mode": "insensitive"}},
-                {
-                    "description": {
-                        "contains": account_name_query,
-                        "mode": "insensitive",
-                    }
-                },
-            ]
-        }
+    accounts = await account_service.search_accounts(
+        account_name_query,
+        fields=fields,
+        profile=profile,
+        page=ranked_page_args(cursor, limit),
     )
 
     if not accounts:
         return "No accounts found. Try a different account name."
 
-    if len(accounts) == 0:
-        return "No accounts found. Try a different account name."
-
-    return accounts
+    page = to_ranked_page(accounts, cursor, limit)
+    return to_compact(page, AccountResponse) if compact else page
 
 
 @mcp.tool
@@ -117,50 +185,216 @@ async def get_user_by_id(user_id: int) -> User:
     return await user_service.get_user_by_id(user_id)
 
 
+@mcp.tool
+@log_tool
+async def get_users_by_ids(user_ids: list[int]) -> BatchResult[User]:
+    """Get many users by ID in a single call. These could be sales reps or admins.
+
+    Prefer this over calling get_user_by_id repeatedly.
+
+    Args:
+        user_ids: The IDs of the users to get.
+
+    Returns:
+        BatchResult[User]: The users in the requested order and the IDs that
+            were not found.
+    """
+    user_ids = unique_keys(user_ids)
+    users = await user_service.get_users_by_ids(user_ids)
+    return to_batch_result(users, user_ids, "id")
+
+
 @mcp.tool
 @log_tool
 async def fuzzy_search_account_insights_by_account_name(
     account_name: str,
-) -> list[AccountInsight]:
-    """Get the account insights for an account by fuzzy search name.
+    cursor: int | None = None,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
+) -> Page[AccountInsight]:
+    """Get the account insights for an account by fuzzy search name, best
+    matching account first.
 
     Args:
         account_name: The query to fuzzy search the account insights by.
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of account insights to return.
+        fields: The relations to include (account). Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (none), standard or full (account). Defaults to summary.
 
     Returns:
-        list[AccountInsight]: A list of account insights that match the query.
+        Page[AccountInsight]: A page of account insights that match the query.
     """
-    insights = await account_service.get_account_insights(
-        where={
-            "account": {
-                "name": {
-                    "contains": account_name,
-                    "mode": "insensitive",
-                }
-            }
-        }
+    insights = await account_service.search_account_insights_by_account_name(
+        account_name,
+        fields=fields,
+        profile=profile,
+        page=ranked_page_args(cursor, limit),
     )
-    return insights
+    return to_ranked_page(insights, cursor, limit)
 
 
 @mcp.tool
 @log_tool
 async def get_sales_rep_action_items(
     sales_rep_id: int,
-) -> list[ActionItemResponse]:
+    cursor: int | None = None,
+    limit: int | None = None,
+    compact: bool = False,
+) -> Page[ActionItemResponse] | CompactPage:
     """Get the action items for a sales rep by sales rep id.
 
     Args:
         sales_rep_id: The ID of the sales rep to get action items for.
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of action items to return.
+        compact: Return the page as columns and rows, with repeated nested
+            objects listed once under refs. Saves tokens on large pages.
 
     Returns:
-        list[ActionItemResponse]: A list of action items for the sales rep.
+        Page[ActionItemResponse] | CompactPage: A page of action items for the sales rep.
     """
     action_items = await account_service.get_action_items(
         where={
             "user_id": sales_rep_id,
-        }
+        },
+        page=page_args(cursor, limit),
     )
+    page = to_page(action_items, limit)
+    page.items = validate_rows(ActionItemResponse, page.items)
+    return to_compact(page, ActionItemResponse) if compact else page
+
+
+async def _no_rows() -> list:
+    """Stand in for the query of a section that was skipped."""
+    return []
+
+
+def _overview_sections(
+    account_id: int, order_limit: int, action_item_limit: int, insight_limit: int
+) -> list[Awaitable]:
+    """Build the queries of the sections of an account overview.
+
+    A section with a limit of 0 or less is skipped without a query, since
+    ``resolve_limit`` would turn that limit into the default page size.
+    """
     return [
-        ActionItemResponse.model_validate(action_item) for action_item in action_items
+        order_service.get_order_totals(OrderFilters(account_id=account_id)),
+        order_service.get_orders(
+            where={"account_id": account_id},
+            fields=[],
+            page={"take": resolve_limit(order_limit), "order": {"created_at": "desc"}},
+        )
+        if order_limit > 0
+        else _no_rows(),
+        account_service.get_action_items(
+            where={"account_id": account_id, "completed": False},
+            fields=[],
+            page={
+                "take": resolve_limit(action_item_limit),
+                "order": [{"due_time": "asc"}, {"id": "asc"}],
+            },
+        )
+        if action_item_limit > 0
+        else _no_rows(),
+        account_service.get_account_insights(
+            where={"account_id": account_id},
+            fields=[],
+            page={
+                "take": resolve_limit(insight_limit),
+                "order": {"confidence": "desc"},
+            },
+        )
+        if insight_limit > 0
+        else _no_rows(),
     ]
+
+
+@mcp.tool
+@log_tool
+async def get_account_overview(
+    account_id: int | None = None,
+    account_name_query: str | None = None,
+    order_limit: int = 5,
+    action_item_limit: int = 10,
+    insight_limit: int = 5,
+) -> AccountOverview | str:
+    """Get everything needed to brief a sales rep on an account in one call: the
+    account, its order totals, its latest orders, its open action items and its
+    top insights by confidence.
+
+    Prefer this over chaining the account, insight, action item and order tools.
+
+    Args:
+        account_id: The ID of the account.
+        account_name_query: Used when no account_id is given. The first account,
+            by name, whose name contains this is used.
+        order_limit: The number of latest orders to include. 0 skips them.
+        action_item_limit: The number of open action items to include, earliest
+            due first. 0 skips them.
+        insight_limit: The number of insights to include, most confident first.
+            0 skips them.
+
+    Returns:
+        AccountOverview | str: The account overview, or a string if no account
+            was found.
+    """
+    if account_id is None and not account_name_query:
+        return "Provide an account_id or an account_name_query."
+
+    if account_id is None:
+        accounts = await account_service.get_accounts(
+            where={"name": {"contains": account_name_query, "mode": "insensitive"}},
+            fields=OVERVIEW_ACCOUNT_FIELDS,
+            page={"take": 1, "order": {"name": "asc"}},
+        )
+        if not accounts:
+            return "No account found. Try a different account name."
+        totals, orders, action_items, insights = await asyncio.gather(
+            *_overview_sections(
+                accounts[0].id, order_limit, action_item_limit, insight_limit
+            )
+        )
+    else:
+        accounts, totals, orders, action_items, insights = await asyncio.gather(
+            account_service.get_accounts(
+                where={"id": account_id},
+                fields=OVERVIEW_ACCOUNT_FIELDS,
+                page={"take": 1},
+            ),
+            *_overview_sections(
+                account_id, order_limit, action_item_limit, insight_limit
+            ),
+        )
+
+    if not accounts:
+        return f"Account {account_id} not found."
+
+    return AccountOverview(
+        account=accounts[0],
+        order_totals=totals,
+        recent_orders=validate_rows(OrderSummary, orders),
+        open_action_items=validate_rows(ActionItemSummary, action_items),
+        top_insights=validate_rows(AccountInsightSummary, insights),
+    )
+
+
+@mcp.tool
+@log_tool
+async def get_sales_rep_dashboard(sales_rep_id: int) -> SalesRepDashboard:
+    """Get the dashboard of a sales rep: their account count, open action items
+    by priority, order totals by status, latest orders and top insights.
+
+    Prefer this over listing the accounts, action items and orders of a sales
+    rep to answer questions about their book of business. The dashboard is
+    kept up to date with the orders written through these tools.
+
+    Args:
+        sales_rep_id: The ID of the sales rep.
+
+    Returns:
+        SalesRepDashboard: The dashboard of the sales rep.
+    """
+    return await dashboard_service.get_sales_rep_dashboard(sales_rep_id)
@@ -3,58 +3,78 @@ ERP tools for the MCP server.
 """
 
 import logging
-from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Literal
 
 from fastmcp import FastMCP
 
-from core.db import prisma
+from core.db import database
+from models.batch import BatchResult
+from models.compact import CompactPage, to_compact
+from models.order import OrderLine, OrderResponse
+from models.order_stats import OrderTotals, PeriodTotals, ProductSales
+from models.pagination import Page
+from prisma.enums import OrderStatus
 from prisma.models import Order, OrderItem
 from prisma.types import (
     OrderCreateInput,
     OrderItemCreateInput,
     OrderItemUpdateInput,
 )
-from services.order import OrderService
-from utils.logs import log_tool
+from services.order import OrderFilters, OrderService, Period
+from services.query import (
+    IncludeProfile,
+    page_args,
+    to_batch_result,
+    to_page,
+    unique_keys,
+)
+from utils.logs import log_tool, serialize_tool_result
 
 logger = logging.getLogger("mcpserver.tools.erp")
 
 
-@asynccontextmanager
-async def lifespan(_: FastMCP):
-    """Application lifespan manager."""
-    # Startup
-    logger.info("Starting up application...")
-    await prisma.connect()
-    logger.info("Database initialized")
-
-    yield
-
-    # Shutdown
-    logger.info("Shutting down application...")
-    await prisma.disconnect()
-    logger.info("Database connections closed")
-
-
 mcp = FastMCP(
     name="erp",
     instructions="This server provides ERP management tools for the ERP.",
-    lifespan=lifespan,
+    tool_serializer=serialize_tool_result,
 )
 
 # Services
-order_service = OrderService(prisma)
+order_service = OrderService(database)
 
 
 @mcp.tool
 @log_tool
-async def get_orders() -> list[Order]:
-    """Get the orders from the ERP in table format.
+async def get_orders(
+    cursor: int | None = None,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
+    compact: bool = False,
+) -> Page[Order] | CompactPage:
+    """Get the orders from the ERP in table format, one page at a time.
+
+    Args:
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of orders to return.
+        fields: The relations to include (account, items). Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (none), standard (account) or full (account, items).
+            Defaults to summary.
+        compact: Return the page as columns and rows, with repeated nested
+            objects listed once under refs. Saves tokens on large pages.
 
     Returns:
-        list[Order]: A list of orders from the ERP.
+        Page[Order] | CompactPage: A page of orders from the ERP.
     """
-    return await order_service.get_orders()
+    orders = await order_service.get_orders(
+        fields=fields,
+        profile=profile,
+        page=page_args(cursor, limit),
+    )
+    page = to_page(orders, limit)
+    return to_compact(page, OrderResponse) if compact else page
 
 
 @mcp.tool
@@ -71,34 +91,202 @@ async def get_order_by_id(order_id: int) -> Order:
     return await order_service.get_order_by_id(order_id)
 
 
+@mcp.tool
+@log_tool
+async def get_orders_by_ids(order_ids: list[int]) -> BatchResult[Order]:
+    """Get many orders from the ERP by order ID in a single call.
+
+    Prefer this over calling get_order_by_id repeatedly.
+
+    Args:
+        order_ids: The IDs of the orders to get.
+
+    Returns:
+        BatchResult[Order]: The orders in the requested order and the IDs that
+            were not found.
+    """
+    order_ids = unique_keys(order_ids)
+    orders = await order_service.get_orders_by_ids(order_ids)
+    return to_batch_result(orders, order_ids, "id")
+
+
 @mcp.tool
 @log_tool
 async def fuzzy_search_orders_by_account_name(
     account_name_query: str,
-) -> list[Order] | str:
+    cursor: int | None = None,
+    limit: int | None = None,
+    fields: list[str] | None = None,
+    profile: IncludeProfile = "summary",
+    compact: bool = False,
+) -> Page[Order] | CompactPage | str:
     """Fuzzy search the orders from the ERP by account.
 
     Args:
         account_name_query: The query to fuzzy search the orders by.
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of orders to return.
+        fields: The relations to include (account, items). Overrides the profile when given.
+        profile: The relations to include when no fields are given:
+            summary (none), standard (account) or full (account, items).
+            Defaults to summary.
+        compact: Return the page as columns and rows, with repeated nested
+            objects listed once under refs. Saves tokens on large pages.
 
     Returns:
-        list[Order] | str: A list of orders or a string if no orders are found.
+        Page[Order] | CompactPage | str: A page of orders or a string if no orders are found.
     """
     orders = await order_service.get_orders(
         where={
             "account": {
                 "name": {"contains": account_name_query, "mode": "insensitive"},
             },
-        }
+        },
+        fields=fields,
+        profile=profile,
+        page=page_args(cursor, limit),
     )
 
     if not orders:
         return "No orders found. Try a different account name."
 
-    if len(orders) == 0:
-        return "No orders found. Try a different account name."
+    page = to_page(orders, limit)
+    return to_compact(page, OrderResponse) if compact else page
+
+
+@mcp.tool
+@log_tool
+async def get_order_totals(
+    account_id: int | None = None,
+    account_name_query: str | None = None,
+    sales_rep_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    status: OrderStatus | None = None,
+) -> OrderTotals:
+    """Get the order count, items sold, revenue and average order value of the
+    matching orders, computed in the database.
+
+    Prefer this over fetching orders to add them up. Cancelled orders are left
+    out unless a status is given.
 
-    return orders
+    Args:
+        account_id: Only count the orders of this account.
+        account_name_query: Only count the orders of accounts whose name contains this.
+        sales_rep_id: Only count the orders of this sales rep.
+        start_date: Only count the orders created on or after this date.
+        end_date: Only count the orders created before this date.
+        status: Only count the orders with this status.
+
+    Returns:
+        OrderTotals: The totals of the matching orders.
+    """
+    return await order_service.get_order_totals(
+        OrderFilters(
+            account_id=account_id,
+            account_name=account_name_query,
+            sales_rep_id=sales_rep_id,
+            start_date=start_date,
+            end_date=end_date,
+            status=status,
+        )
+    )
+
+
+@mcp.tool
+@log_tool
+async def get_top_products(
+    account_id: int | None = None,
+    account_name_query: str | None = None,
+    sales_rep_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    status: OrderStatus | None = None,
+    order_by: Literal["revenue", "quantity"] = "revenue",
+    limit: int | None = 10,
+) -> list[ProductSales] | str:
+    """Get the best selling products of the matching orders, computed in the database.
+
+    Cancelled orders are left out unless a status is given.
+
+    Args:
+        account_id: Only count the orders of this account.
+        account_name_query: Only count the orders of accounts whose name contains this.
+        sales_rep_id: Only count the orders of this sales rep.
+        start_date: Only count the orders created on or after this date.
+        end_date: Only count the orders created before this date.
+        status: Only count the orders with this status.
+        order_by: Rank the products by "revenue" or by "quantity" sold.
+        limit: The maximum number of products to return.
+
+    Returns:
+        list[ProductSales] | str: The products, best selling first, or a string
+            if no products were sold.
+    """
+    products = await order_service.get_top_products(
+        OrderFilters(
+            account_id=account_id,
+            account_name=account_name_query,
+            sales_rep_id=sales_rep_id,
+            start_date=start_date,
+            end_date=end_date,
+            status=status,
+        ),
+        order_by=order_by,
+        limit=limit,
+    )
+
+    if not products:
+        return "No products sold for these filters."
+
+    return products
+
+
+@mcp.tool
+@log_tool
+async def get_order_totals_by_period(
+    period: Period = "month",
+    account_id: int | None = None,
+    account_name_query: str | None = None,
+    sales_rep_id: int | None = None,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    status: OrderStatus | None = None,
+) -> list[PeriodTotals] | str:
+    """Get the order count, items sold and revenue of the matching orders per
+    day, week, month, quarter or year, computed in the database.
+
+    Cancelled orders are left out unless a status is given.
+
+    Args:
+        period: The length of the periods (day, week, month, quarter, year).
+        account_id: Only count the orders of this account.
+        account_name_query: Only count the orders of accounts whose name contains this.
+        sales_rep_id: Only count the orders of this sales rep.
+        start_date: Only count the orders created on or after this date.
+        end_date: Only count the orders created before this date.
+        status: Only count the orders with this status.
+
+    Returns:
+        list[PeriodTotals] | str: The totals of each period with orders, oldest
+            first, or a string if there are no orders.
+    """
+    periods = await order_service.get_order_totals_by_period(
+        OrderFilters(
+            account_id=account_id,
+            account_name=account_name_query,
+            sales_rep_id=sales_rep_id,
+            start_date=start_date,
+            end_date=end_date,
+            status=status,
+        ),
+        period=period,
+    )
+
+    if not periods:
+        return "No orders found for these filters."
+
+    return periods
 
 
 @mcp.tool
@@ -127,6 +315,42 @@ async def create_order_for_account(
         return f"Error creating order: {e}"
 
 
+@mcp.tool
+@log_tool
+async def create_order_with_items(
+    account_id: int,
+    sales_rep_id: int,
+    items: list[OrderLine],
+) -> Order | str:
+    """Create an order for an account with all of its items in a single call.
+
+    Prefer this over create_order_for_account followed by add_order_item for
+    each line. Prices are taken from the products and lines with a promotion
+    get its discount: a percentage off the line, or a fixed amount off each
+    unit. The promotion must be active, for the product of the line, and its
+    minimum quantity must be met. Either the whole order is created or
+    nothing is.
+
+    Args:
+        account_id: The ID of the account to create the order for.
+        sales_rep_id: The ID of the sales rep to create the order for.
+        items: The lines of the order, each with a product_id, a quantity and
+            an optional promotion_id.
+
+    Returns:
+        Order: The order that was created, with its items.
+    """
+    try:
+        order_payload = OrderCreateInput(
+            account_id=account_id, sales_rep_id=sales_rep_id
+        )
+
+        return await order_service.create_order_with_items(order_payload, items)
+
+    except Exception as e:
+        return f"Error creating order: {e}"
+
+
 @mcp.tool
 @log_tool
 async def add_order_item(
@@ -247,15 +471,19 @@ async def delete_order_item_by_sku_name_and_order_id(
 async def fuzzy_search_order_item_by_sku_name_and_order_id(
     sku_name_query: str,
     order_id: int,
-) -> list[OrderItem] | str:
+    cursor: int | None = None,
+    limit: int | None = None,
+) -> Page[OrderItem] | str:
     """Fuzzy search the order items from the ERP by sku name and order id.
 
     Args:
         sku_name_query: The query to fuzzy search the order items by.
         order_id: The ID of the order to search the items from.
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of order items to return.
 
     Returns:
-        list[OrderItem]: A list of order items that match the query.
+        Page[OrderItem]: A page of order items that match the query.
     """
     order_items = await order_service.get_order_items(
         where={
@@ -266,13 +494,11 @@ async def fuzzy_search_order_item_by_sku_name_and_order_id(
                     "mode": "insensitive",
                 },
             },
-        }
+        },
+        page=page_args(cursor, limit),
     )
 
     if not order_items:
         return "No order items found. Try a different sku name or order id."
 
-    if len(order_items) == 0:
-        return "No order items found. Try a different sku name or order id."
-
-    return order_items
+    return to_page(order_items, limit)
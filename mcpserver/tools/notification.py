@@ -3,55 +3,48 @@ Notification tools for the MCP server.
 """
 
 import logging
-from contextlib import asynccontextmanager
 
 from fastmcp import FastMCP
 
-from core.db import prisma
+from core.db import database
+from models.pagination import Page
 from prisma.enums import EmailStatus
 from prisma.models import Email
 from prisma.types import EmailCreateInput, EmailUpdateInput
 from services.notification import NotificationService
-from utils.logs import log_tool
+from services.query import page_args, to_page
+from utils.logs import log_tool, serialize_tool_result
 
 logger = logging.getLogger("mcpserver.tools.notification")
 
 
-@asynccontextmanager
-async def lifespan(_: FastMCP):
-    """Application lifespan manager."""
-    # Startup
-    logger.info("Starting up application...")
-    await prisma.connect()
-    logger.info("Database initialized")
-
-    yield
-
-    # Shutdown
-    logger.info("Shutting down application...")
-    await prisma.disconnect()
-    logger.info("Database connections closed")
-
-
 mcp = FastMCP(
     name="notification",
     instructions="This server provides notification management tools for the notification.",
-    lifespan=lifespan,
+    tool_serializer=serialize_tool_result,
 )
 
 # Services
-notification_service = NotificationService(prisma)
+notification_service = NotificationService(database)
 
 
 @mcp.tool
 @log_tool
-async def get_emails() -> list[Email]:
-    """Get the emails from the CRM in table format.
+async def get_emails(
+    cursor: int | None = None,
+    limit: int | None = None,
+) -> Page[Email]:
+    """Get the emails from the CRM in table format, one page at a time.
+
+    Args:
+        cursor: The next_cursor of the previous page, or None for the first page.
+        limit: The maximum number of emails to return.
 
     Returns:
-        list[Email]: A list of emails from the CRM.
+        Page[Email]: A page of emails from the CRM.
     """
-    return await notification_service.get_emails()
+    emails = await notification_service.get_emails(page=page_args(cursor, limit))
+    return to_page(emails, limit)
 
 
 @mcp.tool
@@ -2,17 +2,36 @@
 Utility functions for the MCP server.
 """
 
+import atexit
 import functools
+import hashlib
 import inspect
+import itertools
 import json
 import logging
 import os
+import queue
+import threading
 import time
 from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any
 
 import psutil
+import pydantic_core
+
+from models.base import dump_rows_json, row_model
+from utils.metrics import (
+    tool_calls,
+    tool_db_duration,
+    tool_db_queries,
+    tool_duration,
+    tool_errors,
+    tool_payload_size,
+)
 
 logger = logging.getLogger("mcpserver.utils")
 
@@ -23,6 +42,19 @@ def get_log_level_from_env(default: str = "INFO") -> int:
     return getattr(logging, env_level, logging.INFO)
 
 
+def get_sample_rate_from_env(default: int = 1) -> int:
+    """Get the 1-in-N log sampling rate from environment."""
+    try:
+        return max(int(os.getenv("LOG_SAMPLE_RATE", default)), 1)
+    except ValueError:
+        return default
+
+
+def get_capture_path_from_env() -> str | None:
+    """Get the JSONL file tool calls are captured to, if capturing is enabled."""
+    return os.getenv("TOOL_CAPTURE_FILE") or None
+
+
 def format_log(value: Any, max_length: int = 100) -> str:
     """Format a value for logging, truncating if too long."""
     try:
@@ -38,6 +70,290 @@ def format_log(value: Any, max_length: int = 100) -> str:
         return f"<{type(value).__name__} object>"
 
 
+class LazyLogArgs:
+    """Formats call arguments only when the log record is emitted."""
+
+    __slots__ = ("formatter", "args", "kwargs")
+
+    def __init__(self, formatter: Callable[[tuple, dict], str], args, kwargs):
+        self.formatter = formatter
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        try:
+            return self.formatter(self.args, self.kwargs)
+        except (TypeError, ValueError, AttributeError) as e:
+            return f"<args parsing error: {e}>"
+
+
+def build_args_binder(func: Callable) -> Callable[[tuple, dict], dict[str, Any]]:
+    """
+    Precompute how the arguments of a call map onto the parameters of a function.
+
+    The signature is inspected once, at decoration time. The returned binder
+    maps positional and keyword arguments onto the parameter names and
+    applies defaults.
+
+    Args:
+        func: The decorated function.
+
+    Returns:
+        Callable[[tuple, dict], dict[str, Any]]: Maps ``(args, kwargs)`` to
+            ``{name: value}``.
+    """
+    sig = inspect.signature(func)
+    params = list(sig.parameters.values())
+    positional = [param.name for param in params]
+    defaults = {
+        param.name: param.default
+        for param in params
+        if param.default is not inspect.Parameter.empty
+    }
+
+    # Signatures that cannot be mapped positionally still need binding
+    needs_binding = any(
+        param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD, param.POSITIONAL_ONLY)
+        for param in params
+    )
+
+    def bind_args(args: tuple, kwargs: dict) -> dict[str, Any]:
+        if needs_binding:
+            bound_args = sig.bind(*args, **kwargs)
+            bound_args.apply_defaults()
+            return bound_args.arguments
+
+        return {**defaults, **dict(zip(positional, args, strict=False)), **kwargs}
+
+    return bind_args
+
+
+def build_args_formatter(
+    func: Callable,
+    exclude_args: set[str],
+    sensitive_args: set[str],
+    max_arg_length: int,
+) -> Callable[[tuple, dict], str]:
+    """
+    Precompute how the arguments of a function are logged.
+
+    The returned formatter binds the arguments with ``build_args_binder`` and
+    masks or skips the filtered names.
+
+    Args:
+        func: The decorated function.
+        exclude_args: Argument names that are not logged.
+        sensitive_args: Argument names whose values are masked.
+        max_arg_length: Maximum length for argument values in logs.
+
+    Returns:
+        Callable[[tuple, dict], str]: Formats ``(args, kwargs)`` for logging.
+    """
+    bind_args = build_args_binder(func)
+    plan = [
+        (name, name in sensitive_args)
+        for name in inspect.signature(func).parameters
+        if name not in exclude_args
+    ]
+
+    def format_args(args: tuple, kwargs: dict) -> str:
+        values = bind_args(args, kwargs)
+        arg_strs = []
+        for name, masked in plan:
+            if name not in values:
+                continue
+            if masked:
+                arg_strs.append(f"{name}=***")
+            else:
+                arg_strs.append(f"{name}={format_log(values[name], max_arg_length)}")
+        return ", ".join(arg_strs)
+
+    return format_args
+
+
+def tool_name_of(func: Callable) -> str:
+    """Get the name a tool function is exposed as by the root server.
+
+    Tools of ``tools.<server>`` modules are mounted with the server name as
+    prefix, e.g. ``tools.catalog.get_products`` is ``catalog_get_products``.
+    """
+    module = func.__module__
+    if module.startswith("tools."):
+        return f"{module.rsplit('.', 1)[-1]}_{func.__name__}"
+    return func.__name__
+
+
+def result_text(result: Any) -> str:
+    """Get the text a tool result is sent to the client as."""
+    if isinstance(result, str):
+        return result
+    return pydantic_core.to_json(result, fallback=str).decode()
+
+
+class ToolCallCapture:
+    """
+    Appends full tool calls to a JSONL file for replay.
+
+    Entries are serialized on the calling thread, since the arguments may be
+    mutated afterwards, and written by a background thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._write, name="tool-capture", daemon=True
+        )
+        self._thread.start()
+
+    def record(
+        self,
+        tool: str,
+        arguments: dict[str, Any],
+        started_at: float,
+        duration: float,
+        result: Any = None,
+        error: Exception | None = None,
+    ) -> None:
+        """Capture a finished tool call.
+
+        Args:
+            tool: The name of the tool.
+            arguments: The arguments of the call, by parameter name.
+            started_at: The wall clock time the call started at.
+            duration: The wall time of the call in seconds.
+            result: The result of the call.
+            error: The exception the call raised, if any.
+        """
+        entry: dict[str, Any] = {
+            "ts": started_at,
+            "tool": tool,
+            "arguments": arguments,
+            "duration_ms": duration * 1000,
+        }
+        if error is not None:
+            entry["error"] = f"{type(error).__name__}: {error}"
+        else:
+            text = result_text(result)
+            entry["result_sha256"] = hashlib.sha256(text.encode()).hexdigest()
+            entry["result_bytes"] = len(text)
+        self._queue.put(pydantic_core.to_json(entry, fallback=str))
+
+    def stop(self) -> None:
+        """Flush the pending entries and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _write(self) -> None:
+        with open(self.path, "ab") as file:
+            while (line := self._queue.get()) is not None:
+                file.write(line + b"\n")
+                if self._queue.empty():
+                    file.flush()
+
+
+@functools.cache
+def get_tool_capture() -> ToolCallCapture | None:
+    """Get the process wide tool call capture, if ``TOOL_CAPTURE_FILE`` is set."""
+    path = get_capture_path_from_env()
+    if path is None:
+        return None
+
+    capture = ToolCallCapture(path)
+    atexit.register(capture.stop)
+    logger.info("🎥 Capturing tool calls to %s", path)
+    return capture
+
+
+@dataclass
+class CallTimings:
+    """Timings accumulated while a logged call is running."""
+
+    db_time: float = 0.0
+    db_queries: int = 0
+
+
+# Timings of the tool call running in the current task
+_call_timings: ContextVar[CallTimings | None] = ContextVar("call_timings", default=None)
+
+# Name of the tool whose result is being serialized in the current task
+_current_tool: ContextVar[str | None] = ContextVar("current_tool", default=None)
+
+# Whether a tracked database call is already running in the current task
+_in_db_call: ContextVar[bool] = ContextVar("in_db_call", default=False)
+
+
+def track_db_time(func: Callable) -> Callable:
+    """
+    Decorator for service methods that query the database.
+
+    Adds the time spent awaiting the method to the DB time of the tool call
+    that is running. Nested tracked calls are only counted once.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if _in_db_call.get():
+            return await func(*args, **kwargs)
+
+        token = _in_db_call.set(True)
+        start_time = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _in_db_call.reset(token)
+            timings = _call_timings.get()
+            if timings is not None:
+                timings.db_time += time.perf_counter() - start_time
+                timings.db_queries += 1
+
+    return wrapper
+
+
+def observe_tool_call(
+    tool_name: str,
+    execution_time: float,
+    timings: CallTimings,
+    error: Exception | None = None,
+) -> None:
+    """Record a finished tool call in the tool metrics."""
+    tool_calls.inc(tool_name, "error" if error else "success")
+    if error is not None:
+        tool_errors.inc(tool_name, type(error).__name__)
+    tool_duration.observe(execution_time, tool_name)
+    tool_db_duration.observe(timings.db_time, tool_name)
+    if timings.db_queries:
+        tool_db_queries.inc(tool_name, amount=timings.db_queries)
+
+
+def serialize_tool_result(data: Any) -> str:
+    """
+    Serialize a tool result to compact JSON, logging its size and timing.
+
+    Used as the ``tool_serializer`` of the MCP servers. Lists of rows of one
+    model are dumped with the cached adapter of the model.
+    """
+    start_time = time.perf_counter()
+    model = row_model(data)
+    if model is not None:
+        payload = dump_rows_json(model, data, fallback=str)
+    else:
+        payload = pydantic_core.to_json(data, fallback=str)
+    serialization_time = time.perf_counter() - start_time
+
+    tool_name = _current_tool.get()
+    if tool_name is not None:
+        tool_payload_size.observe(len(payload), tool_name)
+
+    logger.debug(
+        "📦 TOOL: %s | SERIALIZED %dB [%.3fs]",
+        tool_name,
+        len(payload),
+        serialization_time,
+    )
+    return payload.decode()
+
+
 def function_logger(
     log_level: int | str | None = None,
     log_args: bool = True,
@@ -47,10 +363,17 @@ def function_logger(
     exclude_args: set[str] | None = None,
     sensitive_args: set[str] | None = None,
     prefix: str = "TOOL",
+    sample_rate: int | None = None,
+    record_metrics: bool = False,
+    capture: bool = False,
 ):
     """
     Create a logging decorator with specified configuration.
 
+    Coroutine functions get an async wrapper that awaits the call, so the
+    logged time is the real wall time and exceptions raised while awaiting
+    are captured. It also logs the DB time recorded by ``track_db_time``.
+
     Args:
         log_level: Logging level (int, string, or None for env default)
         log_args: Whether to log function arguments
@@ -59,6 +382,13 @@ def function_logger(
         max_arg_length: Maximum length for argument values in logs
         exclude_args: Set of argument names to exclude from logging
         sensitive_args: Set of argument names to mask in logs
+        sample_rate: Log 1 in N successful calls (None for env default).
+            Failures are always logged.
+        record_metrics: Whether to record call counts, latencies, errors and
+            DB time in the tool metrics (async functions only)
+        capture: Whether to capture full calls to ``TOOL_CAPTURE_FILE`` for
+            replay, when it is set (async functions only). Sensitive
+            arguments are masked.
 
     Returns:
         Decorator function
@@ -76,102 +406,193 @@ def function_logger(
         exclude_args = set()
     if sensitive_args is None:
         sensitive_args = {"password", "token", "key", "secret", "auth", "credential"}
+    if sample_rate is None:
+        sample_rate = get_sample_rate_from_env()
+    tool_capture = get_tool_capture() if capture else None
 
     def decorator(func: Callable) -> Callable:
+        func_name = func.__name__
+        call_counter = itertools.count()
+
+        # Inspect the signature once instead of on every call
+        format_args = build_args_formatter(
+            func, exclude_args, sensitive_args, max_arg_length
+        )
+        tool_name = tool_name_of(func)
+        bind_args = build_args_binder(func)
+
+        def capture_call(args, kwargs, started_at, duration, result=None, error=None):
+            arguments = {
+                name: "***" if name in sensitive_args else value
+                for name, value in bind_args(args, kwargs).items()
+                if name not in exclude_args
+            }
+            tool_capture.record(
+                tool_name, arguments, started_at, duration, result, error
+            )
+
+        def is_sampled() -> bool:
+            return sample_rate <= 1 or next(call_counter) % sample_rate == 0
+
+        def log_entry(args, kwargs) -> None:
+            if not log_args:
+                logger.log(resolved_log_level, "🔧 %s: %s", prefix, func_name)
+                return
+
+            # Arguments are only formatted if the record is emitted
+            logger.log(
+                resolved_log_level,
+                "🔧 %s: %s | ARGS: %s",
+                prefix,
+                func_name,
+                LazyLogArgs(format_args, args, kwargs),
+            )
+
+        def log_success(
+            result: Any, execution_time: float, timings: CallTimings | None
+        ) -> None:
+            # Log execution time and return value
+            if log_execution_time:
+                time_str = f" [{execution_time:.3f}s"
+                if timings is not None and timings.db_queries:
+                    time_str += f" | db {timings.db_time:.3f}s/{timings.db_queries}q"
+                time_str += "]"
+            else:
+                time_str = ""
+
+            if log_return:
+                result_str = format_log(result, max_arg_length)
+                logger.log(
+                    resolved_log_level,
+                    "✅ %s: %s | RESULT: %s%s",
+                    prefix,
+                    func_name,
+                    result_str,
+                    time_str,
+                )
+            else:
+                logger.log(
+                    resolved_log_level,
+                    "✅ %s: %s | COMPLETED%s",
+                    prefix,
+                    func_name,
+                    time_str,
+                )
+
+        def log_failure(e: Exception, execution_time: float) -> None:
+            logger.error(
+                "❌ %s: %s | FAILED after %.3fs | ERROR: %s: %s",
+                prefix,
+                func_name,
+                execution_time,
+                type(e).__name__,
+                e,
+            )
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                # Early exit if neither logging, metrics nor capture are enabled
+                log_enabled = logger.isEnabledFor(resolved_log_level)
+                if not log_enabled and not record_metrics and tool_capture is None:
+                    return await func(*args, **kwargs)
+
+                started_at = time.time()
+                start_time = time.perf_counter()
+                sampled = log_enabled and is_sampled()
+                if sampled:
+                    log_entry(args, kwargs)
+
+                timings = CallTimings()
+                token = _call_timings.set(timings)
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    execution_time = time.perf_counter() - start_time
+                    if record_metrics:
+                        observe_tool_call(tool_name, execution_time, timings, e)
+                    if tool_capture is not None:
+                        capture_call(args, kwargs, started_at, execution_time, error=e)
+                    if log_enabled:
+                        log_failure(e, execution_time)
+                    raise
+                finally:
+                    _call_timings.reset(token)
+
+                execution_time = time.perf_counter() - start_time
+                if record_metrics:
+                    observe_tool_call(tool_name, execution_time, timings)
+                if tool_capture is not None:
+                    capture_call(args, kwargs, started_at, execution_time, result)
+
+                # Left set so the tool serializer can attribute the payload
+                _current_tool.set(tool_name)
+                if sampled:
+                    log_success(result, execution_time, timings)
+                return result
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            start_time = time.time()
-            func_name = func.__name__
-
             # Early exit if log level not enabled
             if not logger.isEnabledFor(resolved_log_level):
                 return func(*args, **kwargs)
 
-            # Log function entry
-            if log_args:
-                try:
-                    sig = inspect.signature(func)
-                    bound_args = sig.bind(*args, **kwargs)
-                    bound_args.apply_defaults()
-
-                    # Format arguments with filtering
-                    arg_strs = []
-                    for name, value in bound_args.arguments.items():
-                        if name in exclude_args:
-                            continue
-                        elif name in sensitive_args:
-                            arg_strs.append(f"{name}=***")
-                        else:
-                            formatted_value = format_log(value, max_arg_length)
-                            arg_strs.append(f"{name}={formatted_value}")
-
-                    args_display = ", ".join(arg_strs)
-                    logger.log(
-                        resolved_log_level,
-                        "🔧 %s: %s | ARGS: %s",
-                        prefix,
-                        func_name,
-                        args_display,
-                    )
-                except (TypeError, ValueError, AttributeError) as e:
-                    logger.log(
-                        resolved_log_level,
-                        "→ %s(<args parsing error: %s>)",
-                        func_name,
-                        e,
-                    )
-            else:
-                logger.log(resolved_log_level, "🔧 %s: %s", prefix, func_name)
+            start_time = time.perf_counter()
+            sampled = is_sampled()
+            if sampled:
+                log_entry(args, kwargs)
 
             # Execute function and handle exceptions
             try:
                 result = func(*args, **kwargs)
-
-                # Log execution time and return value
-                if log_execution_time:
-                    execution_time = time.time() - start_time
-                    time_str = f" [{execution_time:.3f}s]"
-                else:
-                    time_str = ""
-
-                if log_return:
-                    result_str = format_log(result, max_arg_length)
-                    logger.log(
-                        resolved_log_level,
-                        "✅ %s: %s | RESULT: %s%s",
-                        prefix,
-                        func_name,
-                        result_str,
-                        time_str,
-                    )
-                else:
-                    logger.log(
-                        resolved_log_level,
-                        "✅ %s: %s | COMPLETED%s",
-                        prefix,
-                        func_name,
-                        time_str,
-                    )
-
-                return result
-
             except Exception as e:
-                execution_time = time.time() - start_time
-                logger.error(
-                    "❌ %s: %s | FAILED after %.3fs | ERROR: %s: %s",
-                    prefix,
-                    func_name,
-                    execution_time,
-                    type(e).__name__,
-                    e,
-                )
+                log_failure(e, time.perf_counter() - start_time)
                 raise
 
+            if sampled:
+                log_success(result, time.perf_counter() - start_time, None)
+            return result
+
         return wrapper
 
     return decorator
 
 
+class DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves message formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Enqueue the record as is, so lazy arguments are formatted later."""
+        return record
+
+
+def setup_queue_logging() -> QueueListener:
+    """
+    Move the root logger handlers behind a queue.
+
+    Records are enqueued unformatted and formatted and written by a
+    background thread, so neither message formatting nor slow stdout or file
+    I/O blocks the event loop.
+
+    Returns:
+        QueueListener: The started listener. Stop it on shutdown to flush.
+    """
+    root_logger = logging.getLogger()
+    handlers = root_logger.handlers[:]
+    for handler in handlers:
+        root_logger.removeHandler(handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root_logger.addHandler(DeferredQueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
 def setup_structured_logging(
     log_level: str,
     log_format: str = "json",
@@ -355,7 +776,7 @@ def log_minimal(func: Callable) -> Callable:
 # Prefix-specific convenience functions
 def log_tool(func: Callable) -> Callable:
     """Logging decorator for tool functions."""
-    return function_logger(prefix="TOOL")(func)
+    return function_logger(prefix="TOOL", record_metrics=True, capture=True)(func)
 
 
 def log_formatter(func: Callable) -> Callable:
@@ -0,0 +1,217 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+"""
+
+import bisect
+import math
+import os
+import threading
+from collections import defaultdict
+
+import psutil
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, **extra) -> str:
+    pairs = [*zip(names, values, strict=True), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(v))}"' for name, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values: dict[LabelValues, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Increment the counter for a label set."""
+        with self._lock:
+            self._values[label_values] += amount
+
+    def samples(self) -> list[str]:
+        """Render the samples of the counter."""
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    """Cumulative histogram with labels."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record an observation for a label set."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.setdefault(
+                label_values, [0] * (len(self.buckets) + 1)
+            )
+            counts[index] += 1
+            self._sums[label_values] += value
+
+    def samples(self) -> list[str]:
+        """Render the bucket, sum and count samples of the histogram."""
+        with self._lock:
+            counts = {key: list(value) for key, value in self._counts.items()}
+            sums = dict(self._sums)
+
+        lines = []
+        for key in sorted(counts):
+            cumulative = 0
+            for bound, count in zip(
+                (*self.buckets, math.inf), counts[key], strict=True
+            ):
+                cumulative += count
+                labels = _format_labels(self.labels, key, le=_format_value(bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(sums[key])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registry of the metrics exposed by the server."""
+
+    def __init__(self):
+        self._metrics: list[Counter | Histogram] = []
+
+    def counter(
+        self, name: str, description: str, labels: tuple[str, ...] = ()
+    ) -> Counter:
+        """Register a counter."""
+        metric = Counter(name, description, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Register a histogram."""
+        metric = Histogram(name, description, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(
+        self,
+        gauges: dict[str, tuple[str, float | None]] | None = None,
+        counters: dict[str, tuple[str, float | None]] | None = None,
+    ) -> str:
+        """Render all metrics in the Prometheus text exposition format.
+
+        Args:
+            gauges: Point-in-time gauges collected by the caller, as
+                ``{name: (description, value)}``. None values are skipped.
+            counters: Monotonic counters kept elsewhere and collected by the
+                caller, in the same form. Their names should end in ``_total``.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+
+        collected = (
+            ("gauge", {**process_gauges(), **(gauges or {})}),
+            ("counter", {**process_counters(), **(counters or {})}),
+        )
+        for kind, values in collected:
+            for name, (description, value) in values.items():
+                if value is None:
+                    continue
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def process_gauges() -> dict[str, tuple[str, float | None]]:
+    """Collect the resident memory of the server process."""
+    try:
+        memory = psutil.Process(os.getpid()).memory_info()
+    except (psutil.Error, OSError):
+        return {}
+    return {"process_resident_memory_bytes": ("Resident memory size.", memory.rss)}
+
+
+def process_counters() -> dict[str, tuple[str, float | None]]:
+    """Collect the CPU time of the server process."""
+    try:
+        cpu = psutil.Process(os.getpid()).cpu_times()
+    except (psutil.Error, OSError):
+        return {}
+    return {"process_cpu_seconds_total": ("Process CPU time.", cpu.user + cpu.system)}
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
+
+tool_calls = metrics.counter(
+    "mcp_tool_calls_total", "Tool calls by tool and status.", ("tool", "status")
+)
+tool_errors = metrics.counter(
+    "mcp_tool_errors_total", "Failed tool calls by error type.", ("tool", "error")
+)
+tool_duration = metrics.histogram(
+    "mcp_tool_duration_seconds", "Tool call wall time.", ("tool",)
+)
+tool_db_duration = metrics.histogram(
+    "mcp_tool_db_duration_seconds", "Database time per tool call.", ("tool",)
+)
+tool_db_queries = metrics.counter(
+    "mcp_tool_db_queries_total", "Database queries issued by tools.", ("tool",)
+)
+tool_payload_size = metrics.histogram(
+    "mcp_tool_payload_bytes",
+    "Serialized tool result size.",
+    ("tool",),
+    buckets=SIZE_BUCKETS,
+)